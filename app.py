@@ -1,27 +1,94 @@
 """
 Aplicação principal do Dashboard de Vigilância de Saúde Materna
 """
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import streamlit as st
 import streamlit.components.v1 as components
+from streamlit.runtime.scriptrunner import RerunException, StopException
+
+from src.config import (ESTADO_PADRAO, ESTADOS, INDICADORES, METRICS_CONFIG,
+                        PAGE_CONFIG, PLOT_CONFIG)
+from src.data.loader import filter_data, load_snapshot, start_data_watcher
+from src.data.registry import available_states
+from src.data.schema import memory_report
+from src.utils.cache import cache_stats
+from src.utils.metrics import METRICAS, configure_log, output_size
+
+
+def charts():
+    """
+    Importa o módulo de gráficos (Plotly) no primeiro uso, para que os
+    filtros sejam exibidos antes do carregamento das bibliotecas gráficas.
+    """
+    from src.visualizations import charts as modulo_charts
+    return modulo_charts
+
+
+def maps():
+    """Importa o módulo de mapas (Folium, Branca, Shapely) no primeiro uso."""
+    from src.visualizations import maps as modulo_maps
+    return modulo_maps
+
+
+@st.cache_resource
+def section_pool():
+    """
+    Pool de threads compartilhado entre sessões para o preparo das seções.
+
+    O tamanho limita o número total de preparos simultâneos no processo;
+    os preparos de execuções substituídas são cancelados
+    (``cancel_pending``) para não ocupar o pool das demais sessões.
+    """
+    return ThreadPoolExecutor(
+        max_workers=PLOT_CONFIG['section_workers'],
+        thread_name_prefix="secao"
+    )
 
-from src.config import INDICADORES, PAGE_CONFIG, PLOT_CONFIG
-from src.data.loader import (filter_data, get_available_macros,
-                             get_available_regionals, get_available_years,
-                             load_data)
-from src.visualizations.charts import (plot_heatmap, plot_histogram,
-                                       plot_macro_distribution, plot_pie_chart,
-                                       plot_stats, plot_timeline)
-from src.visualizations.maps import criar_mapa_cobertura_consultas
 
 # Configuração da página
 st.set_page_config(**PAGE_CONFIG)
 
-# Carregando os dados
-df = load_data()
+# Identificação e início desta execução, para as medições de desempenho
+execucao = uuid.uuid4().hex[:12]
+inicio_execucao = time.perf_counter()
+configure_log()
+
+# Atualiza os caches quando os arquivos de dados mudam no disco
+start_data_watcher()
+
+# O modo de mapa "ladrilhos" e o transporte "iframe" usam o servidor de
+# ladrilhos, iniciado uma única vez por processo
+if (PLOT_CONFIG.get('map_render_mode') == 'ladrilhos' or
+        PLOT_CONFIG.get('map_transport') == 'iframe'):
+    from src.tools.tile_server import start_in_background
+    start_in_background()
+
+# Seleção do estado; apenas o estado selecionado é carregado
+estados_disponiveis = available_states() or [ESTADO_PADRAO]
+estado_selecionado = ESTADO_PADRAO
+if len(estados_disponiveis) > 1:
+    estado_selecionado = st.sidebar.selectbox(
+        "Estado",
+        estados_disponiveis,
+        index=(estados_disponiveis.index(ESTADO_PADRAO)
+               if ESTADO_PADRAO in estados_disponiveis else 0),
+        format_func=lambda sigla: ESTADOS[sigla]['nome']
+    )
+
+# Versão corrente dos dados, compartilhada entre sessões; a mesma versão é
+# usada em toda a execução, mesmo que uma atualização seja publicada
+versao_atual = load_snapshot(estado_selecionado)
 
-if df is None:
+if versao_atual is None:
     st.stop()
 
+indice = versao_atual.indice
+
+df = indice.df
+
 # Título do dashboard
 st.title("Dashboard de Vigilância de Saúde Materna")
 st.markdown("---")
@@ -31,7 +98,7 @@ st.sidebar.header("Filtros")
 
 # Anos disponíveis
 try:
-    anos_disponiveis = get_available_years(df)
+    anos_disponiveis = indice.years()
     ano_inicio, ano_fim = st.sidebar.slider(
         "Intervalo de anos",
         min_value=int(min(anos_disponiveis)),
@@ -43,7 +110,7 @@ except Exception as e:
     st.stop()
 
 # Seleção de Macro-região
-macros = get_available_macros(df)
+macros = indice.macros()
 macro_selecionada = st.sidebar.selectbox(
     "Macro-região",
     ["Todas"] + list(macros)
@@ -52,13 +119,7 @@ macro_selecionada = st.sidebar.selectbox(
 # Seleção de Regional
 # Regional depende dos filtros de período e macro
 # para evitar combinações vazias
-df_base_regionais = df[df['ANO'].between(ano_inicio, ano_fim)]
-if macro_selecionada != "Todas":
-    df_base_regionais = df_base_regionais[
-        df_base_regionais['Macro'] == macro_selecionada
-    ]
-
-regionais = get_available_regionals(df_base_regionais)
+regionais = indice.regionals(ano_inicio, ano_fim, macro_selecionada)
 regional_selecionada = st.sidebar.selectbox(
     "Regional",
     ["Todas"] + list(regionais)
@@ -81,12 +142,13 @@ layout_comparativo = st.sidebar.radio(
     )
 )
 
+altura_minima, altura_maxima, passo_altura = PLOT_CONFIG['map_height_range']
 altura_mapa = st.sidebar.slider(
     "Altura do mapa (px)",
-    min_value=400,
-    max_value=900,
+    min_value=altura_minima,
+    max_value=altura_maxima,
     value=int(PLOT_CONFIG['default_height']),
-    step=50
+    step=passo_altura
 )
 
 # Filtrando dados
@@ -95,7 +157,8 @@ df_filtrado = filter_data(
     ano_inicio,
     ano_fim,
     macro_selecionada,
-    regional_selecionada
+    regional_selecionada,
+    index=indice
 )
 
 # Verificar se há dados após a filtragem
@@ -103,55 +166,266 @@ if df_filtrado.empty:
     st.warning("Não há dados disponíveis para os filtros selecionados.")
     st.stop()
 
+# Agregados dos grupos selecionados, compartilhados pelos gráficos
+cubo_filtrado = versao_atual.cubo.filter(
+    ano_inicio,
+    ano_fim,
+    macro_selecionada,
+    regional_selecionada
+)
+
+# Chave dos caches de figuras: versão dos dados e filtros aplicados
+chave_cache = (
+    indice.fingerprint,
+    int(ano_inicio),
+    int(ano_fim),
+    macro_selecionada,
+    regional_selecionada
+)
+
+
+def run_safely(render_function, error_prefix, secao=None,
+               segundos_preparo=0.0, linhas=None):
+    """
+    Executa função de renderização com tratamento de erro padrão.
 
-def run_safely(render_function, error_prefix):
-    """Executa função de renderização com tratamento de erro padrão."""
+    Quando ``secao`` é informada, registra o tempo de parede (somado ao
+    tempo de preparo em segundo plano, se houver), as linhas de entrada da
+    seção e o tamanho da saída retornada pela função de renderização.
+    """
+    inicio = time.perf_counter()
+    saida = None
+    erro = False
     try:
-        render_function()
+        saida = render_function()
     except Exception as e:
+        erro = True
         st.error(f"{error_prefix}: {str(e)}")
+    if secao is not None:
+        METRICAS.record(
+            secao,
+            segundos_preparo + time.perf_counter() - inicio,
+            linhas=linhas,
+            bytes_saida=output_size(saida),
+            erro=erro,
+            execucao=execucao
+        )
+
+
+@st.cache_data(max_entries=8)
+def dataset_memory(versao, _df):
+    """Relatório de memória dos dados de uma versão (``versao`` é a chave)."""
+    return memory_report(_df)
+
+
+def render_performance_panel():
+    """
+    Exibe na barra lateral os percentis de desempenho de cada seção e os
+    contadores dos caches em memória.
+    """
+    percentis = METRICS_CONFIG['percentiles']
+    tabela = []
+    for secao, valores in sorted(METRICAS.summary(percentis).items()):
+        linha = {"Seção": secao, "Execuções": valores["execucoes"]}
+        for p in percentis:
+            linha[f"p{p} (ms)"] = round(valores["segundos"][p] * 1000, 1)
+        linha["Linhas (p50)"] = valores["linhas"].get(50)
+        linha["Saída KB (p50)"] = round(
+            valores["bytes"].get(50, float("nan")) / 1024, 1
+        )
+        linha["Erros"] = valores["erros"]
+        tabela.append(linha)
+
+    with st.sidebar.expander("Desempenho das seções"):
+        st.caption(
+            f"Percentis das últimas {METRICS_CONFIG['window']} execuções "
+            "de cada seção neste processo."
+        )
+        st.dataframe(tabela, hide_index=True, use_container_width=True)
+
+        caches = []
+        for nome, contadores in cache_stats().items():
+            consultas = contadores["hits"] + contadores["misses"]
+            caches.append({
+                "Cache": nome,
+                "Acertos": contadores["hits"],
+                "Faltas": contadores["misses"],
+                "Taxa de acerto": (f"{contadores['hits'] / consultas:.0%}"
+                                   if consultas else "-"),
+                "Remoções": contadores["evictions"],
+                "Entradas": contadores["entries"],
+                "MB": round(contadores["bytes"] / 1024 ** 2, 2)
+            })
+        st.caption("Caches em memória compartilhados entre as sessões.")
+        st.dataframe(caches, hide_index=True, use_container_width=True)
+
+        memoria = dataset_memory(indice.fingerprint, df)
+        st.caption(
+            f"Dados em memória: {memoria['bytes'] / 1024 ** 2:.2f} MB "
+            f"({memoria['economia']:.0%} a menos que com os tipos padrão)."
+        )
+
+
+def prepare_timed(preparar):
+    """
+    Executa o preparo de uma seção em segundo plano, sem chamadas ao
+    Streamlit, e retorna (resultado, exceção, segundos).
+    """
+    inicio = time.perf_counter()
+    try:
+        return preparar(), None, time.perf_counter() - inicio
+    except Exception as e:
+        return None, e, time.perf_counter() - inicio
+
+
+def cancel_pending(preparos):
+    """Cancela os preparos de seções que ainda não começaram."""
+    for preparo in preparos:
+        preparo.cancel()
+
+
+# Os módulos de gráficos e mapas são resolvidos dentro de cada preparo e
+# exibição: a importação ocorre uma vez por processo, na primeira seção que
+# os usa, e não a cada nova execução do script
+def chart_section(tipo, cubo=cubo_filtrado):
+    """Retorna o preparo do payload de um gráfico."""
+    return lambda: charts().chart_payload(
+        tipo, df_filtrado, indicador_selecionado, cubo, chave_cache
+    )
+
+
+def prepare_stats_section():
+    return charts().stats_values(
+        df_filtrado, indicador_selecionado, cubo=cubo_filtrado
+    )
+
+
+def display_stats_section(valores):
+    return charts().render_stats(valores)
+
+
+def display_chart_section(payload):
+    return charts().render_chart_payload(payload)
+
+
+def prepare_map_section():
+    modulo_maps = maps()
+    # No transporte "iframe", apenas o endereço do documento é enviado
+    renderizar = (modulo_maps.renderizar_mapa_url
+                  if PLOT_CONFIG.get('map_transport') == 'iframe'
+                  else modulo_maps.renderizar_mapa_html)
+    return renderizar(
+        df_filtrado,
+        indicador_selecionado,
+        versao_dados=indice.fingerprint,
+        ano_inicio=ano_inicio,
+        ano_fim=ano_fim,
+        macro_selecionada=macro_selecionada,
+        regional_selecionada=regional_selecionada,
+        altura_mapa=altura_mapa,
+        estado=estado_selecionado
+    )
+
+
+def display_map_section(mapa):
+    if PLOT_CONFIG.get('map_transport') == 'iframe':
+        components.iframe(mapa, height=altura_mapa)
+    else:
+        components.html(mapa, height=altura_mapa)
+    return mapa
+
+
+# Linhas de entrada de cada preparo: grupos do cubo para as seções
+# agregadas, linhas filtradas para o mapa e o histograma
+linhas_cubo = len(cubo_filtrado.chaves)
+linhas_filtradas = len(df_filtrado)
+
+# Seções independentes: preparo (em segundo plano), exibição, mensagem de
+# erro e linhas de entrada. O histograma usa os dados filtrados, e não o cubo
+SECOES = {
+    "estatisticas": (
+        prepare_stats_section,
+        display_stats_section,
+        "Erro ao calcular estatísticas",
+        linhas_cubo
+    ),
+    "barras_macro": (
+        chart_section("macro_distribution"),
+        display_chart_section,
+        "Erro ao gerar gráfico de distribuição",
+        linhas_cubo
+    ),
+    "mapa_calor": (
+        chart_section("heatmap"),
+        display_chart_section,
+        "Erro ao gerar mapa de calor",
+        linhas_cubo
+    ),
+    "mapa": (
+        prepare_map_section,
+        display_map_section,
+        "Erro ao gerar mapa das macrorregiões - Folium",
+        linhas_filtradas
+    ),
+    "linha_do_tempo": (
+        chart_section("timeline"),
+        display_chart_section,
+        "Erro ao gerar gráfico de linha do tempo",
+        linhas_cubo
+    ),
+    "pizza": (
+        chart_section("pie_chart"),
+        display_chart_section,
+        "Erro ao gerar gráfico de pizza",
+        linhas_cubo
+    ),
+    "histograma": (
+        chart_section("histogram", cubo=None),
+        display_chart_section,
+        "Erro ao gerar histograma",
+        linhas_filtradas
+    )
+}
+
+# Uma nova interação interrompe a execução anterior da sessão: os preparos
+# dela que ainda aguardam no pool não serão exibidos
+cancel_pending(st.session_state.get("_preparos_secoes", ()))
+
+# Todas as seções são preparadas ao mesmo tempo logo após a filtragem; a
+# página é montada com espaços reservados, preenchidos à medida que cada
+# preparo termina
+preparos = {
+    section_pool().submit(prepare_timed, preparar): secao
+    for secao, (preparar, _, _, _) in SECOES.items()
+}
+st.session_state["_preparos_secoes"] = list(preparos)
+espacos = {}
+
+
+def reserve_section(secao):
+    """Reserva o espaço de uma seção, exibido enquanto ela é preparada."""
+    espacos[secao] = st.empty()
+    espacos[secao].caption("Carregando...")
 
 
 # Estatísticas descritivas
 st.subheader("Estatísticas Descritivas")
-run_safely(
-    lambda: plot_stats(df_filtrado, indicador_selecionado),
-    "Erro ao calcular estatísticas"
-)
+reserve_section("estatisticas")
 
 # Gráfico de distribuição por Macro
 st.markdown("---")
 st.subheader("Distribuição por Macro-região")
-run_safely(
-    lambda: plot_macro_distribution(df_filtrado, indicador_selecionado),
-    "Erro ao gerar gráfico de distribuição"
-)
+reserve_section("barras_macro")
 
 # Mapa de calor por Regional
 st.markdown("---")
 st.subheader("Mapa de Calor por Regional")
-run_safely(
-    lambda: plot_heatmap(df_filtrado, indicador_selecionado),
-    "Erro ao gerar mapa de calor"
-)
+reserve_section("mapa_calor")
 
 # Mapa das Macrorregiões - Folium
 st.markdown("---")
 st.subheader("Mapa das Macrorregiões")
-
-
-def render_map_section():
-    _, html_mapa = criar_mapa_cobertura_consultas(
-        df_filtrado=df_filtrado,
-        indicador_selecionado=indicador_selecionado
-    )
-    components.html(html_mapa, height=altura_mapa)
-
-
-run_safely(
-    render_map_section,
-    "Erro ao gerar mapa das macrorregiões - Folium"
-)
+reserve_section("mapa")
 
 # Seção comparativa: linha do tempo e distribuição regional
 st.markdown("---")
@@ -159,18 +433,12 @@ st.markdown("---")
 
 def render_timeline_section():
     st.subheader("Linha do Tempo - Evolução do Indicador")
-    run_safely(
-        lambda: plot_timeline(df_filtrado, indicador_selecionado),
-        "Erro ao gerar gráfico de linha do tempo"
-    )
+    reserve_section("linha_do_tempo")
 
 
 def render_regional_section():
     st.subheader("Média do Indicador por Regional")
-    run_safely(
-        lambda: plot_pie_chart(df_filtrado, indicador_selecionado),
-        "Erro ao gerar gráfico de pizza"
-    )
+    reserve_section("pizza")
 
 
 if layout_comparativo == "Lado a lado":
@@ -195,10 +463,7 @@ else:
 # Histograma
 st.markdown("---")
 st.subheader("Histograma - Distribuição dos Indicadores")
-run_safely(
-    lambda: plot_histogram(df_filtrado, indicador_selecionado),
-    "Erro ao gerar histograma"
-)
+reserve_section("histograma")
 
 # Rodapé com informações
 st.markdown("---")
@@ -224,3 +489,39 @@ st.sidebar.markdown(f"""
     - Macro: {macro_selecionada}
     - Regional: {regional_selecionada}
 """)
+
+# Preenche cada seção assim que o seu preparo termina; se a execução for
+# interrompida por uma nova interação, os preparos pendentes são cancelados
+try:
+    for preparo in as_completed(preparos):
+        secao = preparos[preparo]
+        _, exibir, mensagem_erro, linhas_entrada = SECOES[secao]
+        resultado, excecao, segundos = preparo.result()
+
+        def display_section(exibir=exibir, resultado=resultado,
+                            excecao=excecao):
+            if excecao is not None:
+                raise excecao
+            return exibir(resultado)
+
+        with espacos[secao].container():
+            run_safely(display_section, mensagem_erro, secao=secao,
+                       segundos_preparo=segundos, linhas=linhas_entrada)
+except (RerunException, StopException):
+    cancel_pending(preparos)
+    raise
+
+# Tempo total da página e publicação das medições
+METRICAS.record(
+    "pagina",
+    time.perf_counter() - inicio_execucao,
+    linhas=len(df_filtrado),
+    execucao=execucao
+)
+if METRICS_CONFIG['prometheus_file']:
+    try:
+        METRICAS.write_prometheus_file(METRICS_CONFIG['prometheus_file'])
+    except OSError:
+        pass
+if METRICS_CONFIG['admin_panel']:
+    render_performance_panel()
@@ -1,6 +1,7 @@
 """
 Configurações globais para o dashboard de Saúde Materna
 """
+import os
 
 # Configuração da página
 PAGE_CONFIG = {
@@ -24,19 +25,109 @@ MAP_CONFIG = {
     'center_lon': -42,
     'center_lat': -6,
     'lat_range': [-12, 0],
-    'lon_range': [-48, -36]
+    'lon_range': [-48, -36],
+    'zoom_start': 7,
+    # Tolerâncias (em graus) das variantes simplificadas da malha municipal
+    'simplify_tolerances': (0.0005, 0.0015, 0.005)
 }
 
 # Configurações de visualização
 PLOT_CONFIG = {
     'default_height': 600,
+    # Alturas do mapa oferecidas na barra lateral: (mínima, máxima, passo)
+    'map_height_range': (400, 900, 50),
     'default_width': None,  # None para usar container_width=True
     'color_scheme': 'YlOrRd',
     'map_color_scheme': 'YlOrRd',
+    # 'tabela': geometria embutida uma vez, ano trocado no navegador
+    # 'camadas': uma camada GeoJson completa por ano
+    # 'ladrilhos': geometria carregada por ladrilhos do servidor de
+    # ladrilhos (TILE_CONFIG), apenas na área visível do mapa
+    'map_render_mode': 'tabela',
+    # Envio do HTML do mapa ao navegador:
+    # 'inline': documento completo a cada execução, pelo websocket
+    # 'iframe': documento publicado em STATIC_CONFIG['dir'], comprimido e
+    # servido pelo servidor de ladrilhos; o app envia apenas o endereço
+    'map_transport': os.environ.get('SAUDE_MATERNA_MAP_TRANSPORT') or 'inline',
     'bar_color': '#2E86AB',
     'line_color': '#2E86AB',
     'marker_color': '#E07A5F',
-    'hist_color': '#2E86AB'
+    'hist_color': '#2E86AB',
+    # Renderizador do mapa de calor e do histograma:
+    # 'plotly' (NumPy + traços no navegador) ou 'matplotlib' (Seaborn, PNG)
+    'chart_renderer': 'plotly',
+    # Threads que preparam as seções da página ao mesmo tempo (compartilhadas
+    # entre as sessões do processo)
+    'section_workers': 8
+}
+
+# Limites dos caches em memória compartilhados entre sessões
+CACHE_CONFIG = {
+    'map_html_max_entries': 64,
+    'map_html_max_bytes': 128 * 1024 * 1024,
+    'figure_max_entries': 512,
+    'figure_max_bytes': 64 * 1024 * 1024,
+    # Nomes dos documentos de mapa publicados (transporte 'iframe')
+    'map_document_max_entries': 64,
+    'map_document_max_bytes': 1024 * 1024,
+    # Coordenadas das macrorregiões do mapa, por versão dos dados e filtros
+    'coordinates_max_entries': 64,
+    'coordinates_max_bytes': 16 * 1024 * 1024,
+    # Estados mantidos em memória ao mesmo tempo (dados, índice e cubo)
+    'state_max_entries': 8,
+    # Malhas municipais (GeoJSON) mantidas em memória ao mesmo tempo
+    'geojson_max_entries': 8,
+    # Observa o diretório de dados e atualiza os caches quando arquivos mudam
+    'watch_data_files': True,
+    # Segundos sem novas alterações antes de atualizar os caches
+    'watch_debounce_seconds': 1.0
+}
+
+# Ladrilhos da malha municipal (modo de mapa 'ladrilhos'), servidos por
+# ``python -m src.tools.tile_server`` ou iniciados junto com o app
+TILE_CONFIG = {
+    'dir': 'data/ladrilhos',
+    # Níveis de zoom com ladrilhos próprios; fora deles, usa-se o mais próximo
+    'min_zoom': 4,
+    'max_zoom': 12,
+    'port': int(os.environ.get('SAUDE_MATERNA_TILE_PORT') or 8765),
+    # Endereço do servidor como visto pelo navegador
+    'url': os.environ.get('SAUDE_MATERNA_TILE_URL') or None,
+    # Ladrilhos são endereçados pela versão da malha e nunca mudam
+    'max_age': 365 * 24 * 3600
+}
+if TILE_CONFIG['url'] is None:
+    TILE_CONFIG['url'] = f"http://localhost:{TILE_CONFIG['port']}"
+
+# Documentos dos mapas e arquivos JS/CSS servidos localmente (transporte
+# 'iframe'), com nomes dados pelo hash do conteúdo
+STATIC_CONFIG = {
+    'dir': 'data/estaticos',
+    # Cópias dos arquivos JS/CSS das CDNs usados pelo Folium, gravadas por
+    # ``python -m src.tools.vendor_assets`` (manifesto URL -> arquivo)
+    'vendor_dir': 'vendor',
+    # Arquivos menores que isto não recebem versões comprimidas
+    'min_compress_bytes': 1024,
+    # Endereços com hash do conteúdo nunca mudam
+    'max_age': 365 * 24 * 3600,
+    # Arquivos publicados sem uso há mais dias que isto são removidos por
+    # ``python -m src.tools.prune``
+    'max_idle_days': 7
+}
+
+# Medições de desempenho das seções do dashboard
+METRICS_CONFIG = {
+    # Execuções mais recentes de cada seção usadas nos percentis
+    'window': 500,
+    'percentiles': (50, 90, 99),
+    # Painel de desempenho na barra lateral (desativado por padrão)
+    'admin_panel': os.environ.get('SAUDE_MATERNA_ADMIN') == '1',
+    # Log estruturado, uma linha JSON por seção renderizada
+    'log_file': os.environ.get('SAUDE_MATERNA_METRICS_LOG') or None,
+    # Arquivo no formato de texto do Prometheus, reescrito a cada execução
+    # (para o coletor "textfile" do node_exporter, por exemplo); cada
+    # processo grava uma cópia com a máquina e o PID no nome
+    'prometheus_file': os.environ.get('SAUDE_MATERNA_PROMETHEUS_FILE') or None
 }
 
 # Caminho para o arquivo de dados
@@ -44,3 +135,63 @@ DATA_PATH = 'data/IndicadoresConsolidados_SaudeMaterna_empilhado.xlsx'
 
 # Caminho para o arquivo GeoJSON
 GEOJSON_PATH = 'data/geojs-22-mun.json'
+
+# Diretório do conjunto de dados particionado por UF e ano
+# (PARTITIONS_DIR/UF=<código IBGE>/ANO=<ano>/dados.parquet)
+PARTITIONS_DIR = 'data/particoes'
+
+# Padrão do arquivo de malha municipal de cada UF (código IBGE da UF)
+GEOJSON_PATTERN = 'data/geojs-{codigo}-mun.json'
+
+# Estado exibido por padrão
+ESTADO_PADRAO = 'PI'
+
+# Artefatos (mapas e gráficos) pré-calculados por ``src.tools.precompute``
+ARTIFACTS_DIR = 'data/artefatos'
+
+# Diretório compartilhado entre processos (por exemplo, um volume comum aos
+# workers). Quando definido, os dados são publicados em arquivos Arrow IPC
+# mapeados em memória por todos os processos, junto com as malhas
+# simplificadas, em vez de cada processo ler e manter sua própria cópia.
+SHARED_DIR = os.environ.get('SAUDE_MATERNA_SHARED_DIR') or None
+
+# Registro das UFs: código IBGE e nome. Campos opcionais:
+# 'dados' (planilha de origem usada quando ainda não há partições),
+# 'geojson' (malha municipal fora do padrão), 'centro' e 'zoom' (posição
+# inicial do mapa; sem eles o mapa se ajusta aos limites da malha)
+ESTADOS = {
+    'AC': {'codigo_ibge': 12, 'nome': 'Acre'},
+    'AL': {'codigo_ibge': 27, 'nome': 'Alagoas'},
+    'AM': {'codigo_ibge': 13, 'nome': 'Amazonas'},
+    'AP': {'codigo_ibge': 16, 'nome': 'Amapá'},
+    'BA': {'codigo_ibge': 29, 'nome': 'Bahia'},
+    'CE': {'codigo_ibge': 23, 'nome': 'Ceará'},
+    'DF': {'codigo_ibge': 53, 'nome': 'Distrito Federal'},
+    'ES': {'codigo_ibge': 32, 'nome': 'Espírito Santo'},
+    'GO': {'codigo_ibge': 52, 'nome': 'Goiás'},
+    'MA': {'codigo_ibge': 21, 'nome': 'Maranhão'},
+    'MG': {'codigo_ibge': 31, 'nome': 'Minas Gerais'},
+    'MS': {'codigo_ibge': 50, 'nome': 'Mato Grosso do Sul'},
+    'MT': {'codigo_ibge': 51, 'nome': 'Mato Grosso'},
+    'PA': {'codigo_ibge': 15, 'nome': 'Pará'},
+    'PB': {'codigo_ibge': 25, 'nome': 'Paraíba'},
+    'PE': {'codigo_ibge': 26, 'nome': 'Pernambuco'},
+    'PI': {
+        'codigo_ibge': 22,
+        'nome': 'Piauí',
+        'dados': DATA_PATH,
+        'geojson': GEOJSON_PATH,
+        'centro': [-7.7183, -42.7289],
+        'zoom': 7
+    },
+    'PR': {'codigo_ibge': 41, 'nome': 'Paraná'},
+    'RJ': {'codigo_ibge': 33, 'nome': 'Rio de Janeiro'},
+    'RN': {'codigo_ibge': 24, 'nome': 'Rio Grande do Norte'},
+    'RO': {'codigo_ibge': 11, 'nome': 'Rondônia'},
+    'RR': {'codigo_ibge': 14, 'nome': 'Roraima'},
+    'RS': {'codigo_ibge': 43, 'nome': 'Rio Grande do Sul'},
+    'SC': {'codigo_ibge': 42, 'nome': 'Santa Catarina'},
+    'SE': {'codigo_ibge': 28, 'nome': 'Sergipe'},
+    'SP': {'codigo_ibge': 35, 'nome': 'São Paulo'},
+    'TO': {'codigo_ibge': 17, 'nome': 'Tocantins'}
+}
@@ -0,0 +1,298 @@
+"""
+Cubo de agregados dos indicadores por (ANO, Macro, Regional)
+
+Os gráficos do dashboard usam apenas médias, desvio padrão e mediana do
+indicador agrupados por ano, macro-região ou regional. Como os filtros do
+dashboard atuam exatamente sobre essas chaves, todas as respostas podem ser
+obtidas somando os agregados dos grupos selecionados, sem reler as linhas.
+"""
+import numpy as np
+import pandas as pd
+
+from ..config import INDICADORES
+from .filter_index import CHAVES_INDICE
+from .schema import widen_indicators
+
+# Número máximo de centróides guardados por grupo no esboço de quantis.
+# Grupos menores que esse limite mantêm todos os valores e a mediana é exata.
+MAX_CENTROIDES = 128
+
+
+def _esboco_quantis(valores, max_centroides=MAX_CENTROIDES):
+    """
+    Resume valores ordenados em centróides (valor médio, peso).
+
+    Args:
+        valores (numpy.ndarray): Valores do grupo, sem NaN
+        max_centroides (int): Número máximo de centróides
+
+    Returns:
+        tuple: (numpy.ndarray, numpy.ndarray) valores e pesos dos centróides
+    """
+    valores = np.sort(valores)
+    if len(valores) <= max_centroides:
+        return valores, np.ones(len(valores))
+
+    blocos = np.array_split(valores, max_centroides)
+    return (
+        np.array([bloco.mean() for bloco in blocos]),
+        np.array([len(bloco) for bloco in blocos], dtype=float)
+    )
+
+
+def _mediana_ponderada(valores, pesos):
+    """
+    Calcula a mediana a partir dos centróides combinados de vários grupos.
+
+    Com pesos unitários o resultado é igual ao de ``pandas.Series.median``:
+    para totais pares, é a média dos dois valores centrais.
+    """
+    if len(valores) == 0:
+        return np.nan
+
+    ordem = np.argsort(valores, kind="stable")
+    valores, acumulado = valores[ordem], np.cumsum(pesos[ordem])
+    total = acumulado[-1]
+
+    def valor_na_posicao(posicao):
+        return valores[np.searchsorted(acumulado, posicao)]
+
+    if total % 2:
+        return float(valor_na_posicao((total + 1) / 2))
+    return float((valor_na_posicao(total / 2) +
+                  valor_na_posicao(total / 2 + 1)) / 2)
+
+
+class IndicatorCube:
+    """
+    Agregados de cada indicador por grupo (ANO, Macro, Regional).
+
+    Para cada grupo e indicador são guardados contagem, soma, soma dos
+    quadrados e um esboço de quantis. Médias, desvio padrão, mediana e
+    tabelas dinâmicas são obtidos somando os grupos, em O(grupos).
+
+    Args:
+        chaves (pandas.DataFrame): Colunas ANO, Macro e Regional de cada grupo
+        estatisticas (dict): Por indicador, arrays ``count``, ``sum`` e
+            ``sumsq`` alinhados às linhas de ``chaves``
+        esbocos (dict): Por indicador, lista de centróides (valores, pesos)
+            alinhada às linhas de ``chaves``
+    """
+
+    def __init__(self, chaves, estatisticas, esbocos):
+        self.chaves = chaves
+        self.estatisticas = estatisticas
+        self.esbocos = esbocos
+
+    @classmethod
+    def from_frame(cls, df, indicadores=None):
+        """
+        Constrói o cubo a partir das linhas do DataFrame.
+
+        Args:
+            df (pandas.DataFrame): DataFrame com os dados
+            indicadores (list, optional): Indicadores a agregar; por padrão,
+                todos os de ``INDICADORES`` presentes em ``df``
+
+        Returns:
+            IndicatorCube: Cubo com os agregados por grupo
+        """
+        if indicadores is None:
+            indicadores = [ind for ind in INDICADORES if ind in df.columns]
+
+        agrupado = df.groupby(
+            CHAVES_INDICE, observed=True, dropna=False, sort=True
+        )
+        posicoes = agrupado.indices
+        chaves = pd.DataFrame(list(posicoes.keys()), columns=CHAVES_INDICE)
+
+        valores_indicadores = widen_indicators(df, indicadores)
+        estatisticas, esbocos = {}, {}
+        for indicador in indicadores:
+            coluna = valores_indicadores[indicador].to_numpy(dtype=float)
+            contagem, soma, soma_q, esboco = [], [], [], []
+            for linhas in posicoes.values():
+                valores = coluna[linhas]
+                valores = valores[~np.isnan(valores)]
+                contagem.append(len(valores))
+                soma.append(valores.sum())
+                soma_q.append(np.square(valores).sum())
+                esboco.append(_esboco_quantis(valores))
+            estatisticas[indicador] = {
+                "count": np.array(contagem, dtype=float),
+                "sum": np.array(soma),
+                "sumsq": np.array(soma_q)
+            }
+            esbocos[indicador] = esboco
+
+        return cls(chaves, estatisticas, esbocos)
+
+    def _take(self, posicoes):
+        """Retorna um cubo com os grupos nas posições informadas."""
+        return IndicatorCube(
+            self.chaves.iloc[posicoes].reset_index(drop=True),
+            {
+                indicador: {nome: valores[posicoes]
+                            for nome, valores in estat.items()}
+                for indicador, estat in self.estatisticas.items()
+            },
+            {
+                indicador: [esboco[i] for i in posicoes]
+                for indicador, esboco in self.esbocos.items()
+            }
+        )
+
+    def replace_years(self, df_anos, anos):
+        """
+        Retorna um novo cubo com os grupos dos anos informados recalculados.
+
+        Apenas as linhas de ``df_anos`` são agregadas; os grupos dos demais
+        anos são reaproveitados sem alteração.
+
+        Args:
+            df_anos (pandas.DataFrame): Todas as linhas dos anos afetados
+            anos (iterable): Anos substituídos (anos sem linhas em ``df_anos``
+                são removidos)
+
+        Returns:
+            IndicatorCube: Cubo do conjunto de dados atualizado
+        """
+        anos = {int(ano) for ano in anos}
+        mantidos = self._take(
+            np.flatnonzero(~self.chaves["ANO"].isin(anos).to_numpy())
+        )
+        novos = IndicatorCube.from_frame(
+            df_anos[df_anos["ANO"].isin(anos)],
+            indicadores=list(self.estatisticas)
+        )
+
+        chaves = pd.concat([mantidos.chaves, novos.chaves],
+                           ignore_index=True)
+        estatisticas, esbocos = {}, {}
+        for indicador, estat in mantidos.estatisticas.items():
+            estatisticas[indicador] = {
+                nome: np.concatenate(
+                    [valores, novos.estatisticas[indicador][nome]]
+                )
+                for nome, valores in estat.items()
+            }
+            esbocos[indicador] = (mantidos.esbocos[indicador] +
+                                  novos.esbocos[indicador])
+
+        combinado = IndicatorCube(chaves, estatisticas, esbocos)
+        ordem = chaves.sort_values(CHAVES_INDICE, kind="stable").index
+        return combinado._take(ordem.to_numpy())
+
+    def filter(self, ano_inicio, ano_fim, macro_selecionada="Todas",
+               regional_selecionada="Todas"):
+        """
+        Seleciona os grupos que atendem aos filtros do dashboard.
+
+        Args:
+            ano_inicio (int): Ano inicial do filtro
+            ano_fim (int): Ano final do filtro
+            macro_selecionada (str): Macro região selecionada
+            regional_selecionada (str): Regional selecionada
+
+        Returns:
+            IndicatorCube: Cubo apenas com os grupos selecionados
+        """
+        mascara = self.chaves["ANO"].between(ano_inicio, ano_fim)
+        if macro_selecionada != "Todas":
+            mascara &= self.chaves["Macro"] == macro_selecionada
+        if regional_selecionada != "Todas":
+            mascara &= self.chaves["Regional"] == regional_selecionada
+
+        return self._take(np.flatnonzero(mascara.to_numpy()))
+
+    @property
+    def empty(self):
+        """Indica se o cubo não possui grupos."""
+        return self.chaves.empty
+
+    def _totais(self, indicador):
+        """Retorna contagem, soma e soma dos quadrados de todos os grupos."""
+        estat = self.estatisticas[indicador]
+        return estat["count"].sum(), estat["sum"].sum(), estat["sumsq"].sum()
+
+    def mean(self, indicador):
+        """
+        Retorna a média do indicador nos grupos do cubo.
+
+        Args:
+            indicador (str): Nome do indicador
+
+        Returns:
+            float: Média do indicador (NaN se não houver valores)
+        """
+        contagem, soma, _ = self._totais(indicador)
+        return soma / contagem if contagem else np.nan
+
+    def std(self, indicador):
+        """
+        Retorna o desvio padrão amostral (ddof=1) do indicador.
+
+        Args:
+            indicador (str): Nome do indicador
+
+        Returns:
+            float: Desvio padrão (NaN com menos de dois valores)
+        """
+        contagem, soma, soma_q = self._totais(indicador)
+        if contagem < 2:
+            return np.nan
+        variancia = (soma_q - soma * soma / contagem) / (contagem - 1)
+        return float(np.sqrt(max(variancia, 0.0)))
+
+    def median(self, indicador):
+        """
+        Retorna a mediana do indicador a partir dos esboços de quantis.
+
+        Args:
+            indicador (str): Nome do indicador
+
+        Returns:
+            float: Mediana (exata enquanto os grupos cabem no esboço)
+        """
+        esbocos = self.esbocos[indicador]
+        if not esbocos:
+            return np.nan
+        valores = np.concatenate([valores for valores, _ in esbocos])
+        pesos = np.concatenate([pesos for _, pesos in esbocos])
+        return _mediana_ponderada(valores, pesos)
+
+    def mean_by(self, indicador, niveis):
+        """
+        Retorna a média do indicador agrupada pelas chaves informadas.
+
+        Args:
+            indicador (str): Nome do indicador
+            niveis (list): Chaves de agrupamento (ANO, Macro e/ou Regional)
+
+        Returns:
+            pandas.Series: Médias indexadas pelas chaves, em ordem crescente
+        """
+        estat = self.estatisticas[indicador]
+        somas = self.chaves[niveis].assign(
+            count=estat["count"], sum=estat["sum"]
+        ).groupby(niveis, observed=True, sort=True)[["count", "sum"]].sum()
+        media = somas["sum"] / somas["count"]
+        media.name = indicador
+        return media
+
+    def pivot_mean(self, indicador, index="Regional", columns="ANO"):
+        """
+        Retorna a tabela dinâmica de médias, como ``pivot_table``.
+
+        Args:
+            indicador (str): Nome do indicador
+            index (str): Chave das linhas
+            columns (str): Chave das colunas
+
+        Returns:
+            pandas.DataFrame: Médias com ``index`` nas linhas e ``columns``
+            nas colunas
+        """
+        media = self.mean_by(indicador, [index, columns]).dropna()
+        tabela = media.unstack(columns)
+        return tabela.dropna(axis=1, how="all")
@@ -0,0 +1,208 @@
+"""
+Índice de filtros pré-calculado para os dados de saúde materna
+"""
+import numpy as np
+import pandas as pd
+
+from .schema import apply_column_types
+from .store import dataset_fingerprint
+
+# Colunas usadas como chave do índice, na ordem das tuplas armazenadas
+CHAVES_INDICE = ['ANO', 'Macro', 'Regional']
+
+
+def _agrupar_posicoes(df):
+    """Retorna as posições das linhas de cada chave (ANO, Macro, Regional)."""
+    grupos = df.groupby(
+        CHAVES_INDICE,
+        observed=True,
+        dropna=False,
+        sort=True
+    ).indices
+    return {
+        chave: np.asarray(posicoes, dtype=np.intp)
+        for chave, posicoes in grupos.items()
+    }
+
+
+def _ordem_chave(item):
+    """Ordena chaves do índice com valores ausentes por último."""
+    return tuple(
+        (pd.isna(valor), "" if pd.isna(valor) else valor)
+        for valor in item[0]
+    )
+
+
+class FilterIndex:
+    """
+    Guarda as posições das linhas de cada combinação (ANO, Macro, Regional).
+
+    O índice é construído uma única vez por conjunto de dados carregado.
+    Qualquer combinação de filtros vira a união das posições dos grupos
+    que atendem aos critérios, seguida de um único ``take`` no DataFrame,
+    sem cópia defensiva nem varredura das colunas a cada execução.
+
+    Args:
+        df (pandas.DataFrame): DataFrame com os dados carregados
+        posicoes (dict, optional): Posições já calculadas por chave; por
+            padrão, são obtidas agrupando ``df``
+
+    Attributes:
+        fingerprint (str): Impressão digital do conteúdo de ``df``, usada
+            como versão do conjunto de dados nas chaves de cache
+    """
+
+    def __init__(self, df, posicoes=None):
+        self.df = df
+        self.fingerprint = dataset_fingerprint(df)
+        self._posicoes = (_agrupar_posicoes(df) if posicoes is None
+                          else posicoes)
+
+    def replace_years(self, df_anos, anos):
+        """
+        Retorna um novo índice com as linhas dos anos informados substituídas.
+
+        Apenas as linhas de ``df_anos`` são agrupadas; as posições dos demais
+        anos são remapeadas sem reagrupar o conjunto de dados. As linhas
+        ficam na ordem de ``load_state_dataset`` (por ano, na ordem de cada
+        partição), de modo que a impressão digital é a mesma de uma carga
+        completa dos mesmos dados. O índice atual não é alterado, para que
+        continue servindo as sessões em andamento.
+
+        Args:
+            df_anos (pandas.DataFrame): Todas as linhas dos anos afetados
+            anos (iterable): Anos substituídos (anos sem linhas em ``df_anos``
+                são removidos)
+
+        Returns:
+            FilterIndex: Índice do conjunto de dados atualizado
+        """
+        anos = {int(ano) for ano in anos}
+        manter = ~self.df['ANO'].isin(anos).to_numpy()
+        # Posição de cada linha mantida no novo DataFrame
+        nova_posicao = np.cumsum(manter) - 1
+        total_mantido = int(manter.sum())
+
+        posicoes = {
+            chave: nova_posicao[linhas]
+            for chave, linhas in self._posicoes.items()
+            if chave[0] not in anos
+        }
+        df_anos = df_anos[df_anos['ANO'].isin(anos)]
+        for chave, linhas in _agrupar_posicoes(df_anos).items():
+            posicoes[chave] = linhas + total_mantido
+
+        df = pd.concat([self.df[manter], df_anos], ignore_index=True)
+        # Reordena por ano, como na leitura das partições: a impressão
+        # digital (e as chaves de cache) não dependem da ordem das trocas
+        ordem = np.argsort(df['ANO'].to_numpy(), kind='stable')
+        destino = np.empty_like(ordem)
+        destino[ordem] = np.arange(len(ordem))
+        posicoes = dict(sorted(
+            ((chave, destino[linhas]) for chave, linhas in posicoes.items()),
+            key=_ordem_chave
+        ))
+
+        df = apply_column_types(df.take(ordem).reset_index(drop=True))
+        return FilterIndex(df, posicoes)
+
+    def _chaves(self, ano_inicio=None, ano_fim=None, macro="Todas",
+                regional="Todas"):
+        """Retorna as chaves do índice que atendem aos filtros."""
+        for chave in self._posicoes:
+            ano, macro_chave, regional_chave = chave
+            if ano_inicio is not None and ano < ano_inicio:
+                continue
+            if ano_fim is not None and ano > ano_fim:
+                continue
+            if macro != "Todas" and macro_chave != macro:
+                continue
+            if regional != "Todas" and regional_chave != regional:
+                continue
+            yield chave
+
+    def positions(self, ano_inicio, ano_fim, macro_selecionada="Todas",
+                  regional_selecionada="Todas"):
+        """
+        Retorna as posições das linhas que atendem aos filtros.
+
+        Args:
+            ano_inicio (int): Ano inicial do filtro
+            ano_fim (int): Ano final do filtro
+            macro_selecionada (str): Macro região selecionada
+            regional_selecionada (str): Regional selecionada
+
+        Returns:
+            numpy.ndarray: Posições ordenadas das linhas selecionadas
+        """
+        selecionadas = [
+            self._posicoes[chave]
+            for chave in self._chaves(ano_inicio, ano_fim,
+                                      macro_selecionada, regional_selecionada)
+        ]
+        if not selecionadas:
+            return np.empty(0, dtype=np.intp)
+        # A ordenação preserva a ordem original das linhas
+        return np.sort(np.concatenate(selecionadas))
+
+    def filter(self, ano_inicio, ano_fim, macro_selecionada="Todas",
+               regional_selecionada="Todas"):
+        """
+        Filtra os dados usando as posições pré-calculadas.
+
+        Args:
+            ano_inicio (int): Ano inicial do filtro
+            ano_fim (int): Ano final do filtro
+            macro_selecionada (str): Macro região selecionada
+            regional_selecionada (str): Regional selecionada
+
+        Returns:
+            pandas.DataFrame: DataFrame filtrado
+        """
+        return self.df.take(self.positions(
+            ano_inicio, ano_fim, macro_selecionada, regional_selecionada
+        ))
+
+    def years(self):
+        """
+        Retorna os anos disponíveis no índice.
+
+        Returns:
+            list: Lista de anos disponíveis ordenados
+        """
+        return sorted({chave[0] for chave in self._posicoes})
+
+    def macros(self, ano_inicio=None, ano_fim=None):
+        """
+        Retorna as macro regiões disponíveis, opcionalmente por período.
+
+        Args:
+            ano_inicio (int, optional): Ano inicial do filtro
+            ano_fim (int, optional): Ano final do filtro
+
+        Returns:
+            list: Lista de macro regiões ordenadas
+        """
+        return sorted({
+            chave[1] for chave in self._chaves(ano_inicio, ano_fim)
+            if not pd.isna(chave[1])
+        })
+
+    def regionals(self, ano_inicio=None, ano_fim=None,
+                  macro_selecionada="Todas"):
+        """
+        Retorna as regionais disponíveis para o período e a macro região.
+
+        Args:
+            ano_inicio (int, optional): Ano inicial do filtro
+            ano_fim (int, optional): Ano final do filtro
+            macro_selecionada (str): Macro região selecionada
+
+        Returns:
+            list: Lista de regionais ordenadas
+        """
+        return sorted({
+            chave[2]
+            for chave in self._chaves(ano_inicio, ano_fim, macro_selecionada)
+            if not pd.isna(chave[2])
+        })
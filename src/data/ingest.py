@@ -0,0 +1,374 @@
+"""
+Ingestão em blocos de planilhas e extratos grandes
+
+Extratos nacionais (dezenas de milhões de linhas) não cabem na leitura de
+uma só vez feita por ``pd.read_excel``. Este módulo lê a fonte em blocos
+(Excel via openpyxl em modo somente leitura, CSV ou Parquet), reduz cada
+bloco ao grão do dashboard e grava o resultado nas partições por UF e ano:
+
+1. cada bloco é agrupado por (ANO, MUN, Macro, Regional) e, quando houver,
+   pelo quadrimestre; de cada indicador guardam-se a soma e a contagem de
+   valores, gravadas em um arquivo Parquet temporário por ano, bloco a
+   bloco;
+2. ao final, as somas parciais de cada ano são lidas de volta em lotes de
+   ``linhas_por_bloco`` linhas e acumuladas lote a lote (um grupo pode
+   aparecer em vários blocos); o acumulado é dividido pelas contagens e o
+   ano é gravado nas partições dos estados.
+
+A memória usada é limitada pelo tamanho do bloco e pelo número de linhas
+de um ano no grão final (o acumulado), independentemente do tamanho da
+fonte.
+
+Uso pela linha de comando::
+
+    python -m src.data.ingest caminho/extrato.csv [--linhas 200000]
+    python -m src.data.ingest caminho/planilha.xlsx --uf PI
+"""
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ..config import INDICADORES
+from .refresh import COLUNA_PERIODO
+from .registry import state_codes, state_for_code, write_state_partitions
+from .schema import apply_column_types
+
+# Grão do dashboard: cada linha gravada é um município em um ano (e
+# quadrimestre, quando a fonte o informa)
+GRAO = ['ANO', 'MUN', 'Macro', 'Regional']
+
+# Atributos do município, mantidos do primeiro registro de cada grupo
+ATRIBUTOS = ['COD7_MUN', 'COD6_MUN', 'MUN_RES1', 'LON_RES', 'LAT_RES']
+
+# Colunas inteiras e numéricas entre as chaves e os atributos
+COLUNAS_INTEIRAS = ['ANO', 'COD7_MUN', 'COD6_MUN']
+COLUNAS_REAIS = ['LON_RES', 'LAT_RES']
+
+# Linhas lidas da fonte por bloco
+LINHAS_POR_BLOCO = 100_000
+
+# Sufixos das colunas parciais de cada indicador
+SUFIXO_SOMA = '__soma'
+SUFIXO_CONTAGEM = '__contagem'
+
+
+def _blocos_excel(caminho, linhas_por_bloco, aba=None):
+    """Lê uma planilha em modo somente leitura, produzindo DataFrames."""
+    from openpyxl import load_workbook
+
+    pasta = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        planilha = pasta[aba] if aba else pasta.worksheets[0]
+        linhas = planilha.iter_rows(values_only=True)
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            return
+        colunas = [str(nome) for nome in cabecalho]
+        bloco = []
+        for linha in linhas:
+            bloco.append(linha)
+            if len(bloco) >= linhas_por_bloco:
+                yield pd.DataFrame(bloco, columns=colunas)
+                bloco = []
+        if bloco:
+            yield pd.DataFrame(bloco, columns=colunas)
+    finally:
+        pasta.close()
+
+
+def _blocos_parquet(caminho, linhas_por_bloco):
+    """Lê um arquivo Parquet em lotes de linhas."""
+    arquivo = pq.ParquetFile(caminho)
+    for lote in arquivo.iter_batches(batch_size=linhas_por_bloco):
+        yield lote.to_pandas()
+
+
+def read_blocks(caminho, linhas_por_bloco=LINHAS_POR_BLOCO, aba=None):
+    """
+    Lê uma tabela de indicadores em blocos, pela extensão do arquivo.
+
+    Args:
+        caminho (str): Planilha Excel, CSV ou Parquet
+        linhas_por_bloco (int): Número máximo de linhas de cada bloco
+        aba (str, optional): Aba da planilha; por padrão, a primeira
+
+    Returns:
+        iterator: DataFrames com até ``linhas_por_bloco`` linhas
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == '.csv':
+        return iter(pd.read_csv(caminho, chunksize=linhas_por_bloco))
+    if extensao == '.parquet':
+        return _blocos_parquet(caminho, linhas_por_bloco)
+    return _blocos_excel(caminho, linhas_por_bloco, aba)
+
+
+def _colunas_grao(colunas):
+    """Retorna as chaves de agrupamento presentes na fonte."""
+    ausentes = [coluna for coluna in GRAO if coluna not in colunas]
+    if ausentes:
+        raise ValueError(f"Colunas obrigatórias ausentes: {ausentes}")
+    if COLUNA_PERIODO in colunas:
+        return GRAO + [COLUNA_PERIODO]
+    return list(GRAO)
+
+
+def _normalizar(bloco, chaves, atributos, indicadores):
+    """Ajusta os tipos de um bloco para que todos tenham o mesmo esquema."""
+    bloco = bloco[chaves + atributos + indicadores].copy()
+    for coluna in chaves + atributos:
+        if coluna in COLUNAS_INTEIRAS:
+            bloco[coluna] = pd.to_numeric(
+                bloco[coluna], errors='coerce'
+            ).astype('Int64')
+        elif coluna in COLUNAS_REAIS:
+            bloco[coluna] = pd.to_numeric(bloco[coluna], errors='coerce')
+        else:
+            bloco[coluna] = bloco[coluna].astype('string')
+    for coluna in indicadores:
+        bloco[coluna] = pd.to_numeric(bloco[coluna], errors='coerce')
+    return bloco.dropna(subset=chaves)
+
+
+def reduce_block(bloco, chaves, atributos, indicadores):
+    """
+    Reduz um bloco às somas e contagens parciais de cada grupo.
+
+    Args:
+        bloco (pandas.DataFrame): Linhas lidas da fonte
+        chaves (list): Colunas do grão
+        atributos (list): Atributos do município mantidos do primeiro
+            registro de cada grupo
+        indicadores (list): Colunas de indicadores
+
+    Returns:
+        pandas.DataFrame: Uma linha por grupo, com os atributos e as
+        colunas ``<indicador>__soma`` e ``<indicador>__contagem``
+    """
+    bloco = _normalizar(bloco, chaves, atributos, indicadores)
+    grupos = bloco.groupby(chaves, sort=False, dropna=False)
+    partes = [grupos[atributos].first()] if atributos else []
+    somas = grupos[indicadores].sum(min_count=1)
+    contagens = grupos[indicadores].count()
+    partes.append(somas.add_suffix(SUFIXO_SOMA).astype('float64'))
+    partes.append(contagens.add_suffix(SUFIXO_CONTAGEM).astype('int64'))
+    return pd.concat(partes, axis=1).reset_index()
+
+
+def merge_partials(parciais, chaves, atributos, indicadores):
+    """
+    Soma as parciais de um mesmo grupo, mantendo o formato parcial.
+
+    Aplicada ao acumulado concatenado com um novo lote, permite combinar
+    as parciais de um ano lote a lote.
+
+    Args:
+        parciais (pandas.DataFrame): Saídas de ``reduce_block`` (ou desta
+            função) concatenadas na ordem de leitura
+        chaves (list): Colunas do grão
+        atributos (list): Atributos do município
+        indicadores (list): Colunas de indicadores
+
+    Returns:
+        pandas.DataFrame: Uma linha por grupo, com os atributos do primeiro
+        registro e as somas e contagens de cada indicador
+    """
+    grupos = parciais.groupby(chaves, sort=False, dropna=False)
+    partes = [grupos[atributos].first()] if atributos else []
+    partes.append(grupos[[f"{c}{SUFIXO_SOMA}" for c in indicadores]].sum(
+        min_count=1))
+    partes.append(grupos[[f"{c}{SUFIXO_CONTAGEM}" for c in indicadores]]
+                  .sum())
+    return pd.concat(partes, axis=1).reset_index()
+
+
+def combine_partials(parciais, chaves, atributos, indicadores):
+    """
+    Combina somas parciais de vários blocos nas médias finais.
+
+    Args:
+        parciais (pandas.DataFrame): Saídas de ``reduce_block`` ou de
+            ``merge_partials`` concatenadas na ordem de leitura
+        chaves (list): Colunas do grão
+        atributos (list): Atributos do município
+        indicadores (list): Colunas de indicadores
+
+    Returns:
+        pandas.DataFrame: Uma linha por grupo, com a média de cada
+        indicador (nula quando o grupo não tem valores)
+    """
+    grupos = parciais.groupby(chaves, sort=True, dropna=False)
+    resultado = grupos[atributos].first() if atributos else None
+    somas = grupos[[f"{c}{SUFIXO_SOMA}" for c in indicadores]].sum(
+        min_count=1)
+    contagens = grupos[[f"{c}{SUFIXO_CONTAGEM}" for c in indicadores]].sum()
+
+    medias = pd.DataFrame(index=somas.index)
+    for coluna in indicadores:
+        contagem = contagens[f"{coluna}{SUFIXO_CONTAGEM}"]
+        medias[coluna] = (somas[f"{coluna}{SUFIXO_SOMA}"] /
+                          contagem.where(contagem > 0))
+    if resultado is not None:
+        medias = resultado.join(medias)
+    return medias.reset_index()
+
+
+def _esquema_parcial(chaves, atributos, indicadores):
+    """Esquema Arrow fixo das somas parciais gravadas no arquivo temporário."""
+    campos = []
+    for coluna in chaves + atributos:
+        if coluna in COLUNAS_INTEIRAS:
+            campos.append(pa.field(coluna, pa.int64()))
+        elif coluna in COLUNAS_REAIS:
+            campos.append(pa.field(coluna, pa.float64()))
+        else:
+            campos.append(pa.field(coluna, pa.string()))
+    for coluna in indicadores:
+        campos.append(pa.field(f"{coluna}{SUFIXO_SOMA}", pa.float64()))
+    for coluna in indicadores:
+        campos.append(pa.field(f"{coluna}{SUFIXO_CONTAGEM}", pa.int64()))
+    return pa.schema(campos)
+
+
+def _acumular_ano(caminho_parcial, linhas_por_bloco, chaves, atributos,
+                  indicadores):
+    """Combina as parciais de um ano lendo o arquivo em lotes limitados."""
+    acumulado = None
+    arquivo = pq.ParquetFile(caminho_parcial)
+    for lote in arquivo.iter_batches(batch_size=linhas_por_bloco):
+        parcial = lote.to_pandas()
+        if acumulado is not None:
+            parcial = pd.concat([acumulado, parcial], ignore_index=True)
+        acumulado = merge_partials(parcial, chaves, atributos, indicadores)
+    return combine_partials(acumulado, chaves, atributos, indicadores)
+
+
+def _gravar_ano(df_ano, colunas, sigla):
+    """Grava um ano já reduzido nas partições de cada estado."""
+    df_ano = apply_column_types(df_ano[colunas])
+    ano = int(df_ano['ANO'].iloc[0])
+    if sigla is not None:
+        return {sigla: write_state_partitions(df_ano, sigla, [ano])}
+
+    gravados = {}
+    for codigo, df_estado in df_ano.groupby(state_codes(df_ano), sort=True):
+        sigla_estado = state_for_code(codigo)
+        if sigla_estado is None:
+            raise ValueError(f"UF com código IBGE {codigo} não registrada.")
+        gravados[sigla_estado] = write_state_partitions(
+            df_estado.reset_index(drop=True), sigla_estado, [ano]
+        )
+    return gravados
+
+
+def ingest(caminho, sigla=None, linhas_por_bloco=LINHAS_POR_BLOCO, aba=None,
+           diretorio_temporario=None):
+    """
+    Ingere uma fonte grande em blocos e grava as partições por UF e ano.
+
+    Os anos presentes na fonte substituem as partições existentes desses
+    anos; os demais anos não são alterados.
+
+    Args:
+        caminho (str): Planilha Excel, CSV ou Parquet
+        sigla (str, optional): UF de todas as linhas; quando omitida, é
+            obtida da coluna ``UF`` ou de ``COD7_MUN``
+        linhas_por_bloco (int): Linhas lidas da fonte por bloco
+        aba (str, optional): Aba da planilha
+        diretorio_temporario (str, optional): Onde gravar as somas
+            parciais; por padrão, o diretório temporário do sistema
+
+    Returns:
+        dict: Linhas lidas e gravadas, blocos, anos e partições por UF
+
+    Raises:
+        ValueError: Se faltarem colunas do grão ou se a fonte estiver vazia
+    """
+    linhas_lidas = blocos = 0
+    colunas = chaves = atributos = indicadores = None
+
+    with tempfile.TemporaryDirectory(dir=diretorio_temporario) as temporario:
+        # Um arquivo de parciais por ano, combinado separadamente ao final
+        escritores = {}
+        try:
+            for bloco in read_blocks(caminho, linhas_por_bloco, aba):
+                if chaves is None:
+                    chaves = _colunas_grao(bloco.columns)
+                    atributos = [c for c in ATRIBUTOS if c in bloco.columns]
+                    indicadores = [c for c in INDICADORES
+                                   if c in bloco.columns]
+                    # Ordem das colunas de saída: a mesma da fonte
+                    colunas = [c for c in bloco.columns
+                               if c in chaves + atributos + indicadores]
+                    esquema = _esquema_parcial(chaves, atributos,
+                                               indicadores)
+
+                linhas_lidas += len(bloco)
+                blocos += 1
+                parcial = reduce_block(bloco, chaves, atributos, indicadores)
+                for ano, parcial_ano in parcial.groupby('ANO', sort=False):
+                    ano = int(ano)
+                    if ano not in escritores:
+                        escritores[ano] = pq.ParquetWriter(
+                            os.path.join(temporario,
+                                         f'parciais-{ano}.parquet'),
+                            esquema
+                        )
+                    escritores[ano].write_table(pa.Table.from_pandas(
+                        parcial_ano, schema=esquema, preserve_index=False
+                    ))
+        finally:
+            for escritor in escritores.values():
+                escritor.close()
+
+        anos = sorted(escritores)
+        if not anos:
+            raise ValueError(f"Nenhuma linha válida em {caminho}.")
+
+        linhas_gravadas = 0
+        particoes = {}
+        for ano in anos:
+            df_ano = _acumular_ano(
+                os.path.join(temporario, f'parciais-{ano}.parquet'),
+                linhas_por_bloco, chaves, atributos, indicadores
+            )
+            linhas_gravadas += len(df_ano)
+            for sigla_estado, arquivos in _gravar_ano(
+                    df_ano, colunas, sigla).items():
+                particoes.setdefault(sigla_estado, []).extend(arquivos)
+
+    return {
+        "linhas_lidas": linhas_lidas,
+        "linhas_gravadas": linhas_gravadas,
+        "blocos": blocos,
+        "anos": anos,
+        "particoes": particoes
+    }
+
+
+def main(argv=None):
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(
+        description="Ingere uma planilha ou extrato grande em blocos."
+    )
+    parser.add_argument("arquivo", help="planilha Excel, CSV ou Parquet")
+    parser.add_argument("--uf", help="sigla da UF de todas as linhas")
+    parser.add_argument("--linhas", type=int, default=LINHAS_POR_BLOCO,
+                        help="linhas por bloco "
+                             f"(padrão: {LINHAS_POR_BLOCO})")
+    parser.add_argument("--aba", help="aba da planilha (padrão: primeira)")
+    args = parser.parse_args(argv)
+
+    resumo = ingest(args.arquivo, args.uf, args.linhas, args.aba)
+    print(f"{resumo['linhas_lidas']} linhas lidas em {resumo['blocos']} "
+          f"blocos; {resumo['linhas_gravadas']} linhas gravadas")
+    for sigla, arquivos in resumo['particoes'].items():
+        print(f"{sigla}: {len(arquivos)} partições")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,30 +1,168 @@
 """
 Módulo para carregamento e processamento de dados
 """
-import pandas as pd
+import os
+import weakref
+
 import streamlit as st
 
-from ..config import DATA_PATH
+from ..config import (CACHE_CONFIG, ESTADO_PADRAO, ESTADOS, PARTITIONS_DIR,
+                      SHARED_DIR)
+from ..utils.file_watch import FileWatcher
+from .registry import get_state
+from .refresh import LiveDataset
+from .schema import widen_indicators
+
+# Dados de estado atualmente em cache; entradas descartadas pelo cache
+# saem daqui automaticamente
+_DADOS_ATIVOS = weakref.WeakValueDictionary()
 
 
-@st.cache_data
-def load_data():
+@st.cache_resource(max_entries=CACHE_CONFIG['state_max_entries'])
+def load_live_dataset(estado=ESTADO_PADRAO):
     """
-    Carrega os dados do arquivo Excel e armazena em cache.
+    Carrega os dados de um estado uma única vez por processo, compartilhados
+    entre todas as sessões e atualizados por partição quando mudam.
+
+    Apenas os estados efetivamente exibidos são carregados; os usados há
+    mais tempo são descartados ao exceder o limite de
+    ``CACHE_CONFIG['state_max_entries']`` estados.
+
+    Args:
+        estado (str): Sigla da UF
 
     Returns:
-        pandas.DataFrame: DataFrame com os dados carregados ou None em caso de erro
+        LiveDataset: Dados do estado ou None em caso de erro
     """
     try:
-        df = pd.read_excel(DATA_PATH)
-        return df
+        dados = LiveDataset(estado)
     except Exception as e:
         st.error(f"Erro ao carregar os dados: {str(e)}")
         return None
+    _DADOS_ATIVOS[estado] = dados
+    return dados
+
+
+def load_snapshot(estado=ESTADO_PADRAO):
+    """
+    Retorna a versão corrente dos dados de um estado.
+
+    Uma execução do script deve usar uma única versão, para que índice,
+    cubo e chaves de cache sejam sempre consistentes entre si. Se a
+    atualização falhar, a versão anterior continua sendo servida.
+
+    Args:
+        estado (str): Sigla da UF
+
+    Returns:
+        DatasetSnapshot: Índice de filtros e cubo da versão ou None em caso
+        de erro
+    """
+    dados = load_live_dataset(estado)
+    if dados is None:
+        return None
+    try:
+        return dados.snapshot()
+    except Exception as e:
+        st.warning(f"Não foi possível atualizar os dados: {str(e)}")
+        return dados.current
+
+
+def load_filter_index(estado=ESTADO_PADRAO):
+    """
+    Retorna o índice de filtros da versão corrente dos dados de um estado.
+
+    Args:
+        estado (str): Sigla da UF
+
+    Returns:
+        FilterIndex: Índice com os dados carregados ou None em caso de erro
+    """
+    versao = load_snapshot(estado)
+    return None if versao is None else versao.indice
+
+
+def load_indicator_cube(estado=ESTADO_PADRAO):
+    """
+    Retorna o cubo de agregados da versão corrente dos dados de um estado.
+
+    Args:
+        estado (str): Sigla da UF
+
+    Returns:
+        IndicatorCube: Cubo de agregados ou None em caso de erro
+    """
+    versao = load_snapshot(estado)
+    return None if versao is None else versao.cubo
+
+
+def _prewarm(caminhos):
+    """
+    Atualiza, em segundo plano, os dados e malhas afetados por arquivos
+    alterados, antes que alguma sessão precise deles.
+    """
+    for estado, dados in list(_DADOS_ATIVOS.items()):
+        try:
+            dados.snapshot()
+        except Exception:
+            # A falha é exibida à próxima sessão que carregar o estado
+            continue
+
+        caminho_geojson = os.path.abspath(get_state(estado)['geojson'])
+        if caminho_geojson in caminhos:
+            from ..utils.geometry import load_geojson, resolve_geojson_path
+            try:
+                load_geojson(resolve_geojson_path(
+                    caminho_geojson, zoom=get_state(estado)['zoom']
+                ))
+            except (OSError, ValueError):
+                continue
+
+
+@st.cache_resource
+def start_data_watcher():
+    """
+    Inicia, uma única vez por processo, a observação dos arquivos de dados.
+
+    Quando planilhas, partições, malhas ou publicações no diretório
+    compartilhado mudam, os dados dos estados em cache são atualizados e as
+    malhas alteradas são relidas em segundo plano. Apenas as planilhas e
+    malhas do registro de estados, as partições e o diretório compartilhado
+    são observados: as saídas geradas pelo app (artefatos, ladrilhos e
+    documentos publicados) não disparam atualizações. Desativada por
+    ``CACHE_CONFIG['watch_data_files']``.
+
+    Returns:
+        FileWatcher: Observador iniciado ou None se desativado
+    """
+    if not CACHE_CONFIG.get('watch_data_files', False):
+        return None
+    # Criado aqui para ser observado mesmo antes da primeira carga
+    os.makedirs(PARTITIONS_DIR, exist_ok=True)
+    diretorios = [PARTITIONS_DIR]
+    if SHARED_DIR:
+        diretorios.append(SHARED_DIR)
+    arquivos = [
+        caminho
+        for estado in map(get_state, ESTADOS)
+        for caminho in (estado['dados'], estado['geojson'])
+        if caminho
+    ]
+    observador = FileWatcher(
+        diretorios,
+        _prewarm,
+        atraso=CACHE_CONFIG['watch_debounce_seconds'],
+        arquivos=arquivos
+    )
+    try:
+        iniciado = observador.start()
+    except (ImportError, OSError):
+        iniciado = False
+    return observador if iniciado else None
 
 
 def filter_data(df, ano_inicio, ano_fim, macro_selecionada="Todas",
-                regional_selecionada="Todas"):
+                regional_selecionada="Todas", index=None):
     """
     Filtra os dados com base nos parâmetros fornecidos.
 
@@ -34,23 +172,28 @@ def filter_data(df, ano_inicio, ano_fim, macro_selecionada="Todas",
         ano_fim (int): Ano final do filtro
         macro_selecionada (str): Macro região selecionada
         regional_selecionada (str): Regional selecionada
+        index (FilterIndex, optional): Índice pré-calculado de ``df``; quando
+            informado, o filtro é resolvido pelas posições do índice
 
     Returns:
-        pandas.DataFrame: DataFrame filtrado
+        pandas.DataFrame: DataFrame filtrado, com os indicadores em float64
+        (``widen_indicators``)
     """
-    df_filtrado = df.copy()
+    if index is not None and index.df is df:
+        return widen_indicators(index.filter(
+            ano_inicio, ano_fim, macro_selecionada, regional_selecionada
+        ))
 
-    # Aplicando filtros
-    df_filtrado = df_filtrado[df_filtrado['ANO'].between(ano_inicio, ano_fim)]
+    # Combina os filtros em uma única máscara, sem copiar o DataFrame
+    mascara = df['ANO'].between(ano_inicio, ano_fim)
 
     if macro_selecionada != "Todas":
-        df_filtrado = df_filtrado[df_filtrado['Macro'] == macro_selecionada]
+        mascara &= df['Macro'] == macro_selecionada
 
     if regional_selecionada != "Todas":
-        df_filtrado = df_filtrado[df_filtrado['Regional']
-                                  == regional_selecionada]
+        mascara &= df['Regional'] == regional_selecionada
 
-    return df_filtrado
+    return widen_indicators(df[mascara])
 
 
 def get_available_years(df):
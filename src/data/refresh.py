@@ -0,0 +1,336 @@
+"""
+Atualização incremental dos dados com troca atômica de versão
+
+Novos dados chegam como um arquivo delta com linhas (ANO, MUN). O delta é
+validado, mesclado apenas às partições dos anos afetados e gravado sem
+reescrever os demais anos. A substituição vale por (ANO, MUN, Quadrimestre),
+quando há quadrimestre: linhas já existentes são atualizadas e as novas são
+acrescentadas.
+
+Em execução, cada estado é servido por um ``LiveDataset``: as sessões leem
+sempre uma versão completa (índice de filtros e cubo) e, quando as partições
+mudam, uma única sessão reconstrói somente os anos alterados enquanto as
+demais continuam na versão anterior, até a troca atômica da referência.
+
+Uso pela linha de comando::
+
+    python -m src.data.refresh caminho/delta.csv [--uf PI]
+"""
+import argparse
+import threading
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from ..config import ESTADO_PADRAO, INDICADORES, SHARED_DIR
+from .aggregation import IndicatorCube
+from .filter_index import CHAVES_INDICE, FilterIndex
+from .registry import (load_state_dataset, partition_path,
+                       partition_signatures, partitions_are_fresh,
+                       write_state_partitions)
+from .schema import apply_column_types, validate_columns
+from .shared import load_shared_dataset, publish_dataset, shared_signature
+from .store import read_table
+
+# Colunas que identificam uma linha do conjunto de dados
+CHAVES_LINHA = ['ANO', 'MUN']
+
+# Coluna que subdivide o ano, quando presente nos dados
+COLUNA_PERIODO = 'Quadrimestre'
+
+
+def _chaves_linha(df):
+    """Retorna as colunas que identificam cada linha de ``df``."""
+    if COLUNA_PERIODO in df.columns:
+        return CHAVES_LINHA + [COLUNA_PERIODO]
+    return CHAVES_LINHA
+
+
+def validate_delta(delta, colunas=None):
+    """
+    Valida um delta de dados e ajusta seus tipos.
+
+    Args:
+        delta (pandas.DataFrame): Linhas novas ou atualizadas
+        colunas (list, optional): Colunas do conjunto de dados armazenado;
+            o delta não pode ter colunas fora dessa lista, e as ausentes
+            são preenchidas com valores nulos
+
+    Returns:
+        pandas.DataFrame: Delta com as colunas na ordem armazenada e tipado
+
+    Raises:
+        ValueError: Se o delta for inconsistente
+    """
+    obrigatorias = list(dict.fromkeys(CHAVES_LINHA + CHAVES_INDICE))
+    ausentes = [coluna for coluna in obrigatorias
+                if coluna not in delta.columns]
+    if ausentes:
+        raise ValueError(f"Colunas obrigatórias ausentes: {ausentes}")
+    if delta[obrigatorias].isna().any().any():
+        raise ValueError("Há linhas sem ano, município, macro ou regional.")
+
+    anos = pd.to_numeric(delta['ANO'], errors='coerce')
+    if anos.isna().any() or (anos % 1 != 0).any():
+        raise ValueError("A coluna ANO deve conter apenas anos inteiros.")
+
+    chaves = _chaves_linha(delta)
+    duplicadas = delta.duplicated(chaves)
+    if duplicadas.any():
+        exemplos = delta.loc[duplicadas, chaves].head(3)
+        raise ValueError(
+            f"Linhas repetidas para a mesma chave {tuple(chaves)}: "
+            f"{exemplos.to_dict('records')}"
+        )
+
+    for indicador in INDICADORES:
+        if indicador not in delta.columns:
+            continue
+        valores = pd.to_numeric(delta[indicador], errors='coerce')
+        if (valores.isna() & delta[indicador].notna()).any():
+            raise ValueError(f"Valores não numéricos em {indicador}.")
+
+    if colunas is not None:
+        extras = [coluna for coluna in delta.columns
+                  if coluna not in colunas]
+        if extras:
+            raise ValueError(f"Colunas desconhecidas no delta: {extras}")
+        delta = delta.reindex(columns=colunas)
+
+    return apply_column_types(delta)
+
+
+def merge_delta(existentes, delta):
+    """
+    Aplica o delta às linhas existentes dos anos afetados.
+
+    Args:
+        existentes (pandas.DataFrame): Linhas armazenadas dos anos do delta
+        delta (pandas.DataFrame): Delta validado
+
+    Returns:
+        pandas.DataFrame: Todas as linhas dos anos afetados após a mescla
+    """
+    if existentes.empty:
+        return delta.reset_index(drop=True)
+    chaves = _chaves_linha(delta)
+    chaves_delta = pd.MultiIndex.from_frame(delta[chaves].astype(str))
+    chaves_existentes = pd.MultiIndex.from_frame(
+        existentes[chaves].astype(str)
+    )
+    mantidas = existentes[~chaves_existentes.isin(chaves_delta)]
+    return apply_column_types(pd.concat([mantidas, delta], ignore_index=True))
+
+
+def apply_delta(delta, sigla=ESTADO_PADRAO):
+    """
+    Valida o delta e regrava apenas as partições dos anos afetados.
+
+    Args:
+        delta (pandas.DataFrame): Linhas novas ou atualizadas
+        sigla (str): Sigla da UF
+
+    Returns:
+        list: Anos cujas partições foram regravadas
+    """
+    # Materializa as partições a partir da planilha, se necessário
+    if not partitions_are_fresh(sigla):
+        load_state_dataset(sigla)
+
+    assinaturas = partition_signatures(sigla)
+    colunas = None
+    if assinaturas:
+        colunas = pq.read_schema(
+            partition_path(sigla, next(iter(assinaturas)))
+        ).names
+    delta = validate_delta(delta, colunas)
+
+    anos = sorted(int(ano) for ano in delta['ANO'].unique())
+    anos_existentes = [ano for ano in anos if ano in assinaturas]
+    existentes = (load_state_dataset(sigla, anos_existentes)
+                  if anos_existentes else delta.iloc[0:0])
+
+    write_state_partitions(merge_delta(existentes, delta), sigla, anos)
+    return anos
+
+
+class DatasetSnapshot:
+    """
+    Versão imutável dos dados de um estado servida às sessões.
+
+    Args:
+        indice (FilterIndex): Índice de filtros da versão
+        cubo (IndicatorCube): Cubo de agregados da versão
+        assinaturas (dict): Assinaturas das partições lidas na versão
+    """
+
+    def __init__(self, indice, cubo, assinaturas):
+        self.indice = indice
+        self.cubo = cubo
+        self.assinaturas = assinaturas
+
+    @property
+    def version(self):
+        """Impressão digital do conteúdo desta versão."""
+        return self.indice.fingerprint
+
+
+def build_snapshot(df, assinaturas=None):
+    """
+    Valida os dados e constrói uma versão completa (índice e cubo).
+
+    Args:
+        df (pandas.DataFrame): Todos os dados de um estado
+        assinaturas (dict, optional): Assinaturas das partições lidas
+
+    Returns:
+        DatasetSnapshot: Versão dos dados
+
+    Raises:
+        ValueError: Se faltarem colunas usadas pelo dashboard
+    """
+    validate_columns(df)
+    return DatasetSnapshot(
+        FilterIndex(df),
+        IndicatorCube.from_frame(df),
+        assinaturas
+    )
+
+
+class LiveDataset:
+    """
+    Dados correntes de um estado, atualizados por partição e trocados de
+    forma atômica.
+
+    Com um diretório compartilhado, os dados são mapeados do arquivo Arrow
+    publicado (ver ``src.data.shared``) e a versão acompanha o manifesto do
+    estado, em vez das partições.
+
+    Args:
+        sigla (str): Sigla da UF
+        diretorio_compartilhado (str, optional): Diretório compartilhado
+            entre processos; por padrão, ``SHARED_DIR``
+    """
+
+    def __init__(self, sigla=ESTADO_PADRAO,
+                 diretorio_compartilhado=SHARED_DIR):
+        self.sigla = sigla
+        self.diretorio_compartilhado = diretorio_compartilhado
+        self._trava = threading.Lock()
+        self._atual = self._carregar_tudo()
+
+    def _assinaturas(self):
+        """Retorna as assinaturas que identificam a versão dos dados."""
+        if self.diretorio_compartilhado:
+            return {None: shared_signature(self.sigla,
+                                           self.diretorio_compartilhado)}
+        return partition_signatures(self.sigla)
+
+    def _carregar_tudo(self):
+        """Carrega todos os anos e constrói uma versão completa."""
+        if self.diretorio_compartilhado:
+            df = load_shared_dataset(self.sigla, self.diretorio_compartilhado)
+        else:
+            df = load_state_dataset(self.sigla)
+        # Lidas após a carga, que pode ter gerado partições ou a publicação
+        return build_snapshot(df, self._assinaturas())
+
+    @property
+    def current(self):
+        """Versão servida no momento, sem verificar atualizações."""
+        return self._atual
+
+    def snapshot(self):
+        """
+        Retorna a versão corrente, atualizando-a se as partições mudaram.
+
+        Apenas uma sessão por vez reconstrói a versão; as que chegam durante
+        a reconstrução recebem a versão anterior em vez de esperar.
+
+        Returns:
+            DatasetSnapshot: Versão completa dos dados
+        """
+        atual = self._atual
+        desatualizado = self._assinaturas() != atual.assinaturas or (
+            not self.diretorio_compartilhado and
+            not partitions_are_fresh(self.sigla)
+        )
+        if desatualizado and self._trava.acquire(blocking=False):
+            try:
+                self.refresh()
+            finally:
+                self._trava.release()
+        return self._atual
+
+    def refresh(self):
+        """
+        Reconstrói a versão corrente a partir das partições alteradas.
+
+        Returns:
+            list: Anos reconstruídos (todos, se a planilha de origem mudou
+            ou os dados são compartilhados)
+        """
+        if (self.diretorio_compartilhado or
+                not partitions_are_fresh(self.sigla)):
+            self._atual = self._carregar_tudo()
+            return self._atual.indice.years()
+
+        atual = self._atual
+        assinaturas = partition_signatures(self.sigla)
+        anos = sorted(
+            ano for ano in set(assinaturas) | set(atual.assinaturas)
+            if assinaturas.get(ano) != atual.assinaturas.get(ano)
+        )
+        if not anos:
+            return []
+
+        anos_presentes = [ano for ano in anos if ano in assinaturas]
+        df_anos = (load_state_dataset(self.sigla, anos_presentes)
+                   if anos_presentes else atual.indice.df.iloc[0:0])
+
+        # A nova versão é montada à parte e publicada com uma única
+        # atribuição; quem já leu a versão anterior continua com ela
+        self._atual = DatasetSnapshot(
+            atual.indice.replace_years(df_anos, anos),
+            atual.cubo.replace_years(df_anos, anos),
+            assinaturas
+        )
+        return anos
+
+    def apply(self, delta):
+        """
+        Aplica um delta às partições e publica a nova versão.
+
+        Args:
+            delta (pandas.DataFrame): Linhas novas ou atualizadas
+
+        Returns:
+            list: Anos atualizados
+        """
+        with self._trava:
+            anos = apply_delta(delta, self.sigla)
+            if self.diretorio_compartilhado:
+                publish_dataset(load_state_dataset(self.sigla), self.sigla,
+                                self.diretorio_compartilhado)
+            self.refresh()
+            return anos
+
+
+def main(argv=None):
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(
+        description="Aplica um delta de indicadores às partições de um estado."
+    )
+    parser.add_argument("arquivo", help="delta em Excel, CSV ou Parquet")
+    parser.add_argument("--uf", default=ESTADO_PADRAO,
+                        help="sigla da UF do delta")
+    args = parser.parse_args(argv)
+
+    delta = read_table(args.arquivo)
+    anos = apply_delta(delta, args.uf)
+    print(f"{args.uf}: {len(delta)} linhas aplicadas aos anos "
+          f"{', '.join(map(str, anos))}")
+
+
+if __name__ == '__main__':
+    main()
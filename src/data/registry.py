@@ -0,0 +1,312 @@
+"""
+Registro de estados e conjunto de dados particionado por UF e ano
+
+Cada estado tem sua própria partição de dados e sua própria malha municipal,
+carregadas apenas quando o estado é exibido. As partições ficam em::
+
+    PARTITIONS_DIR/UF=<código IBGE>/ANO=<ano>/dados.parquet
+
+Um arquivo com municípios de vários estados pode ser particionado de uma vez:
+a UF é obtida da coluna ``UF`` ou dos dois primeiros dígitos de
+``COD7_MUN``. Uso pela linha de comando::
+
+    python -m src.data.registry caminho/arquivo.xlsx
+    python -m src.data.registry caminho/arquivo.parquet --uf PI
+"""
+import argparse
+import glob
+import os
+
+import pandas as pd
+
+from ..config import ESTADOS, GEOJSON_PATTERN, MAP_CONFIG, PARTITIONS_DIR
+from .schema import apply_column_types
+from .store import read_dataset, read_table
+
+# Nome do arquivo de cada partição (UF, ANO)
+ARQUIVO_PARTICAO = 'dados.parquet'
+
+
+def get_state(sigla):
+    """
+    Retorna a configuração completa de um estado do registro.
+
+    Args:
+        sigla (str): Sigla da UF (ex.: "PI")
+
+    Returns:
+        dict: Sigla, código IBGE, nome, caminhos da malha e das partições,
+        planilha de origem (ou None), centro (ou None) e zoom do mapa
+
+    Raises:
+        KeyError: Se a sigla não estiver no registro
+    """
+    estado = ESTADOS[sigla]
+    codigo = estado['codigo_ibge']
+    return {
+        'sigla': sigla,
+        'codigo_ibge': codigo,
+        'nome': estado['nome'],
+        'dados': estado.get('dados'),
+        'geojson': estado.get('geojson',
+                              GEOJSON_PATTERN.format(codigo=codigo)),
+        'particoes': os.path.join(PARTITIONS_DIR, f"UF={codigo}"),
+        'centro': estado.get('centro'),
+        'zoom': estado.get('zoom', MAP_CONFIG['zoom_start'])
+    }
+
+
+def state_for_code(codigo_ibge):
+    """
+    Retorna a sigla da UF correspondente a um código IBGE.
+
+    Args:
+        codigo_ibge (int): Código IBGE da UF
+
+    Returns:
+        str: Sigla da UF ou None se o código não estiver no registro
+    """
+    for sigla, estado in ESTADOS.items():
+        if estado['codigo_ibge'] == int(codigo_ibge):
+            return sigla
+    return None
+
+
+def partition_path(sigla, ano):
+    """
+    Retorna o caminho da partição de um ano de um estado.
+
+    Args:
+        sigla (str): Sigla da UF
+        ano (int): Ano da partição
+
+    Returns:
+        str: Caminho do arquivo Parquet da partição
+    """
+    return os.path.join(get_state(sigla)['particoes'], f"ANO={int(ano)}",
+                        ARQUIVO_PARTICAO)
+
+
+def _arquivos_particao(sigla, anos=None):
+    """Lista os arquivos de partição do estado, opcionalmente por ano."""
+    padrao = os.path.join(get_state(sigla)['particoes'], "ANO=*",
+                          ARQUIVO_PARTICAO)
+    arquivos = sorted(glob.glob(padrao))
+    if anos is None:
+        return arquivos
+    anos = {int(ano) for ano in anos}
+    return [
+        arquivo for arquivo in arquivos
+        if int(os.path.basename(os.path.dirname(arquivo))[4:]) in anos
+    ]
+
+
+def partition_signatures(sigla):
+    """
+    Retorna a assinatura (data de modificação e tamanho) de cada partição.
+
+    Permite detectar, sem ler os dados, quais anos de um estado mudaram.
+
+    Args:
+        sigla (str): Sigla da UF
+
+    Returns:
+        dict: Tupla (mtime_ns, tamanho) por ano
+    """
+    assinaturas = {}
+    for arquivo in _arquivos_particao(sigla):
+        ano = int(os.path.basename(os.path.dirname(arquivo))[4:])
+        try:
+            info = os.stat(arquivo)
+        except OSError:
+            continue  # partição removida durante a listagem
+        assinaturas[ano] = (info.st_mtime_ns, info.st_size)
+    return assinaturas
+
+
+def partitions_are_fresh(sigla):
+    """
+    Verifica se as partições existem e não são mais antigas que a planilha
+    de origem do estado (quando houver uma).
+
+    Args:
+        sigla (str): Sigla da UF
+
+    Returns:
+        bool: True se as partições podem ser lidas diretamente
+    """
+    arquivos = _arquivos_particao(sigla)
+    if not arquivos:
+        return False
+    origem = get_state(sigla)['dados']
+    if not origem or not os.path.exists(origem):
+        return True
+    mais_antiga = min(os.path.getmtime(arquivo) for arquivo in arquivos)
+    return mais_antiga >= os.path.getmtime(origem)
+
+
+def available_states():
+    """
+    Retorna as UFs que possuem malha municipal e dados disponíveis.
+
+    Returns:
+        list: Siglas das UFs disponíveis, em ordem alfabética
+    """
+    disponiveis = []
+    for sigla in ESTADOS:
+        estado = get_state(sigla)
+        possui_dados = (
+            bool(_arquivos_particao(sigla)) or
+            bool(estado['dados'] and os.path.exists(estado['dados']))
+        )
+        if possui_dados and os.path.exists(estado['geojson']):
+            disponiveis.append(sigla)
+    return sorted(disponiveis)
+
+
+def state_codes(df):
+    """
+    Retorna o código IBGE da UF de cada linha.
+
+    Args:
+        df (pandas.DataFrame): Dados com a coluna ``UF`` (sigla) ou
+            ``COD7_MUN``
+
+    Returns:
+        pandas.Series: Código IBGE da UF, alinhado às linhas de ``df``
+    """
+    if 'UF' in df.columns:
+        return df['UF'].map(
+            lambda uf: ESTADOS[uf]['codigo_ibge'] if uf in ESTADOS else uf
+        ).astype(int)
+    return (df['COD7_MUN'] // 100000).astype(int)
+
+
+def write_state_partitions(df, sigla, anos=None):
+    """
+    Grava as partições por ano de um estado, de forma atômica por arquivo.
+
+    Args:
+        df (pandas.DataFrame): Dados de um único estado
+        sigla (str): Sigla da UF
+        anos (iterable, optional): Anos a regravar; por padrão, todos os
+            anos presentes em ``df``
+
+    Returns:
+        list: Caminhos das partições gravadas
+    """
+    anos = sorted(df['ANO'].unique()) if anos is None else sorted(anos)
+
+    gravados = []
+    for ano in anos:
+        caminho = partition_path(sigla, ano)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        caminho_temporario = f"{caminho}.{os.getpid()}.tmp"
+        df[df['ANO'] == ano].to_parquet(caminho_temporario, index=False)
+        os.replace(caminho_temporario, caminho)
+        gravados.append(caminho)
+    return gravados
+
+
+def write_partitions(df, sigla=None):
+    """
+    Particiona um conjunto de dados por UF e ano.
+
+    Args:
+        df (pandas.DataFrame): Dados de um ou mais estados
+        sigla (str, optional): UF de todas as linhas; quando omitida, é
+            obtida da coluna ``UF`` ou de ``COD7_MUN``
+
+    Returns:
+        dict: Partições gravadas por sigla de UF
+    """
+    df = apply_column_types(df)
+    if sigla is not None:
+        return {sigla: write_state_partitions(df, sigla)}
+
+    gravados = {}
+    for codigo, df_estado in df.groupby(state_codes(df), sort=True):
+        sigla_estado = state_for_code(codigo)
+        if sigla_estado is None:
+            raise ValueError(f"UF com código IBGE {codigo} não registrada.")
+        gravados[sigla_estado] = write_state_partitions(
+            df_estado, sigla_estado
+        )
+    return gravados
+
+
+def load_state_dataset(sigla, anos=None):
+    """
+    Carrega os dados de um estado a partir das suas partições.
+
+    Quando as partições estão ausentes ou desatualizadas e o estado possui
+    planilha de origem, os dados são lidos da planilha (via arquivo colunar)
+    e as partições são regravadas.
+
+    Args:
+        sigla (str): Sigla da UF
+        anos (iterable, optional): Anos a carregar; por padrão, todos
+
+    Returns:
+        pandas.DataFrame: Dados do estado, com os tipos ajustados
+
+    Raises:
+        FileNotFoundError: Se o estado não possuir dados
+    """
+    estado = get_state(sigla)
+
+    if not partitions_are_fresh(sigla):
+        if not estado['dados']:
+            raise FileNotFoundError(
+                f"Não há dados particionados para {estado['nome']}."
+            )
+        df = read_dataset(estado['dados'])
+        try:
+            write_state_partitions(df, sigla)
+        except OSError:
+            pass
+        if anos is not None:
+            df = df[df['ANO'].isin([int(ano) for ano in anos])]
+        # Mesma ordem da leitura das partições: por ano, estável
+        return df.sort_values('ANO', kind='stable').reset_index(drop=True)
+
+    arquivos = _arquivos_particao(sigla, anos)
+    if not arquivos:
+        raise FileNotFoundError(
+            f"Não há dados de {estado['nome']} para os anos informados."
+        )
+    return read_partitions(arquivos)
+
+
+def read_partitions(arquivos):
+    """
+    Lê e concatena arquivos de partição, na ordem informada.
+
+    Args:
+        arquivos (list): Caminhos dos arquivos Parquet das partições
+
+    Returns:
+        pandas.DataFrame: Linhas de todas as partições, com os tipos ajustados
+    """
+    partes = [pd.read_parquet(arquivo) for arquivo in arquivos]
+    # As categorias de cada partição diferem; os tipos são reaplicados
+    # após a concatenação
+    return apply_column_types(pd.concat(partes, ignore_index=True))
+
+
+def main(argv=None):
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(
+        description="Particiona um arquivo de indicadores por UF e ano."
+    )
+    parser.add_argument("arquivo", help="planilha Excel, CSV ou Parquet")
+    parser.add_argument("--uf", help="sigla da UF de todas as linhas")
+    args = parser.parse_args(argv)
+
+    df = read_table(args.arquivo)
+    for sigla, arquivos in write_partitions(df, args.uf).items():
+        print(f"{sigla}: {len(arquivos)} partições")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+"""
+Esquema em memória da tabela de indicadores
+
+Define os tipos compactos com que a tabela é mantida em memória e gravada
+nas partições: categóricas para as colunas de agrupamento e de texto
+repetido, ``int16`` para o ano, ``int32`` para os códigos IBGE e
+``float32`` para os indicadores. Também valida as colunas de que o
+dashboard depende e mede a memória economizada em relação aos tipos
+padrão do pandas (``object``, ``int64`` e ``float64``).
+
+Uso pela linha de comando (relatório de memória de um estado)::
+
+    python -m src.data.schema [--uf PI]
+"""
+import argparse
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from ..config import ESTADO_PADRAO, INDICADORES
+
+# Colunas de baixa cardinalidade armazenadas como categóricas
+COLUNAS_CATEGORICAS = ['Macro', 'Regional', 'MUN', 'MUN_RES1',
+                       'Quadrimestre']
+
+# Tipo inteiro usado para a coluna de ano
+TIPO_ANO = 'int16'
+
+# Códigos IBGE dos municípios (7 dígitos cabem em int32)
+COLUNAS_CODIGO = ['COD7_MUN', 'COD6_MUN']
+TIPO_CODIGO = 'int32'
+
+# Tipo dos indicadores; a precisão do float32 (7 algarismos significativos)
+# excede a das fontes, publicadas com uma casa decimal
+TIPO_INDICADOR = 'float32'
+ALGARISMOS_INDICADOR = 7
+
+# Colunas usadas pelos filtros, pelo cubo de agregados e pelo mapa
+COLUNAS_OBRIGATORIAS = ['ANO', 'Macro', 'Regional', 'MUN']
+
+
+def apply_column_types(df):
+    """
+    Converte as colunas para os tipos compactos do esquema.
+
+    Colunas ausentes são ignoradas, e colunas numéricas com valores nulos
+    mantêm o tipo em que foram lidas. Linhas sem ano (célula em branco na
+    planilha) não podem ser filtradas nem particionadas: são descartadas,
+    com um aviso que informa quantas foram.
+
+    Args:
+        df (pandas.DataFrame): DataFrame lido da fonte
+
+    Returns:
+        pandas.DataFrame: DataFrame com os tipos ajustados
+    """
+    if 'ANO' in df.columns and df['ANO'].isna().any():
+        sem_ano = int(df['ANO'].isna().sum())
+        warnings.warn(f"{sem_ano} linha(s) sem ANO descartada(s)",
+                      stacklevel=2)
+        df = df[df['ANO'].notna()]
+    df = df.copy()
+    for coluna in COLUNAS_CATEGORICAS:
+        if coluna in df.columns:
+            df[coluna] = df[coluna].astype('category')
+    if 'ANO' in df.columns:
+        df['ANO'] = df['ANO'].astype(TIPO_ANO)
+    for coluna in COLUNAS_CODIGO:
+        if coluna in df.columns and not df[coluna].isna().any():
+            df[coluna] = df[coluna].astype(TIPO_CODIGO)
+    for coluna in INDICADORES:
+        if (coluna in df.columns and
+                pd.api.types.is_numeric_dtype(df[coluna])):
+            df[coluna] = df[coluna].astype(TIPO_INDICADOR)
+    return df
+
+
+def indicator_values(valores):
+    """
+    Converte valores de um indicador para float64, sem os dígitos espúrios
+    da representação em float32 (84.6 em vez de 84.59999847...).
+
+    Usado apenas por ``widen_indicators``, o único ponto em que os
+    indicadores saem do float32 da camada de dados.
+
+    Args:
+        valores (pandas.Series | numpy.ndarray): Valores do indicador
+
+    Returns:
+        numpy.ndarray: Valores em float64; os lidos em float32 são
+        arredondados à sua precisão e os nulos são mantidos como NaN
+    """
+    originais = np.asarray(valores)
+    valores = originais.astype(float)
+    if originais.dtype != np.float32:
+        return valores
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expoente = np.floor(np.log10(np.abs(valores)))
+    expoente = np.where(np.isfinite(expoente), expoente, 0)
+    # Divisão por potência de 10 exata: o resultado é o float64 mais
+    # próximo do valor decimal arredondado
+    casas = ALGARISMOS_INDICADOR - 1 - expoente
+    escala = np.power(10.0, np.abs(casas))
+    return np.where(
+        casas >= 0,
+        np.round(valores * escala) / escala,
+        np.round(valores / escala) * escala
+    )
+
+
+def widen_indicators(df, indicadores=None):
+    """
+    Retorna os dados com os indicadores em float64, prontos para cálculo e
+    exibição.
+
+    Os gráficos, o mapa e o cubo de agregados recebem os dados por aqui
+    (``filter_data`` e ``IndicatorCube.from_frame``) e não convertem os
+    valores por conta própria.
+
+    Args:
+        df (pandas.DataFrame): Dados com os tipos do esquema
+        indicadores (iterable, optional): Indicadores a converter; por
+            padrão, todos os de ``INDICADORES`` presentes em ``df``
+
+    Returns:
+        pandas.DataFrame: Cópia rasa de ``df`` com os indicadores em
+        float64; ``df`` não é modificado
+    """
+    if indicadores is None:
+        indicadores = [coluna for coluna in INDICADORES
+                       if coluna in df.columns]
+    convertidos = {
+        coluna: indicator_values(df[coluna]) for coluna in indicadores
+        if df[coluna].dtype == np.float32
+    }
+    if not convertidos:
+        return df
+    return df.assign(**convertidos)
+
+
+def validate_columns(df, indicadores=None):
+    """
+    Verifica se a tabela tem as colunas usadas pelo dashboard.
+
+    Args:
+        df (pandas.DataFrame): Tabela de indicadores
+        indicadores (iterable, optional): Indicadores exigidos; por padrão,
+            todos os de ``INDICADORES``
+
+    Raises:
+        ValueError: Se faltarem colunas ou se um indicador não for numérico
+    """
+    if indicadores is None:
+        indicadores = list(INDICADORES)
+    ausentes = [coluna for coluna in COLUNAS_OBRIGATORIAS + list(indicadores)
+                if coluna not in df.columns]
+    if ausentes:
+        raise ValueError(f"Colunas ausentes na tabela de indicadores: "
+                         f"{ausentes}")
+    nao_numericos = [coluna for coluna in indicadores
+                     if not pd.api.types.is_numeric_dtype(df[coluna])]
+    if nao_numericos:
+        raise ValueError(f"Indicadores com valores não numéricos: "
+                         f"{nao_numericos}")
+
+
+def _tipos_padrao(df):
+    """Retorna ``df`` com os tipos padrão do pandas, para comparação."""
+    tipos = {}
+    for coluna, tipo in df.dtypes.items():
+        if isinstance(tipo, pd.CategoricalDtype):
+            tipos[coluna] = object
+        elif pd.api.types.is_integer_dtype(tipo):
+            tipos[coluna] = 'int64'
+        elif pd.api.types.is_float_dtype(tipo):
+            tipos[coluna] = 'float64'
+    return df.astype(tipos)
+
+
+def memory_report(df):
+    """
+    Mede a memória da tabela e a economia em relação aos tipos padrão.
+
+    Args:
+        df (pandas.DataFrame): Tabela com os tipos do esquema
+
+    Returns:
+        dict: ``bytes`` (tabela atual), ``bytes_tipos_padrao`` (mesma
+        tabela com ``object``, ``int64`` e ``float64``), ``economia`` (fração
+        economizada) e ``colunas`` (bytes atuais e padrão por coluna)
+    """
+    atual = df.memory_usage(deep=True, index=False)
+    padrao = _tipos_padrao(df).memory_usage(deep=True, index=False)
+    total, total_padrao = int(atual.sum()), int(padrao.sum())
+    return {
+        "bytes": total,
+        "bytes_tipos_padrao": total_padrao,
+        "economia": 1 - total / total_padrao if total_padrao else 0.0,
+        "colunas": {
+            coluna: (int(atual[coluna]), int(padrao[coluna]))
+            for coluna in df.columns
+        }
+    }
+
+
+def main(argv=None):
+    """Ponto de entrada da linha de comando."""
+    from .registry import load_state_dataset
+
+    parser = argparse.ArgumentParser(
+        description="Mostra a memória da tabela de indicadores de um estado."
+    )
+    parser.add_argument("--uf", default=ESTADO_PADRAO, help="sigla da UF")
+    args = parser.parse_args(argv)
+
+    df = load_state_dataset(args.uf)
+    validate_columns(df)
+    relatorio = memory_report(df)
+    for coluna, (atual, padrao) in relatorio["colunas"].items():
+        print(f"{coluna}: {df[coluna].dtype} {atual / 1024:.1f} KB "
+              f"(padrão: {padrao / 1024:.1f} KB)")
+    print(f"Total: {relatorio['bytes'] / 1024 ** 2:.2f} MB "
+          f"(tipos padrão: {relatorio['bytes_tipos_padrao'] / 1024 ** 2:.2f}"
+          f" MB; {relatorio['economia']:.0%} a menos)")
+
+
+if __name__ == "__main__":
+    main()
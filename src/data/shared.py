@@ -0,0 +1,296 @@
+"""
+Conjunto de dados compartilhado entre processos via Arrow IPC
+
+Em implantações com vários processos do Streamlit, um processo carregador
+publica os dados de cada estado em um arquivo Arrow IPC sem compressão no
+diretório compartilhado (``SHARED_DIR``). Os workers mapeiam o arquivo em
+memória somente para leitura: as colunas numéricas viram arrays do pandas
+apoiados diretamente nas páginas do arquivo, compartilhadas pelo sistema
+operacional entre todos os processos, sem leitura nem conversão.
+
+As malhas municipais simplificadas são publicadas no mesmo diretório, também
+em Arrow IPC (geometria em WKB e as propriedades de cada município em
+colunas), e mapeadas da mesma forma: os workers nunca executam a
+simplificação nem mantêm cópias próprias da malha.
+
+Cada publicação grava um arquivo novo, identificado pela impressão digital
+do conteúdo, e troca o manifesto do estado de forma atômica; processos que
+ainda mapeiam a versão anterior continuam válidos.
+
+Uso pela linha de comando (publica todos os estados disponíveis)::
+
+    SAUDE_MATERNA_SHARED_DIR=/dados/compartilhados python -m src.data.shared
+"""
+import argparse
+import glob
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import shapely
+from shapely.geometry import shape
+
+from ..config import MAP_CONFIG, SHARED_DIR
+from ..utils.fingerprint import file_signature
+from .registry import available_states, get_state, load_state_dataset
+from .store import dataset_fingerprint
+
+
+# Coluna da geometria (WKB) nas malhas publicadas
+COLUNA_GEOMETRIA = "geometria_wkb"
+
+# Tipos Arrow convertidos para tipos do pandas apoiados no próprio arquivo
+_TIPOS_SEM_COPIA = {
+    pa.string(): pd.StringDtype("pyarrow"),
+    pa.large_string(): pd.StringDtype("pyarrow")
+}
+
+
+def _manifesto(sigla, diretorio):
+    """Retorna o caminho do manifesto com a versão publicada do estado."""
+    return os.path.join(diretorio, f"dados-{sigla}.json")
+
+
+def _gravar_atomicamente(caminho, gravar):
+    """Grava via arquivo temporário e substitui o destino de uma vez."""
+    caminho_temporario = f"{caminho}.{os.getpid()}.tmp"
+    try:
+        gravar(caminho_temporario)
+        os.replace(caminho_temporario, caminho)
+    finally:
+        if os.path.exists(caminho_temporario):
+            os.remove(caminho_temporario)
+
+
+def _gravar_tabela(caminho, tabela):
+    """Grava uma tabela Arrow IPC sem compressão, de forma atômica."""
+    def gravar(destino):
+        with pa.OSFile(destino, "wb") as arquivo:
+            with pa.ipc.new_file(arquivo, tabela.schema) as escritor:
+                escritor.write_table(tabela)
+
+    _gravar_atomicamente(caminho, gravar)
+
+
+def _mapear(caminho):
+    """Mapeia em memória, somente leitura, uma tabela Arrow IPC."""
+    return pa.ipc.open_file(pa.memory_map(caminho, "r")).read_all()
+
+
+def to_arrow_table(df):
+    """
+    Converte o DataFrame em tabela Arrow preservando os tipos do pandas.
+
+    Colunas de ponto flutuante são gravadas sem máscara de nulos (NaN
+    permanece como valor), condição para que a leitura seja sem cópia.
+
+    Args:
+        df (pandas.DataFrame): Dados tipados
+
+    Returns:
+        pyarrow.Table: Tabela com os metadados de tipos do pandas
+    """
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    for posicao, coluna in enumerate(df.columns):
+        if pd.api.types.is_float_dtype(df[coluna].dtype):
+            tabela = tabela.set_column(
+                posicao,
+                tabela.field(posicao),
+                pa.array(df[coluna].to_numpy(), from_pandas=False)
+            )
+    return tabela
+
+
+def publish_dataset(df, sigla, diretorio=SHARED_DIR):
+    """
+    Publica os dados de um estado como arquivo Arrow IPC compartilhado.
+
+    Args:
+        df (pandas.DataFrame): Dados tipados do estado
+        sigla (str): Sigla da UF
+        diretorio (str): Diretório compartilhado
+
+    Returns:
+        str: Caminho do arquivo Arrow publicado
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    versao = dataset_fingerprint(df)
+    nome = f"dados-{sigla}-{versao}.arrow"
+    caminho = os.path.join(diretorio, nome)
+
+    if not os.path.exists(caminho):
+        _gravar_tabela(caminho, to_arrow_table(df))
+
+    def gravar_manifesto(destino):
+        with open(destino, "w", encoding="utf-8") as arquivo:
+            json.dump({"arquivo": nome, "versao": versao,
+                       "linhas": len(df)}, arquivo)
+
+    _gravar_atomicamente(_manifesto(sigla, diretorio), gravar_manifesto)
+
+    # Versões anteriores podem ser removidas: processos que ainda as mapeiam
+    # mantêm o acesso até liberarem o mapeamento
+    for antigo in glob.glob(os.path.join(diretorio, f"dados-{sigla}-*.arrow")):
+        if os.path.basename(antigo) != nome:
+            try:
+                os.remove(antigo)
+            except OSError:
+                pass
+    return caminho
+
+
+def shared_signature(sigla, diretorio=SHARED_DIR):
+    """
+    Retorna a assinatura do manifesto do estado, que muda a cada publicação.
+
+    Args:
+        sigla (str): Sigla da UF
+        diretorio (str): Diretório compartilhado
+
+    Returns:
+        tuple: (mtime_ns, tamanho) ou None se o estado não foi publicado
+    """
+    return file_signature(_manifesto(sigla, diretorio))
+
+
+def map_dataset(sigla, diretorio=SHARED_DIR):
+    """
+    Mapeia em memória, somente leitura, os dados publicados de um estado.
+
+    Args:
+        sigla (str): Sigla da UF
+        diretorio (str): Diretório compartilhado
+
+    Returns:
+        pandas.DataFrame: Dados do estado; as colunas numéricas apontam para
+        o arquivo mapeado e não podem ser modificadas
+
+    Raises:
+        FileNotFoundError: Se o estado ainda não foi publicado
+    """
+    with open(_manifesto(sigla, diretorio), encoding="utf-8") as arquivo:
+        manifesto = json.load(arquivo)
+    tabela = _mapear(os.path.join(diretorio, manifesto["arquivo"]))
+    # split_blocks evita consolidar as colunas em blocos 2D (o que copiaria);
+    # textos ficam como strings Arrow, em vez de objetos Python por linha
+    return tabela.to_pandas(split_blocks=True,
+                            types_mapper=_TIPOS_SEM_COPIA.get)
+
+
+def load_shared_dataset(sigla, diretorio=SHARED_DIR):
+    """
+    Retorna os dados compartilhados do estado, publicando-os se necessário.
+
+    O primeiro processo a encontrar o estado sem publicação lê os dados da
+    forma habitual e os publica; os demais apenas mapeiam o arquivo.
+
+    Args:
+        sigla (str): Sigla da UF
+        diretorio (str): Diretório compartilhado
+
+    Returns:
+        pandas.DataFrame: Dados do estado
+    """
+    # A segunda tentativa cobre a troca de versão entre a leitura do
+    # manifesto e a abertura do arquivo
+    for _ in range(2):
+        try:
+            return map_dataset(sigla, diretorio)
+        except FileNotFoundError:
+            continue
+    df = load_state_dataset(sigla)
+    try:
+        publish_dataset(df, sigla, diretorio)
+    except OSError:
+        return df
+    return map_dataset(sigla, diretorio)
+
+
+def geometry_table(geojson_data):
+    """
+    Converte uma coleção de feições em tabela Arrow.
+
+    Args:
+        geojson_data (dict): FeatureCollection
+
+    Returns:
+        pyarrow.Table: Uma linha por feição, com as propriedades em colunas
+        e a geometria em WKB na coluna ``COLUNA_GEOMETRIA``
+    """
+    features = geojson_data["features"]
+    propriedades = pa.Table.from_pylist(
+        [feature["properties"] for feature in features]
+    )
+    geometrias = shapely.to_wkb(
+        np.array([shape(feature["geometry"]) for feature in features])
+    )
+    return propriedades.append_column(
+        COLUNA_GEOMETRIA, pa.array(list(geometrias), pa.binary())
+    )
+
+
+def map_geometry(caminho):
+    """
+    Mapeia em memória, somente leitura, uma malha publicada.
+
+    Args:
+        caminho (str): Caminho da malha (``shared_variant_path``)
+
+    Returns:
+        pyarrow.Table: Tabela de ``geometry_table`` apoiada no arquivo
+    """
+    return _mapear(caminho)
+
+
+def publish_geometry(sigla, diretorio=SHARED_DIR):
+    """
+    Publica as variantes simplificadas da malha municipal do estado, em
+    Arrow IPC.
+
+    Args:
+        sigla (str): Sigla da UF
+        diretorio (str): Diretório compartilhado
+
+    Returns:
+        list: Caminhos das variantes publicadas
+    """
+    from ..utils.geometry import build_simplified_geojson, shared_variant_path
+
+    os.makedirs(diretorio, exist_ok=True)
+    publicados = []
+    for tolerancia in MAP_CONFIG['simplify_tolerances']:
+        origem = build_simplified_geojson(get_state(sigla)['geojson'],
+                                          tolerancia)
+        destino = shared_variant_path(get_state(sigla)['geojson'],
+                                      tolerancia, diretorio)
+        with open(origem, encoding="utf-8") as arquivo:
+            _gravar_tabela(destino, geometry_table(json.load(arquivo)))
+        publicados.append(destino)
+    return publicados
+
+
+def main(argv=None):
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(
+        description="Publica dados e malhas no diretório compartilhado."
+    )
+    parser.add_argument("--diretorio", default=SHARED_DIR,
+                        help="diretório compartilhado "
+                             "(padrão: SAUDE_MATERNA_SHARED_DIR)")
+    parser.add_argument("--uf", action="append",
+                        help="sigla da UF (repetível; padrão: todas)")
+    args = parser.parse_args(argv)
+    if not args.diretorio:
+        parser.error("informe --diretorio ou SAUDE_MATERNA_SHARED_DIR")
+
+    for sigla in args.uf or available_states():
+        caminho = publish_dataset(load_state_dataset(sigla), sigla,
+                                  args.diretorio)
+        malhas = publish_geometry(sigla, args.diretorio)
+        print(f"{sigla}: {caminho} e {len(malhas)} malhas")
+
+
+if __name__ == '__main__':
+    main()
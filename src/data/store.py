@@ -0,0 +1,152 @@
+"""
+Armazenamento colunar (Parquet) dos indicadores de saúde materna
+
+O arquivo Excel continua sendo a fonte oficial dos dados, mas a leitura via
+openpyxl é lenta. Este módulo converte a planilha em um arquivo Parquet
+tipado, salvo ao lado da planilha, e o reutiliza enquanto ele não estiver
+mais antigo que a fonte.
+
+Uso pela linha de comando (reconstrói o arquivo colunar)::
+
+    python -m src.data.store
+"""
+import hashlib
+import os
+
+import pandas as pd
+
+from ..config import DATA_PATH
+from .schema import apply_column_types
+
+
+def columnar_path_for(caminho_excel=DATA_PATH):
+    """
+    Retorna o caminho do arquivo Parquet correspondente a uma planilha.
+
+    Args:
+        caminho_excel (str): Caminho do arquivo Excel de origem
+
+    Returns:
+        str: Caminho do arquivo Parquet, no mesmo diretório da planilha
+    """
+    return os.path.splitext(caminho_excel)[0] + '.parquet'
+
+
+def columnar_store_is_fresh(caminho_excel=DATA_PATH, caminho_parquet=None):
+    """
+    Verifica se o arquivo Parquet existe e não é mais antigo que a planilha.
+
+    Args:
+        caminho_excel (str): Caminho do arquivo Excel de origem
+        caminho_parquet (str, optional): Caminho do arquivo Parquet
+
+    Returns:
+        bool: True se o arquivo colunar pode ser usado diretamente
+    """
+    caminho_parquet = caminho_parquet or columnar_path_for(caminho_excel)
+    if not os.path.exists(caminho_parquet):
+        return False
+    # Sem a planilha, o arquivo colunar é a única fonte disponível
+    if not os.path.exists(caminho_excel):
+        return True
+    return os.path.getmtime(caminho_parquet) >= os.path.getmtime(caminho_excel)
+
+
+def build_columnar_store(caminho_excel=DATA_PATH, caminho_parquet=None):
+    """
+    Lê a planilha Excel e grava a versão tipada em Parquet.
+
+    A gravação é feita em arquivo temporário e substituída de forma atômica,
+    para que outros processos nunca leiam um arquivo parcial. Se o diretório
+    não permitir escrita, os dados lidos são retornados mesmo assim.
+
+    Args:
+        caminho_excel (str): Caminho do arquivo Excel de origem
+        caminho_parquet (str, optional): Caminho do arquivo Parquet de destino
+
+    Returns:
+        pandas.DataFrame: DataFrame tipado lido da planilha
+    """
+    caminho_parquet = caminho_parquet or columnar_path_for(caminho_excel)
+    df = apply_column_types(pd.read_excel(caminho_excel))
+
+    caminho_temporario = f"{caminho_parquet}.{os.getpid()}.tmp"
+    try:
+        df.to_parquet(caminho_temporario, engine='pyarrow', index=False)
+        os.replace(caminho_temporario, caminho_parquet)
+    except OSError:
+        if os.path.exists(caminho_temporario):
+            os.remove(caminho_temporario)
+
+    return df
+
+
+def read_table(caminho):
+    """
+    Lê uma tabela de indicadores em Excel, CSV ou Parquet, pela extensão.
+
+    Args:
+        caminho (str): Caminho do arquivo
+
+    Returns:
+        pandas.DataFrame: DataFrame com os dados tipados
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == '.csv':
+        df = pd.read_csv(caminho)
+    elif extensao == '.parquet':
+        df = pd.read_parquet(caminho, engine='pyarrow')
+    else:
+        df = pd.read_excel(caminho)
+    return apply_column_types(df)
+
+
+def dataset_fingerprint(df):
+    """
+    Calcula uma impressão digital do conteúdo do DataFrame.
+
+    Usada para compor chaves de cache compartilhadas entre sessões: muda
+    sempre que qualquer valor, coluna ou linha do conjunto de dados muda.
+
+    Args:
+        df (pandas.DataFrame): DataFrame com os dados
+
+    Returns:
+        str: Hash hexadecimal curto do conteúdo
+    """
+    hash_linhas = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    digest = hashlib.sha256(hash_linhas.tobytes())
+    digest.update("|".join(map(str, df.columns)).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def read_dataset(caminho_excel=DATA_PATH, caminho_parquet=None):
+    """
+    Lê os dados do arquivo colunar, reconstruindo-o a partir do Excel
+    quando estiver ausente, desatualizado ou corrompido.
+
+    Args:
+        caminho_excel (str): Caminho do arquivo Excel de origem
+        caminho_parquet (str, optional): Caminho do arquivo Parquet
+
+    Returns:
+        pandas.DataFrame: DataFrame com os dados tipados
+    """
+    caminho_parquet = caminho_parquet or columnar_path_for(caminho_excel)
+
+    if columnar_store_is_fresh(caminho_excel, caminho_parquet):
+        try:
+            # Reaplica o esquema: o arquivo pode ter sido gravado com
+            # tipos de uma versão anterior
+            return apply_column_types(
+                pd.read_parquet(caminho_parquet, engine='pyarrow'))
+        except Exception:
+            if not os.path.exists(caminho_excel):
+                raise
+
+    return build_columnar_store(caminho_excel, caminho_parquet)
+
+
+if __name__ == '__main__':
+    dados = build_columnar_store()
+    print(f"{len(dados)} linhas gravadas em {columnar_path_for()}")
@@ -0,0 +1,329 @@
+"""
+Benchmarks do carregamento, filtragem, agregação e renderização do mapa
+
+Mede, para o conjunto de dados atual e para versões sintéticas ampliadas:
+
+- carga dos dados como no app: leitura das partições por ano e montagem
+  da versão servida (índice de filtros e cubo), além da leitura do Excel
+  usada quando as partições precisam ser regeradas;
+- ``filter_data`` em todas as combinações de filtros (índice e máscara);
+- a preparação de dados de cada gráfico (cubo, médias, tabela dinâmica,
+  histograma) e a construção das figuras;
+- ``criar_mapa_cobertura_consultas`` (tempo e tamanho do HTML).
+
+As versões ampliadas repetem as linhas com anos deslocados, de modo que um
+fator 10 multiplica por 10 tanto o número de linhas quanto o de anos. O
+resultado é emitido em JSON para comparação entre commits.
+
+Uso::
+
+    python -m src.tools.benchmark --escalas 1,10,100 --saida bench.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from ..config import DATA_PATH, ESTADO_PADRAO, INDICADORES
+from ..data.aggregation import IndicatorCube
+from ..data.filter_index import FilterIndex
+from ..data.loader import filter_data
+from ..data.refresh import build_snapshot
+from ..data.registry import (ARQUIVO_PARTICAO, load_state_dataset,
+                             read_partitions)
+from ..data.schema import apply_column_types, widen_indicators
+
+# Limite de intervalos de anos medidos por escala, para que a enumeração
+# de combinações continue viável em conjuntos com milhares de anos
+MAX_INTERVALOS_ANOS = 50
+
+
+def _cronometrar(funcao, repeticoes):
+    """
+    Executa a função várias vezes e retorna estatísticas de tempo.
+
+    Uma execução inicial, não medida, aquece imports e caches de módulo.
+    """
+    resultado = funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    medicao = {
+        "mediana_s": round(statistics.median(tempos), 6),
+        "minimo_s": round(min(tempos), 6),
+        "repeticoes": repeticoes
+    }
+    return medicao, resultado
+
+
+def scale_dataset(df, fator, semente=0):
+    """
+    Amplia o conjunto de dados repetindo as linhas com anos deslocados.
+
+    Cada cópia recebe anos novos e um pequeno ruído nos indicadores, para
+    que os grupos não sejam idênticos entre as cópias.
+
+    Args:
+        df (pandas.DataFrame): Conjunto de dados original
+        fator (int): Fator de ampliação de linhas e anos
+        semente (int): Semente do gerador de ruído
+
+    Returns:
+        pandas.DataFrame: Conjunto ampliado, com os mesmos tipos de coluna
+    """
+    if fator == 1:
+        return df
+
+    gerador = np.random.default_rng(semente)
+    anos = sorted(df["ANO"].unique())
+    deslocamento = int(anos[-1]) - int(anos[0]) + 1
+    indicadores = [ind for ind in INDICADORES if ind in df.columns]
+
+    copias = []
+    for copia in range(fator):
+        parte = df.copy()
+        parte["ANO"] = parte["ANO"].astype("int32") - deslocamento * copia
+        ruido = gerador.normal(0, 1, size=(len(parte), len(indicadores)))
+        parte[indicadores] = (parte[indicadores] + ruido).clip(lower=0)
+        copias.append(parte)
+
+    return apply_column_types(pd.concat(copias, ignore_index=True))
+
+
+def _intervalos_anos(anos):
+    """Retorna intervalos (início, fim), amostrados quando são muitos."""
+    intervalos = list(itertools.combinations_with_replacement(anos, 2))
+    if len(intervalos) <= MAX_INTERVALOS_ANOS:
+        return intervalos
+    posicoes = np.linspace(0, len(intervalos) - 1, MAX_INTERVALOS_ANOS)
+    return [intervalos[int(p)] for p in posicoes]
+
+
+def _combinacoes_filtros(indice):
+    """Enumera as combinações de período, macro e regional válidas."""
+    combinacoes = []
+    for ano_inicio, ano_fim in _intervalos_anos(indice.years()):
+        for macro in ["Todas"] + indice.macros():
+            regionais = indice.regionals(macro_selecionada=macro)
+            for regional in ["Todas"] + regionais:
+                combinacoes.append((ano_inicio, ano_fim, macro, regional))
+    return combinacoes
+
+
+def bench_loading(df, repeticoes, incluir_excel):
+    """
+    Mede a carga dos dados feita pelo app: leitura das partições por ano
+    (``load_partitions``) e leitura seguida da montagem da versão servida,
+    com índice de filtros e cubo (``load_snapshot``). Opcionalmente, mede
+    também a leitura do Excel.
+    """
+    medicoes = {}
+    if incluir_excel:
+        medicoes["load_excel"], _ = _cronometrar(
+            lambda: apply_column_types(pd.read_excel(DATA_PATH)), repeticoes
+        )
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        # Mesmo leiaute e conteúdo de ``write_state_partitions``
+        arquivos = []
+        for ano in sorted(df["ANO"].unique()):
+            caminho = os.path.join(diretorio, f"ANO={int(ano)}",
+                                   ARQUIVO_PARTICAO)
+            os.makedirs(os.path.dirname(caminho))
+            df[df["ANO"] == ano].to_parquet(caminho, index=False)
+            arquivos.append(caminho)
+
+        medicoes["load_partitions"], _ = _cronometrar(
+            lambda: read_partitions(arquivos), repeticoes
+        )
+        medicoes["load_partitions"]["particoes"] = len(arquivos)
+        medicoes["load_partitions"]["bytes"] = sum(
+            os.path.getsize(caminho) for caminho in arquivos
+        )
+        medicoes["load_snapshot"], _ = _cronometrar(
+            lambda: build_snapshot(read_partitions(arquivos)), repeticoes
+        )
+    return medicoes
+
+
+def bench_filtering(df, indice, repeticoes):
+    """Mede filter_data em todas as combinações, com índice e com máscara."""
+    combinacoes = _combinacoes_filtros(indice)
+    medicoes = {}
+
+    medicoes["filter_index_build"], _ = _cronometrar(
+        lambda: FilterIndex(df), repeticoes
+    )
+    medicoes["filter_data_index"], _ = _cronometrar(
+        lambda: [filter_data(df, *filtros, index=indice)
+                 for filtros in combinacoes],
+        repeticoes
+    )
+    medicoes["filter_data_mask"], _ = _cronometrar(
+        lambda: [filter_data(df, *filtros) for filtros in combinacoes],
+        repeticoes
+    )
+    for nome in ("filter_data_index", "filter_data_mask"):
+        medicoes[nome]["combinacoes"] = len(combinacoes)
+    return medicoes
+
+
+def bench_charts(df, repeticoes):
+    """Mede a preparação de dados e a construção de cada gráfico."""
+    from ..visualizations import charts
+
+    indicador = next(iter(INDICADORES))
+    medicoes = {}
+
+    medicoes["cube_build"], cubo_total = _cronometrar(
+        lambda: IndicatorCube.from_frame(df), repeticoes
+    )
+    anos = sorted(df["ANO"].unique())
+    medicoes["cube_filter"], cubo = _cronometrar(
+        lambda: cubo_total.filter(anos[0], anos[-1]), repeticoes
+    )
+
+    preparos = {
+        "prep_stats": lambda: (cubo.mean(indicador), cubo.median(indicador),
+                               cubo.std(indicador)),
+        "prep_macro_distribution": lambda: cubo.mean_by(indicador,
+                                                        ["Macro"]),
+        "prep_heatmap": lambda: cubo.pivot_mean(indicador),
+        "prep_timeline": lambda: cubo.mean_by(indicador, ["ANO"]),
+        "prep_pie_chart": lambda: cubo.mean_by(indicador, ["Regional"]),
+        "prep_histogram": lambda: np.histogram(
+            df[indicador].dropna().to_numpy(dtype=float), bins=20
+        )
+    }
+    for nome, preparo in preparos.items():
+        medicoes[nome], _ = _cronometrar(preparo, repeticoes)
+
+    for tipo in charts.CONSTRUTORES:
+        medicoes[f"build_{tipo}"], payload = _cronometrar(
+            lambda tipo=tipo: charts.chart_payload(tipo, df, indicador, cubo),
+            repeticoes
+        )
+        medicoes[f"build_{tipo}"]["bytes"] = len(payload)
+    return medicoes
+
+
+def bench_map(df, repeticoes, modos):
+    """Mede a construção do mapa e o tamanho do HTML em cada modo."""
+    from ..visualizations.maps import criar_mapa_cobertura_consultas
+
+    indicador = next(iter(INDICADORES))
+    medicoes = {}
+    for modo in modos:
+        medicao, (_, html_mapa) = _cronometrar(
+            lambda modo=modo: criar_mapa_cobertura_consultas(
+                df_filtrado=widen_indicators(df),
+                indicador_selecionado=indicador,
+                modo=modo
+            ),
+            repeticoes
+        )
+        medicao["bytes"] = len(html_mapa.encode("utf-8"))
+        medicoes[f"map_{modo}"] = medicao
+    return medicoes
+
+
+def _commit_atual():
+    """Retorna o hash do commit atual, se disponível."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(escalas=(1,), repeticoes=3, modos_mapa=("tabela",),
+                   incluir_mapa=True):
+    """
+    Executa todos os benchmarks nas escalas informadas.
+
+    Args:
+        escalas (tuple): Fatores de ampliação do conjunto de dados
+        repeticoes (int): Repetições de cada medição
+        modos_mapa (tuple): Modos de ``criar_mapa_cobertura_consultas``
+        incluir_mapa (bool): Se False, não mede o mapa
+
+    Returns:
+        dict: Resultados com metadados do ambiente e medições por escala
+    """
+    base = load_state_dataset(ESTADO_PADRAO)
+    resultados = []
+    for fator in escalas:
+        df = scale_dataset(base, fator)
+        indice = FilterIndex(df)
+
+        medicoes = {}
+        medicoes.update(bench_loading(df, repeticoes, fator == 1))
+        medicoes.update(bench_filtering(df, indice, repeticoes))
+        medicoes.update(bench_charts(df, repeticoes))
+        if incluir_mapa:
+            medicoes.update(bench_map(df, repeticoes, modos_mapa))
+
+        resultados.append({
+            "escala": fator,
+            "linhas": len(df),
+            "anos": len(indice.years()),
+            "medicoes": medicoes
+        })
+
+    return {
+        "commit": _commit_atual(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "resultados": resultados
+    }
+
+
+def main(argv=None):
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(
+        description="Benchmarks do dashboard de saúde materna."
+    )
+    parser.add_argument("--escalas", default="1,10",
+                        help="fatores de ampliação separados por vírgula "
+                             "(ex.: 1,10,100,1000)")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--modos-mapa", default="tabela",
+                        help="modos do mapa separados por vírgula "
+                             "(tabela,camadas)")
+    parser.add_argument("--sem-mapa", action="store_true",
+                        help="não mede a renderização do mapa")
+    parser.add_argument("--saida", help="arquivo JSON de saída "
+                                        "(padrão: saída padrão)")
+    args = parser.parse_args(argv)
+
+    resultado = run_benchmarks(
+        escalas=tuple(int(valor) for valor in args.escalas.split(",")),
+        repeticoes=args.repeticoes,
+        modos_mapa=tuple(args.modos_mapa.split(",")),
+        incluir_mapa=not args.sem_mapa
+    )
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto)
+    else:
+        sys.stdout.write(texto + "\n")
+
+
+if __name__ == "__main__":
+    main()
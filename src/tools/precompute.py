@@ -0,0 +1,231 @@
+"""
+Pré-cálculo dos mapas e gráficos para todas as combinações de filtros
+
+O espaço de filtros do dashboard é finito: intervalos de anos × macros ×
+regionais × indicadores. Este comando renderiza, em um pool de processos,
+o HTML do mapa (em cada variante de malha usada pelas alturas do mapa) e o
+payload de cada gráfico, gravando-os no armazenamento de artefatos
+(``ARTIFACTS_DIR``). Em execução, o app consulta esses artefatos antes de
+renderizar; combinações ausentes continuam sendo renderizadas na hora.
+
+As chaves incluem a versão dos dados: após uma atualização, basta executar
+o comando novamente. Artefatos já existentes são mantidos (``--forcar``
+regrava todos), e os de versões anteriores dos dados do estado são
+removidos ao final (``--manter-versoes`` os preserva).
+
+Uso::
+
+    python -m src.tools.precompute [--uf PI] [--processos 4] [--sem-mapas]
+"""
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ..config import ARTIFACTS_DIR, ESTADO_PADRAO, INDICADORES, PLOT_CONFIG
+from ..utils.artifacts import ArtifactStore
+
+# Estado de cada processo do pool, preenchido por _inicializar
+_dados = {}
+
+
+def _inicializar(estado, diretorio, forcar):
+    """Carrega os dados uma vez por processo do pool."""
+    from ..data.refresh import LiveDataset
+
+    versao = LiveDataset(estado).current
+    _dados.update(
+        estado=estado,
+        indice=versao.indice,
+        cubo=versao.cubo,
+        alturas=map_heights(estado),
+        artefatos=ArtifactStore(diretorio),
+        forcar=forcar
+    )
+
+
+def filter_combinations(indice):
+    """
+    Enumera as combinações de filtros que a barra lateral pode produzir.
+
+    Args:
+        indice (FilterIndex): Índice de filtros dos dados
+
+    Returns:
+        list: Tuplas (ano_inicio, ano_fim, macro, regional)
+    """
+    combinacoes = []
+    anos = [int(ano) for ano in indice.years()]
+    intervalos = itertools.combinations_with_replacement(anos, 2)
+    for ano_inicio, ano_fim in intervalos:
+        for macro in ["Todas"] + indice.macros():
+            regionais = indice.regionals(ano_inicio, ano_fim, macro)
+            for regional in ["Todas"] + regionais:
+                combinacoes.append((ano_inicio, ano_fim, macro, regional))
+    return combinacoes
+
+
+def map_heights(estado=ESTADO_PADRAO):
+    """
+    Retorna uma altura de mapa para cada variante de malha selecionável.
+
+    Args:
+        estado (str): Sigla da UF, cujo zoom define as variantes
+
+    Returns:
+        list: Alturas, em pixels, com tolerâncias de simplificação distintas
+    """
+    from ..data.registry import get_state
+    from ..utils.geometry import select_tolerance
+
+    minima, maxima, passo = PLOT_CONFIG['map_height_range']
+    zoom = get_state(estado)['zoom']
+    por_tolerancia = {}
+    for altura in range(minima, maxima + 1, passo):
+        por_tolerancia.setdefault(select_tolerance(zoom, altura), altura)
+    return list(por_tolerancia.values())
+
+
+def _precalcular(filtros, incluir_mapas):
+    """Renderiza e grava os artefatos de uma combinação de filtros."""
+    from ..data.loader import filter_data
+    from ..visualizations import charts, maps
+
+    ano_inicio, ano_fim, macro, regional = filtros
+    indice, artefatos = _dados['indice'], _dados['artefatos']
+    df_filtrado = filter_data(indice.df, ano_inicio, ano_fim, macro,
+                              regional, index=indice)
+    if df_filtrado.empty:
+        return 0, 0
+    cubo = _dados['cubo'].filter(ano_inicio, ano_fim, macro, regional)
+    chave_cache = (indice.fingerprint, ano_inicio, ano_fim, macro, regional)
+
+    gravados = existentes = 0
+
+    def gravar(chave, produzir):
+        nonlocal gravados, existentes
+        if not _dados['forcar'] and chave in artefatos:
+            existentes += 1
+            return
+        artefatos.put(chave, produzir(), estado=_dados['estado'],
+                      versao=indice.fingerprint)
+        gravados += 1
+
+    for indicador in INDICADORES:
+        for tipo in charts.CONSTRUTORES:
+            gravar(
+                charts.payload_key(tipo, indicador, chave_cache),
+                lambda tipo=tipo, indicador=indicador: charts.chart_payload(
+                    tipo, df_filtrado, indicador, cubo
+                )
+            )
+        if not incluir_mapas:
+            continue
+        for altura in _dados['alturas']:
+            gravar(
+                maps.map_cache_key(indice.fingerprint, ano_inicio, ano_fim,
+                                   macro, regional, indicador, altura,
+                                   _dados['estado']),
+                lambda altura=altura, indicador=indicador: (
+                    maps.criar_mapa_cobertura_consultas(
+                        df_filtrado=df_filtrado,
+                        macro_selecionada=macro,
+                        regional_selecionada=regional,
+                        indicador_selecionado=indicador,
+                        altura_mapa=altura,
+                        estado=_dados['estado']
+                    )[1]
+                )
+            )
+    return gravados, existentes
+
+
+def precompute(estado=ESTADO_PADRAO, diretorio=ARTIFACTS_DIR, processos=None,
+               incluir_mapas=True, forcar=False, limpar=True):
+    """
+    Pré-calcula os artefatos de todas as combinações de filtros.
+
+    Args:
+        estado (str): Sigla da UF
+        diretorio (str): Diretório do armazenamento de artefatos
+        processos (int, optional): Tamanho do pool; por padrão, o número
+            de CPUs
+        incluir_mapas (bool): Se False, pré-calcula apenas os gráficos
+        forcar (bool): Se True, regrava artefatos já existentes
+        limpar (bool): Se True, remove ao final os artefatos de versões
+            anteriores dos dados do estado
+
+    Returns:
+        dict: Combinações processadas, artefatos gravados, reaproveitados
+        e removidos, tempo total e estatísticas do armazenamento
+    """
+    inicio = time.perf_counter()
+    _inicializar(estado, diretorio, forcar)
+    combinacoes = filter_combinations(_dados['indice'])
+
+    gravados = existentes = 0
+    with ProcessPoolExecutor(
+        max_workers=processos or os.cpu_count(),
+        initializer=_inicializar,
+        initargs=(estado, diretorio, forcar)
+    ) as pool:
+        resultados = pool.map(
+            _precalcular,
+            combinacoes,
+            itertools.repeat(incluir_mapas),
+            chunksize=8
+        )
+        for novos, reaproveitados in resultados:
+            gravados += novos
+            existentes += reaproveitados
+
+    removidos = None
+    if limpar:
+        removidos = ArtifactStore(diretorio).prune(
+            estado, [_dados['indice'].fingerprint]
+        )
+
+    return {
+        "combinacoes": len(combinacoes),
+        "gravados": gravados,
+        "reaproveitados": existentes,
+        "removidos": removidos,
+        "segundos": round(time.perf_counter() - inicio, 2),
+        "armazenamento": ArtifactStore(diretorio).stats()
+    }
+
+
+def main(argv=None):
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(
+        description="Pré-calcula mapas e gráficos de todos os filtros."
+    )
+    parser.add_argument("--uf", default=ESTADO_PADRAO,
+                        help="sigla da UF")
+    parser.add_argument("--diretorio", default=ARTIFACTS_DIR,
+                        help="diretório dos artefatos")
+    parser.add_argument("--processos", type=int,
+                        help="número de processos (padrão: CPUs)")
+    parser.add_argument("--sem-mapas", action="store_true",
+                        help="pré-calcula apenas os gráficos")
+    parser.add_argument("--forcar", action="store_true",
+                        help="regrava artefatos já existentes")
+    parser.add_argument("--manter-versoes", action="store_true",
+                        help="não remove artefatos de versões anteriores")
+    args = parser.parse_args(argv)
+
+    resumo = precompute(
+        estado=args.uf,
+        diretorio=args.diretorio,
+        processos=args.processos,
+        incluir_mapas=not args.sem_mapas,
+        forcar=args.forcar,
+        limpar=not args.manter_versoes
+    )
+    for nome, valor in resumo.items():
+        print(f"{nome}: {valor}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Limpeza dos artefatos e arquivos publicados que deixaram de ser usados
+
+O armazenamento de artefatos (``ARTIFACTS_DIR``) acumula uma cópia dos
+mapas e gráficos a cada versão dos dados, e o diretório dos documentos
+publicados (``STATIC_CONFIG['dir']``) acumula um documento por mapa
+exibido. Este comando:
+
+- mantém, para cada estado, apenas os artefatos da versão atual dos dados
+  e remove os objetos que deixaram de ser referenciados;
+- remove os documentos e cópias JS/CSS publicados sem uso há mais de
+  ``STATIC_CONFIG['max_idle_days']`` dias.
+
+Uso::
+
+    python -m src.tools.prune [--uf PI] [--dias 7]
+"""
+import argparse
+
+from ..config import ARTIFACTS_DIR, STATIC_CONFIG
+from ..utils.artifacts import ArtifactStore
+from ..utils.static_assets import prune_published
+
+
+def current_version(sigla):
+    """
+    Retorna a versão atual dos dados de um estado, como vista pelo app.
+
+    Args:
+        sigla (str): Sigla da UF
+
+    Returns:
+        str: Impressão digital usada nas chaves dos artefatos
+    """
+    from ..data.refresh import LiveDataset
+
+    return LiveDataset(sigla).current.indice.fingerprint
+
+
+def prune(estados=None, artefatos=ARTIFACTS_DIR,
+          estaticos=STATIC_CONFIG['dir'],
+          dias=STATIC_CONFIG['max_idle_days']):
+    """
+    Remove os artefatos de versões antigas e os arquivos publicados sem uso.
+
+    Args:
+        estados (iterable, optional): Siglas das UFs; por padrão, todas as
+            disponíveis
+        artefatos (str): Diretório do armazenamento de artefatos
+        estaticos (str): Diretório dos arquivos publicados
+        dias (float): Dias sem uso antes de remover um arquivo publicado
+
+    Returns:
+        dict: Itens removidos por estado (artefatos) e no diretório dos
+        arquivos publicados
+    """
+    from ..data.registry import available_states
+
+    armazenamento = ArtifactStore(artefatos)
+    resumo = {}
+    for sigla in estados or available_states():
+        resumo[sigla] = armazenamento.prune(sigla, [current_version(sigla)])
+    resumo["estaticos"] = prune_published(estaticos, dias)
+    return resumo
+
+
+def main(argv=None):
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(
+        description="Remove artefatos antigos e arquivos publicados sem uso."
+    )
+    parser.add_argument("--uf", action="append",
+                        help="sigla da UF (repetível; padrão: todas)")
+    parser.add_argument("--artefatos", default=ARTIFACTS_DIR,
+                        help="diretório dos artefatos")
+    parser.add_argument("--estaticos", default=STATIC_CONFIG['dir'],
+                        help="diretório dos arquivos publicados")
+    parser.add_argument("--dias", type=float,
+                        default=STATIC_CONFIG['max_idle_days'],
+                        help="dias sem uso antes de remover um arquivo "
+                             "publicado")
+    args = parser.parse_args(argv)
+
+    resumo = prune(args.uf, args.artefatos, args.estaticos, args.dias)
+    for nome, removidos in resumo.items():
+        detalhes = ", ".join(f"{chave}: {valor}"
+                             for chave, valor in removidos.items())
+        print(f"{nome}: {detalhes}")
+
+
+if __name__ == "__main__":
+    main()
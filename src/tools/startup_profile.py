@@ -0,0 +1,176 @@
+"""
+Relatório de tempo de inicialização do dashboard
+
+Executa o próprio ``app.py`` pelo ``AppTest`` do Streamlit (sem servidor),
+em um processo Python novo (como em um contêiner recém-criado), com
+``-X importtime``, e informa:
+
+- o tempo até cada marco da execução do script: configuração da página
+  (fim dos imports do ``app.py``), primeiro elemento e primeiro widget
+  enviados ao navegador, e a página completa;
+- os pacotes que mais pesam na importação, agrupados pelo pacote raiz.
+
+Os marcos são registrados pelas mensagens que o script envia ao navegador,
+de modo que o relatório acompanha o ``app.py`` sem reproduzir a sua
+sequência de inicialização. Os tempos incluem a importação do Streamlit e
+do ``AppTest`` (fase ``harness``).
+
+Uso::
+
+    python -m src.tools.startup_profile [--top 15] [--json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Diretório raiz do projeto (onde está o app.py)
+RAIZ_PROJETO = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)
+)))
+
+# Execução do app.py pelo AppTest; cada marco registra o tempo acumulado
+# desde o início do processo, na primeira mensagem correspondente
+_CODIGO_PAGINA = """
+import json
+import time
+
+inicio = time.perf_counter()
+fases = {}
+
+from streamlit.runtime.scriptrunner_utils.script_run_context import (
+    ScriptRunContext)
+from streamlit.testing.v1 import AppTest
+fases["harness"] = time.perf_counter() - inicio
+
+WIDGETS = {"selectbox", "slider", "radio", "multiselect", "checkbox",
+           "number_input", "text_input", "date_input", "button"}
+enqueue_original = ScriptRunContext.enqueue
+
+
+def enqueue(self, msg):
+    agora = time.perf_counter() - inicio
+    if msg.HasField("page_config_changed"):
+        fases.setdefault("configuracao_pagina", agora)
+    elif msg.HasField("delta"):
+        fases.setdefault("primeiro_elemento", agora)
+        elemento = msg.delta.new_element.WhichOneof("type")
+        if elemento in WIDGETS:
+            fases.setdefault("primeiro_widget", agora)
+    return enqueue_original(self, msg)
+
+
+ScriptRunContext.enqueue = enqueue
+execucao = AppTest.from_file("app.py", default_timeout=600).run()
+fases["pagina_completa"] = time.perf_counter() - inicio
+fases["excecoes"] = len(execucao.exception)
+print(json.dumps(fases))
+"""
+
+
+def _executar(codigo, importtime=False):
+    """Executa o código em um processo novo e retorna (fases, stderr)."""
+    comando = [sys.executable]
+    if importtime:
+        comando += ["-X", "importtime"]
+    comando += ["-c", codigo]
+
+    resultado = subprocess.run(
+        comando,
+        cwd=RAIZ_PROJETO,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    ultima_linha = resultado.stdout.strip().splitlines()[-1]
+    return json.loads(ultima_linha), resultado.stderr
+
+
+def parse_importtime(saida):
+    """
+    Agrupa a saída de ``-X importtime`` pelo pacote raiz.
+
+    Args:
+        saida (str): Saída de erro do processo executado com ``-X importtime``
+
+    Returns:
+        dict: Tempo próprio acumulado (em segundos) por pacote raiz
+    """
+    por_pacote = {}
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:") or "|" not in linha:
+            continue
+        proprio, _, modulo = linha[len("import time:"):].split("|")
+        if not proprio.strip().isdigit():
+            continue  # cabeçalho
+        raiz = modulo.strip().split(".")[0]
+        por_pacote[raiz] = por_pacote.get(raiz, 0.0) + int(proprio) / 1e6
+    return por_pacote
+
+
+def profile_startup(top=15):
+    """
+    Mede a inicialização do dashboard em um processo Python novo.
+
+    Args:
+        top (int): Número de pacotes listados no relatório de importação
+
+    Returns:
+        dict: Relatório com tempos por marco e pacotes mais lentos
+
+    Raises:
+        RuntimeError: Se a execução do app.py terminar com exceções
+    """
+    inicio = time.perf_counter()
+    fases, saida_importtime = _executar(_CODIGO_PAGINA, importtime=True)
+    fases["processo_total"] = time.perf_counter() - inicio
+    excecoes = fases.pop("excecoes")
+    if excecoes:
+        raise RuntimeError(f"app.py terminou com {excecoes} exceção(ões)")
+
+    pacotes = sorted(
+        parse_importtime(saida_importtime).items(),
+        key=lambda item: item[1],
+        reverse=True
+    )
+    return {
+        "fases": {nome: round(valor, 4) for nome, valor in fases.items()},
+        "imports": [
+            {"pacote": nome, "segundos": round(valor, 4)}
+            for nome, valor in pacotes[:top]
+        ]
+    }
+
+
+def _imprimir(relatorio):
+    """Exibe o relatório em formato de tabela simples."""
+    print("Fases (segundos desde o início do processo):")
+    for nome, valor in relatorio["fases"].items():
+        print(f"  {nome:<24} {valor:>8.3f}")
+    print("\nPacotes mais lentos para importar (tempo próprio):")
+    for item in relatorio["imports"]:
+        print(f"  {item['pacote']:<24} {item['segundos']:>8.3f}")
+
+
+def main(argv=None):
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(
+        description="Mede o tempo de inicialização do dashboard."
+    )
+    parser.add_argument("--top", type=int, default=15,
+                        help="número de pacotes listados")
+    parser.add_argument("--json", action="store_true",
+                        help="emite o relatório em JSON")
+    args = parser.parse_args(argv)
+
+    relatorio = profile_startup(top=args.top)
+    if args.json:
+        print(json.dumps(relatorio, indent=2))
+    else:
+        _imprimir(relatorio)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Exportação do dashboard como site estático
+
+Gera um diretório que pode ser servido por qualquer servidor de arquivos
+estáticos ou CDN, sem processo Python por visitante:
+
+- ``index.html``: página com os mesmos filtros, estatísticas, gráficos e
+  mapa do ``app.py``, calculados no navegador;
+- ``dados.json``: linhas do conjunto de dados em formato colunar compacto
+  (anos, macros, regionais e municípios codificados por dicionário);
+- ``geometria.json``: malha municipal simplificada, apenas com o nome;
+- ``plotly.min.js``: biblioteca Plotly.js do próprio pacote ``plotly``;
+- ``leaflet.js`` e ``leaflet.css``: cópias locais do Leaflet, quando
+  obtidas com ``python -m src.tools.vendor_assets``; sem elas, a página
+  usa a CDN.
+
+O mapa não tem camada base, como o do app; com as cópias locais, o site
+funciona sem acesso à internet.
+
+Os arquivos são lidos via ``fetch``; para testar localmente::
+
+    python -m src.tools.static_export --saida dist
+    python -m http.server --directory dist
+"""
+import argparse
+import json
+import math
+import os
+import shutil
+
+import plotly
+import plotly.colors
+from jinja2 import Template
+
+from ..config import ESTADO_PADRAO, INDICADORES, PLOT_CONFIG, STATIC_CONFIG
+from ..data.registry import get_state
+from ..utils.static_assets import vendored_manifest
+
+# Modelo da página, ao lado deste módulo
+MODELO_PAGINA = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "static_export.html")
+
+# Casas decimais dos valores dos indicadores no arquivo de dados
+CASAS_DECIMAIS = 2
+
+# Arquivos do Leaflet referenciados pelo Folium: nome no site -> URL
+ARQUIVOS_LEAFLET = {
+    "leaflet.css": "https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/"
+                   "leaflet.css",
+    "leaflet.js": "https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/"
+                  "leaflet.js"
+}
+
+
+def _codificar(serie):
+    """Codifica uma coluna por dicionário: (valores distintos, códigos)."""
+    valores = sorted(serie.dropna().unique().tolist())
+    posicao = {valor: i for i, valor in enumerate(valores)}
+    return valores, [posicao[valor] for valor in serie.tolist()]
+
+
+def _valores(serie):
+    """Converte os valores do indicador para JSON, com null no lugar de NaN."""
+    return [
+        None if valor is None or math.isnan(valor)
+        else round(float(valor), CASAS_DECIMAIS)
+        for valor in serie.astype(float).tolist()
+    ]
+
+
+def build_data_payload(df, estado=ESTADO_PADRAO, versao=None):
+    """
+    Monta o conteúdo de ``dados.json`` a partir do conjunto de dados.
+
+    Args:
+        df (pandas.DataFrame): Dados do estado
+        estado (str): Sigla da UF
+        versao (str, optional): Impressão digital do conjunto de dados
+
+    Returns:
+        dict: Dicionários das chaves, códigos por linha, valores por
+        indicador e parâmetros do mapa
+    """
+    from ..visualizations.maps import (ESTILO_DESTAQUE, ESTILO_MUNICIPIO,
+                                       _build_colormap)
+
+    anos, codigos_ano = _codificar(df["ANO"].astype(int))
+    macros, codigos_macro = _codificar(df["Macro"].astype(object))
+    regionais, codigos_regional = _codificar(df["Regional"].astype(object))
+    municipios, codigos_mun = _codificar(df["MUN"].astype(object))
+
+    # Cores das 10 classes do colormap do mapa; os limites das classes
+    # dependem dos valores filtrados e são calculados no navegador
+    colormap = _build_colormap(0.0, 1.0)
+    dados_estado = get_state(estado)
+
+    return {
+        "versao": versao,
+        "estado": dados_estado["nome"],
+        "indicadores": {
+            coluna: nome for coluna, nome in INDICADORES.items()
+            if coluna in df.columns
+        },
+        "anos": anos,
+        "macros": macros,
+        "regionais": regionais,
+        "municipios": municipios,
+        "linhas": {
+            "ano": codigos_ano,
+            "macro": codigos_macro,
+            "regional": codigos_regional,
+            "mun": codigos_mun
+        },
+        "valores": {
+            coluna: _valores(df[coluna])
+            for coluna in INDICADORES if coluna in df.columns
+        },
+        "mapa": {
+            "centro": dados_estado["centro"],
+            "zoom": dados_estado["zoom"],
+            "cores": [colormap.rgb_hex_str((i + 0.5) / 10)
+                      for i in range(10)],
+            "estilo": ESTILO_MUNICIPIO,
+            "destaque": ESTILO_DESTAQUE
+        },
+        "graficos": {
+            **{
+                chave: PLOT_CONFIG[chave]
+                for chave in ("bar_color", "line_color", "marker_color",
+                              "hist_color", "default_height")
+            },
+            "alturas_mapa": list(range(PLOT_CONFIG["map_height_range"][0],
+                                       PLOT_CONFIG["map_height_range"][1] + 1,
+                                       PLOT_CONFIG["map_height_range"][2])),
+            # Escala explícita: no Plotly.js, algumas escalas nomeadas têm
+            # a ordem invertida em relação às do pacote Python
+            "escala_calor": plotly.colors.get_colorscale(
+                PLOT_CONFIG["color_scheme"]
+            )
+        }
+    }
+
+
+def build_geometry(estado=ESTADO_PADRAO, altura_mapa=None):
+    """
+    Retorna a malha simplificada do estado apenas com o nome dos municípios.
+
+    Args:
+        estado (str): Sigla da UF
+        altura_mapa (int, optional): Altura do mapa, usada para escolher a
+            variante simplificada
+
+    Returns:
+        dict: Coleção de feições GeoJSON
+    """
+    from ..utils.geometry import load_geojson, resolve_geojson_path
+
+    dados_estado = get_state(estado)
+    geojson_data = load_geojson(resolve_geojson_path(
+        dados_estado["geojson"],
+        zoom=dados_estado["zoom"],
+        altura_mapa=altura_mapa or PLOT_CONFIG["default_height"]
+    ))
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "properties": {"name": feature["properties"].get("name", "")},
+                "geometry": feature["geometry"]
+            }
+            for feature in geojson_data["features"]
+        ]
+    }
+
+
+def _gravar_json(caminho, conteudo):
+    """Grava JSON compacto, sem espaços entre os separadores."""
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(conteudo, arquivo, ensure_ascii=False,
+                  separators=(",", ":"))
+
+
+def _copiar_leaflet(saida, vendor_dir=STATIC_CONFIG['vendor_dir']):
+    """
+    Copia o Leaflet das cópias locais para o site, quando disponíveis.
+
+    Args:
+        saida (str): Diretório do site
+        vendor_dir (str): Diretório das cópias locais
+
+    Returns:
+        dict: Nome no site -> endereço usado pela página (arquivo local ou
+        URL da CDN)
+    """
+    manifesto = vendored_manifest(vendor_dir)
+    enderecos = {}
+    for nome, url in ARQUIVOS_LEAFLET.items():
+        copia = (os.path.join(vendor_dir, manifesto[url])
+                 if url in manifesto else None)
+        if copia is not None and os.path.exists(copia):
+            shutil.copyfile(copia, os.path.join(saida, nome))
+            enderecos[nome] = nome
+        else:
+            enderecos[nome] = url
+    return enderecos
+
+
+def export_static_site(saida, estado=ESTADO_PADRAO):
+    """
+    Gera o site estático do dashboard no diretório informado.
+
+    Args:
+        saida (str): Diretório de saída (criado se necessário)
+        estado (str): Sigla da UF exportada
+
+    Returns:
+        dict: Tamanho em bytes de cada arquivo gerado
+    """
+    from ..data.refresh import LiveDataset
+
+    indice = LiveDataset(estado).current.indice
+    os.makedirs(saida, exist_ok=True)
+
+    _gravar_json(os.path.join(saida, "dados.json"),
+                 build_data_payload(indice.df, estado, indice.fingerprint))
+    _gravar_json(os.path.join(saida, "geometria.json"),
+                 build_geometry(estado))
+    shutil.copyfile(
+        os.path.join(os.path.dirname(plotly.__file__), "package_data",
+                     "plotly.min.js"),
+        os.path.join(saida, "plotly.min.js")
+    )
+    leaflet = _copiar_leaflet(saida)
+
+    with open(MODELO_PAGINA, encoding="utf-8") as arquivo:
+        modelo = Template(arquivo.read())
+    with open(os.path.join(saida, "index.html"), "w",
+              encoding="utf-8") as arquivo:
+        arquivo.write(modelo.render(
+            titulo="Dashboard de Vigilância de Saúde Materna",
+            estado=get_state(estado)["nome"],
+            leaflet_css=leaflet["leaflet.css"],
+            leaflet_js=leaflet["leaflet.js"]
+        ))
+
+    return {
+        nome: os.path.getsize(os.path.join(saida, nome))
+        for nome in sorted(os.listdir(saida))
+    }
+
+
+def main(argv=None):
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(
+        description="Exporta o dashboard como site estático."
+    )
+    parser.add_argument("--saida", default="dist",
+                        help="diretório de saída (padrão: dist)")
+    parser.add_argument("--uf", default=ESTADO_PADRAO,
+                        help="sigla da UF exportada")
+    args = parser.parse_args(argv)
+
+    for nome, tamanho in export_static_site(args.saida, args.uf).items():
+        print(f"{nome:<16} {tamanho:>10} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Servidor de ladrilhos da malha municipal e dos documentos dos mapas
+
+Serve, via Tornado, os ladrilhos GeoJSON de ``src.utils.tiles`` para o modo
+de mapa ``'ladrilhos'``: o mapa pede ao servidor apenas os ladrilhos da
+área visível, em vez de receber toda a malha do estado embutida no HTML.
+Serve também, no transporte ``'iframe'``, os documentos dos mapas e os
+arquivos JS/CSS publicados por ``src.utils.static_assets``, escolhendo a
+versão pré-comprimida aceita pelo navegador.
+
+Os endereços incluem a versão da malha e as respostas são comprimidas e
+marcadas como imutáveis (``Cache-Control``), de modo que navegadores e
+proxies as reutilizam. Ladrilhos ainda não gravados são gerados no primeiro
+pedido.
+
+Com ``PLOT_CONFIG['map_render_mode'] = 'ladrilhos'`` ou
+``PLOT_CONFIG['map_transport'] = 'iframe'``, o app inicia o servidor em
+segundo plano. Ele também pode ser executado à parte, com o
+pré-cálculo opcional de todos os ladrilhos::
+
+    python -m src.tools.tile_server [--porta 8765] [--precalcular --uf PI]
+
+Endereços::
+
+    /ladrilhos/<UF>/<versão da malha>/<z>/<x>/<y>.json
+    /estaticos/<hash do conteúdo>.<html|js|css>
+"""
+import argparse
+import asyncio
+import os
+import threading
+
+import tornado.web
+
+from ..config import ESTADOS, STATIC_CONFIG, TILE_CONFIG
+from ..data.registry import available_states, get_state
+from ..utils.static_assets import COMPRESSOES, TIPOS_CONTEUDO
+from ..utils.tiles import (LADRILHO_VAZIO, build_tile, geometry_version,
+                           precompute_tiles, tile_path, write_tile)
+
+# Padrão dos endereços dos ladrilhos
+ROTA_LADRILHOS = r"/ladrilhos/([A-Z]{2})/([0-9a-f]+)/(\d+)/(\d+)/(\d+)\.json"
+
+# Padrão dos endereços dos arquivos publicados
+ROTA_ESTATICOS = r"/estaticos/([0-9a-f]+)\.(html|js|css)"
+
+# Servidor iniciado em segundo plano neste processo
+_servidor = {}
+_trava = threading.Lock()
+
+
+class TileHandler(tornado.web.RequestHandler):
+    """Serve um ladrilho, gerando-o no primeiro pedido."""
+
+    def set_default_headers(self):
+        # O mapa é exibido em um iframe de outra origem
+        self.set_header("Access-Control-Allow-Origin", "*")
+
+    def get(self, sigla, versao, z, x, y):
+        z, x, y = int(z), int(x), int(y)
+        if (sigla not in ESTADOS or
+                not TILE_CONFIG['min_zoom'] <= z <= TILE_CONFIG['max_zoom'] or
+                not (0 <= x < 2 ** z and 0 <= y < 2 ** z)):
+            raise tornado.web.HTTPError(404)
+
+        caminho = tile_path(sigla, versao, z, x, y)
+        try:
+            with open(caminho, "rb") as arquivo:
+                dados = arquivo.read()
+        except FileNotFoundError:
+            caminho_geojson = get_state(sigla)['geojson']
+            # Versões antigas não são regeradas: a malha atual é outra
+            if (not os.path.exists(caminho_geojson) or
+                    geometry_version(caminho_geojson) != versao):
+                raise tornado.web.HTTPError(404)
+            conteudo = build_tile(caminho_geojson, z, x, y)
+            dados = write_tile(caminho, conteudo if conteudo["features"]
+                               else LADRILHO_VAZIO)
+
+        self.set_header("Content-Type", "application/json; charset=utf-8")
+        self.set_header("Cache-Control",
+                        f"public, max-age={TILE_CONFIG['max_age']}, "
+                        "immutable")
+        self.write(dados)
+
+
+class StaticHandler(tornado.web.RequestHandler):
+    """
+    Serve um arquivo publicado, na versão pré-comprimida aceita pelo
+    navegador (brotli, gzip ou sem compressão).
+    """
+
+    def set_default_headers(self):
+        self.set_header("Access-Control-Allow-Origin", "*")
+
+    def get(self, digest, extensao):
+        caminho = os.path.join(STATIC_CONFIG['dir'], f"{digest}.{extensao}")
+        aceitas = self.request.headers.get("Accept-Encoding", "")
+        codificacao = None
+        for candidata, sufixo in COMPRESSOES.items():
+            if candidata in aceitas and os.path.exists(caminho + sufixo):
+                codificacao = candidata
+                caminho += sufixo
+                break
+
+        # O nome já é o hash do conteúdo: serve de ETag sem reler o arquivo
+        self.set_header("Etag", f'"{digest}-{codificacao or "identity"}"')
+        # Com compress_response, o próprio Tornado acrescenta o Vary
+        if not self.application.settings.get("compress_response"):
+            self.set_header("Vary", "Accept-Encoding")
+        self.set_header("Cache-Control",
+                        f"public, max-age={STATIC_CONFIG['max_age']}, "
+                        "immutable")
+        if self.check_etag_header():
+            self.set_status(304)
+            return
+
+        try:
+            with open(caminho, "rb") as arquivo:
+                dados = arquivo.read()
+        except FileNotFoundError:
+            raise tornado.web.HTTPError(404)
+        self.set_header("Content-Type", TIPOS_CONTEUDO[extensao])
+        if codificacao:
+            self.set_header("Content-Encoding", codificacao)
+        self.write(dados)
+
+
+def make_app():
+    """
+    Cria a aplicação Tornado do servidor de ladrilhos.
+
+    Returns:
+        tornado.web.Application: Aplicação com as rotas dos ladrilhos e dos
+        arquivos publicados
+    """
+    return tornado.web.Application(
+        [(ROTA_LADRILHOS, TileHandler), (ROTA_ESTATICOS, StaticHandler)],
+        compress_response=True
+    )
+
+
+def start_in_background(porta=TILE_CONFIG['port']):
+    """
+    Inicia o servidor em uma thread, uma única vez por processo.
+
+    Se a porta já estiver em uso (por exemplo, por outro worker ou por um
+    servidor executado à parte), os ladrilhos são servidos por ele.
+
+    Args:
+        porta (int): Porta do servidor
+
+    Returns:
+        bool: True se este processo iniciou o servidor
+    """
+    with _trava:
+        if "thread" in _servidor:
+            return _servidor["iniciado"]
+
+        pronto = threading.Event()
+
+        def executar():
+            asyncio.set_event_loop(asyncio.new_event_loop())
+            try:
+                make_app().listen(porta)
+            except OSError:
+                _servidor["iniciado"] = False
+                pronto.set()
+                return
+            _servidor["iniciado"] = True
+            pronto.set()
+            asyncio.get_event_loop().run_forever()
+
+        _servidor["thread"] = threading.Thread(
+            target=executar, name="ladrilhos", daemon=True
+        )
+        _servidor["thread"].start()
+        pronto.wait()
+        return _servidor["iniciado"]
+
+
+def main(argv=None):
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(
+        description="Serve os ladrilhos da malha municipal."
+    )
+    parser.add_argument("--porta", type=int, default=TILE_CONFIG['port'],
+                        help=f"porta (padrão: {TILE_CONFIG['port']})")
+    parser.add_argument("--precalcular", action="store_true",
+                        help="grava todos os ladrilhos antes de servir")
+    parser.add_argument("--uf", action="append",
+                        help="sigla da UF pré-calculada (repetível; "
+                             "padrão: todas)")
+    parser.add_argument("--sem-servidor", action="store_true",
+                        help="apenas pré-calcula os ladrilhos")
+    args = parser.parse_args(argv)
+
+    if args.precalcular or args.sem_servidor:
+        for sigla in args.uf or available_states():
+            gravados = precompute_tiles(sigla, get_state(sigla)['geojson'])
+            print(f"{sigla}: {sum(gravados.values())} ladrilhos")
+    if args.sem_servidor:
+        return
+
+    make_app().listen(args.porta)
+    print(f"Servindo ladrilhos em http://localhost:{args.porta}")
+    asyncio.get_event_loop().run_forever()
+
+
+if __name__ == "__main__":
+    main()
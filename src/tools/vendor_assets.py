@@ -0,0 +1,53 @@
+"""
+Cópia local dos arquivos JS/CSS usados pelos mapas
+
+Os mapas do Folium referenciam bibliotecas em CDNs públicas, inacessíveis
+em implantações sem internet. Este comando grava cópias desses arquivos em
+``STATIC_CONFIG['vendor_dir']``; no transporte ``'iframe'``, os documentos
+dos mapas passam a referenciar as cópias, servidas pelo servidor de
+ladrilhos com cache imutável.
+
+Em uma máquina com internet::
+
+    python -m src.tools.vendor_assets
+
+Sem internet, a partir de um diretório com os arquivos já baixados
+(nomeados como o último trecho de cada URL listada por ``--listar``)::
+
+    python -m src.tools.vendor_assets --listar
+    python -m src.tools.vendor_assets --de /caminho/dos/arquivos
+"""
+import argparse
+
+from ..config import STATIC_CONFIG
+from ..utils.static_assets import vendor_assets
+from ..visualizations.maps import map_asset_urls
+
+
+def main(argv=None):
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(
+        description="Grava cópias locais dos arquivos JS/CSS dos mapas."
+    )
+    parser.add_argument("--destino", default=STATIC_CONFIG['vendor_dir'],
+                        help="diretório das cópias "
+                             f"(padrão: {STATIC_CONFIG['vendor_dir']})")
+    parser.add_argument("--de", dest="origem",
+                        help="diretório com os arquivos já baixados, em vez "
+                             "de baixá-los da internet")
+    parser.add_argument("--listar", action="store_true",
+                        help="apenas lista as URLs necessárias")
+    args = parser.parse_args(argv)
+
+    urls = map_asset_urls()
+    if args.listar:
+        print("\n".join(urls))
+        return
+
+    manifesto = vendor_assets(urls, args.destino, args.origem)
+    for url in urls:
+        print(f"{manifesto[url]} <- {url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Armazenamento em disco de artefatos pré-calculados, endereçado por conteúdo
+
+Cada artefato (HTML de mapa, payload de gráfico) é gravado uma única vez,
+com o nome igual ao hash do seu conteúdo; artefatos idênticos produzidos
+por filtros diferentes ocupam o espaço de um só. Uma referência por chave
+de cache aponta para o conteúdo correspondente::
+
+    <diretório>/objetos/<hh>/<hash do conteúdo>
+    <diretório>/chaves/<hh>/<hash da chave>.json
+
+As chaves incluem a versão dos dados, de modo que artefatos de versões
+anteriores nunca são servidos. A referência também registra o estado e a
+versão dos dados, e ``ArtifactStore.prune`` remove as referências de versões
+antigas e os objetos que deixaram de ser referenciados.
+"""
+import hashlib
+import json
+import os
+import time
+
+# Objetos gravados há menos tempo que isto não são removidos pela limpeza:
+# a referência de um artefato é gravada logo depois do seu objeto
+IDADE_MINIMA_LIMPEZA = 3600
+
+
+def key_digest(chave):
+    """
+    Retorna o hash estável de uma chave de cache.
+
+    Args:
+        chave (tuple): Chave composta por textos e números
+
+    Returns:
+        str: Hash hexadecimal da chave
+    """
+    texto = json.dumps(list(chave), default=str, ensure_ascii=False)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+def _gravar_atomicamente(caminho, conteudo):
+    """Grava bytes via arquivo temporário e substitui o destino."""
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    caminho_temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(caminho_temporario, "wb") as arquivo:
+        arquivo.write(conteudo)
+    os.replace(caminho_temporario, caminho)
+
+
+class ArtifactStore:
+    """
+    Artefatos textuais ou binários indexados por chave de cache.
+
+    Pode ser usado por vários processos ao mesmo tempo: as gravações são
+    atômicas e gravar duas vezes o mesmo conteúdo produz o mesmo arquivo.
+
+    Args:
+        diretorio (str): Diretório raiz do armazenamento
+    """
+
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+
+    def _caminho_chave(self, chave):
+        digest = key_digest(chave)
+        return os.path.join(self.diretorio, "chaves", digest[:2],
+                            f"{digest}.json")
+
+    def _caminho_objeto(self, digest):
+        return os.path.join(self.diretorio, "objetos", digest[:2], digest)
+
+    def __contains__(self, chave):
+        return os.path.exists(self._caminho_chave(chave))
+
+    def get(self, chave, padrao=None):
+        """
+        Retorna o artefato da chave.
+
+        Args:
+            chave (tuple): Chave de cache
+            padrao: Valor retornado se não houver artefato
+
+        Returns:
+            str | bytes: Artefato, no mesmo tipo em que foi gravado
+        """
+        try:
+            with open(self._caminho_chave(chave), encoding="utf-8") as ref:
+                referencia = json.load(ref)
+            with open(self._caminho_objeto(referencia["objeto"]), "rb") as f:
+                conteudo = f.read()
+        except (OSError, ValueError, KeyError):
+            return padrao
+        return conteudo.decode("utf-8") if referencia["texto"] else conteudo
+
+    def put(self, chave, valor, estado=None, versao=None):
+        """
+        Grava o artefato da chave.
+
+        Args:
+            chave (tuple): Chave de cache
+            valor (str | bytes): Artefato
+            estado (str, optional): Sigla da UF dos dados do artefato
+            versao (str, optional): Versão (impressão digital) dos dados,
+                usada por ``prune``
+
+        Returns:
+            str: Hash do conteúdo gravado
+        """
+        texto = isinstance(valor, str)
+        conteudo = valor.encode("utf-8") if texto else bytes(valor)
+        digest = hashlib.sha256(conteudo).hexdigest()
+
+        caminho_objeto = self._caminho_objeto(digest)
+        if not os.path.exists(caminho_objeto):
+            _gravar_atomicamente(caminho_objeto, conteudo)
+        _gravar_atomicamente(
+            self._caminho_chave(chave),
+            json.dumps({"objeto": digest, "texto": texto, "estado": estado,
+                        "versao": versao}).encode("utf-8")
+        )
+        return digest
+
+    def _referencias(self):
+        """Percorre as referências gravadas: (caminho, conteúdo ou None)."""
+        for raiz, _, arquivos in os.walk(os.path.join(self.diretorio,
+                                                      "chaves")):
+            for nome in arquivos:
+                if not nome.endswith(".json"):
+                    continue
+                caminho = os.path.join(raiz, nome)
+                try:
+                    with open(caminho, encoding="utf-8") as arquivo:
+                        yield caminho, json.load(arquivo)
+                except (OSError, ValueError):
+                    yield caminho, None
+
+    def prune(self, estado, manter, idade_minima=IDADE_MINIMA_LIMPEZA):
+        """
+        Remove os artefatos de versões antigas dos dados de um estado.
+
+        São removidas as referências do estado cuja versão não está em
+        ``manter`` e as referências sem estado ou versão (gravadas antes de
+        registrá-los, ou ilegíveis). Em seguida, os objetos que nenhuma
+        referência restante aponta são apagados.
+
+        Args:
+            estado (str): Sigla da UF
+            manter (iterable): Versões dos dados a manter
+            idade_minima (float): Objetos gravados há menos segundos que
+                isto são mantidos, para não apagar um artefato cuja
+                referência ainda está sendo gravada
+
+        Returns:
+            dict: Referências e objetos removidos e bytes liberados
+        """
+        manter = set(manter)
+        removidos = {"chaves": 0, "objetos": 0, "bytes": 0}
+        referenciados = set()
+        for caminho, referencia in self._referencias():
+            antiga = (
+                referencia is None or
+                referencia.get("versao") is None or
+                referencia.get("estado") is None or
+                (referencia["estado"] == estado and
+                 referencia["versao"] not in manter)
+            )
+            if not antiga:
+                referenciados.add(referencia["objeto"])
+                continue
+            try:
+                os.remove(caminho)
+                removidos["chaves"] += 1
+            except OSError:
+                pass
+
+        limite = time.time() - idade_minima
+        for raiz, _, arquivos in os.walk(os.path.join(self.diretorio,
+                                                      "objetos")):
+            for nome in arquivos:
+                if nome in referenciados:
+                    continue
+                caminho = os.path.join(raiz, nome)
+                try:
+                    informacoes = os.stat(caminho)
+                    if informacoes.st_mtime > limite:
+                        continue
+                    os.remove(caminho)
+                except OSError:
+                    continue
+                removidos["objetos"] += 1
+                removidos["bytes"] += informacoes.st_size
+        return removidos
+
+    def stats(self):
+        """
+        Retorna o número de chaves e de objetos e o total de bytes.
+
+        Returns:
+            dict: Contadores do armazenamento
+        """
+        estatisticas = {"chaves": 0, "objetos": 0, "bytes": 0}
+        for raiz, _, arquivos in os.walk(os.path.join(self.diretorio,
+                                                      "chaves")):
+            estatisticas["chaves"] += len(arquivos)
+        for raiz, _, arquivos in os.walk(os.path.join(self.diretorio,
+                                                      "objetos")):
+            estatisticas["objetos"] += len(arquivos)
+            estatisticas["bytes"] += sum(
+                os.path.getsize(os.path.join(raiz, nome)) for nome in arquivos
+            )
+        return estatisticas
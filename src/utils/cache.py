@@ -0,0 +1,185 @@
+"""
+Cache em memória com limite de entradas e de bytes, compartilhado entre sessões
+"""
+import threading
+from collections import OrderedDict
+
+# Caches com nome, cujos contadores são exibidos no painel de desempenho e
+# exportados para o Prometheus
+_CACHES_NOMEADOS = {}
+
+
+class _Calculo:
+    """Cálculo em andamento de uma chave, aguardado pelas demais threads."""
+
+    def __init__(self):
+        self.concluido = threading.Event()
+        self.valor = None
+        self.sucesso = False
+
+
+def _tamanho_padrao(valor):
+    """Estima o tamanho em bytes de valores textuais e binários."""
+    if isinstance(valor, str):
+        return len(valor.encode("utf-8"))
+    if isinstance(valor, (bytes, bytearray, memoryview)):
+        return len(valor)
+    raise TypeError(
+        "Informe a função de tamanho para valores que não são str ou bytes."
+    )
+
+
+class BoundedCache:
+    """
+    Cache LRU limitado pelo número de entradas e pelo total de bytes.
+
+    É seguro para uso concorrente pelas threads do Streamlit. Ao exceder
+    qualquer um dos limites, as entradas usadas há mais tempo são removidas.
+    Valores maiores que o limite de bytes não são armazenados. Em
+    ``get_or_compute``, uma chave ausente é calculada por uma única thread;
+    as demais que pedem a mesma chave aguardam e recebem o mesmo valor.
+
+    Args:
+        max_entries (int): Número máximo de entradas
+        max_bytes (int): Soma máxima do tamanho das entradas, em bytes
+        tamanho (callable, optional): Função que retorna o tamanho em bytes
+            de um valor; por padrão aceita ``str`` e ``bytes``
+        nome (str, optional): Nome com que os contadores do cache aparecem
+            em ``cache_stats``
+    """
+
+    def __init__(self, max_entries, max_bytes, tamanho=None, nome=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._tamanho = tamanho or _tamanho_padrao
+        self._itens = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._em_andamento = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if nome is not None:
+            _CACHES_NOMEADOS[nome] = self
+
+    def get(self, chave, padrao=None):
+        """
+        Retorna o valor armazenado, marcando a entrada como usada.
+
+        Args:
+            chave (hashable): Chave da entrada
+            padrao (object, optional): Valor retornado quando não há entrada
+
+        Returns:
+            object: Valor armazenado ou ``padrao``
+        """
+        with self._lock:
+            if chave not in self._itens:
+                self.misses += 1
+                return padrao
+            self._itens.move_to_end(chave)
+            self.hits += 1
+            return self._itens[chave][0]
+
+    def put(self, chave, valor):
+        """
+        Armazena um valor, removendo entradas antigas se necessário.
+
+        Args:
+            chave (hashable): Chave da entrada
+            valor (object): Valor a armazenar
+        """
+        tamanho = self._tamanho(valor)
+        if tamanho > self.max_bytes:
+            return
+
+        with self._lock:
+            if chave in self._itens:
+                self._bytes -= self._itens.pop(chave)[1]
+            self._itens[chave] = (valor, tamanho)
+            self._bytes += tamanho
+
+            while (len(self._itens) > self.max_entries or
+                   self._bytes > self.max_bytes):
+                _, (_, tamanho_removido) = self._itens.popitem(last=False)
+                self._bytes -= tamanho_removido
+                self.evictions += 1
+
+    def get_or_compute(self, chave, calcular):
+        """
+        Retorna o valor em cache ou calcula, armazena e retorna um novo.
+
+        Chamadas simultâneas para a mesma chave ausente executam ``calcular``
+        uma única vez: as demais aguardam o resultado, contado como acerto.
+        Se o cálculo falhar, a exceção é propagada a quem calculou e a
+        próxima thread na espera tenta novamente.
+
+        Args:
+            chave (hashable): Chave da entrada
+            calcular (callable): Função sem argumentos que produz o valor
+
+        Returns:
+            object: Valor armazenado ou recém-calculado
+        """
+        while True:
+            with self._lock:
+                if chave in self._itens:
+                    self._itens.move_to_end(chave)
+                    self.hits += 1
+                    return self._itens[chave][0]
+                calculo = self._em_andamento.get(chave)
+                responsavel = calculo is None
+                if responsavel:
+                    self.misses += 1
+                    calculo = self._em_andamento[chave] = _Calculo()
+
+            if not responsavel:
+                calculo.concluido.wait()
+                if calculo.sucesso:
+                    with self._lock:
+                        self.hits += 1
+                    return calculo.valor
+                continue
+
+            try:
+                calculo.valor = calcular()
+                calculo.sucesso = True
+                self.put(chave, calculo.valor)
+                return calculo.valor
+            finally:
+                with self._lock:
+                    del self._em_andamento[chave]
+                calculo.concluido.set()
+
+    def clear(self):
+        """Remove todas as entradas, mantendo os contadores."""
+        with self._lock:
+            self._itens.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Retorna os contadores de uso do cache.
+
+        Returns:
+            dict: Acertos, faltas, remoções, entradas e bytes armazenados
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._itens),
+                "bytes": self._bytes
+            }
+
+
+def cache_stats():
+    """
+    Retorna os contadores de uso de todos os caches com nome.
+
+    Returns:
+        dict: ``BoundedCache.stats()`` de cada cache, pelo nome
+    """
+    return {nome: cache.stats()
+            for nome, cache in sorted(_CACHES_NOMEADOS.items())}
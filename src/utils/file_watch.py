@@ -0,0 +1,118 @@
+"""
+Observação de arquivos de dados em segundo plano
+
+Usa o ``watchdog`` para receber eventos do sistema de arquivos e agrupa as
+alterações de um intervalo curto em uma única chamada, já que uma gravação
+costuma gerar vários eventos (arquivo temporário, escrita e renomeação).
+"""
+import os
+import threading
+
+# Sufixos de arquivos temporários, ignorados até serem renomeados
+SUFIXOS_IGNORADOS = ('.tmp', '~')
+
+
+class FileWatcher:
+    """
+    Observa diretórios e arquivos e repassa os alterados a uma função.
+
+    Args:
+        diretorios (list): Diretórios observados, recursivamente
+        ao_mudar (callable): Função chamada com o conjunto de caminhos
+            absolutos alterados
+        atraso (float): Segundos sem novos eventos antes de chamar
+            ``ao_mudar``
+        arquivos (iterable, optional): Arquivos observados individualmente;
+            os demais arquivos dos seus diretórios (e os subdiretórios)
+            são ignorados
+    """
+
+    def __init__(self, diretorios, ao_mudar, atraso=1.0, arquivos=()):
+        self.diretorios = [os.path.abspath(d) for d in diretorios
+                           if os.path.isdir(d)]
+        self.arquivos = {os.path.abspath(a) for a in arquivos}
+        self.ao_mudar = ao_mudar
+        self.atraso = atraso
+        self._pendentes = set()
+        self._temporizador = None
+        self._trava = threading.Lock()
+        self._observador = None
+
+    def _observado(self, caminho):
+        """Indica se o caminho é observado (diretamente ou pelo diretório)."""
+        return caminho in self.arquivos or any(
+            caminho.startswith(diretorio + os.sep)
+            for diretorio in self.diretorios
+        )
+
+    def _registrar(self, caminho):
+        """Acumula um caminho alterado e reinicia a contagem do atraso."""
+        if not caminho or caminho.endswith(SUFIXOS_IGNORADOS):
+            return
+        caminho = os.path.abspath(caminho)
+        if not self._observado(caminho):
+            return
+        with self._trava:
+            self._pendentes.add(caminho)
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+            self._temporizador = threading.Timer(self.atraso, self._despachar)
+            self._temporizador.daemon = True
+            self._temporizador.start()
+
+    def _despachar(self):
+        """Entrega os caminhos acumulados a ``ao_mudar``."""
+        with self._trava:
+            caminhos, self._pendentes = self._pendentes, set()
+            self._temporizador = None
+        if caminhos:
+            self.ao_mudar(caminhos)
+
+    def start(self):
+        """
+        Inicia a observação em uma thread de segundo plano.
+
+        Returns:
+            bool: True se a observação foi iniciada
+        """
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        observador_arquivos = self
+
+        class _Tratador(FileSystemEventHandler):
+            def on_any_event(self, evento):
+                if evento.is_directory or evento.event_type in (
+                        "opened", "closed_no_write"):
+                    return
+                observador_arquivos._registrar(
+                    getattr(evento, "dest_path", "") or evento.src_path
+                )
+
+        # Diretórios dos arquivos avulsos, observados sem os subdiretórios
+        rasos = sorted({
+            os.path.dirname(arquivo) for arquivo in self.arquivos
+            if os.path.isdir(os.path.dirname(arquivo)) and
+            not self._observado(os.path.dirname(arquivo))
+        })
+        if not self.diretorios and not rasos:
+            return False
+        self._observador = Observer()
+        self._observador.daemon = True
+        for diretorio in self.diretorios:
+            self._observador.schedule(_Tratador(), diretorio, recursive=True)
+        for diretorio in rasos:
+            self._observador.schedule(_Tratador(), diretorio, recursive=False)
+        self._observador.start()
+        return True
+
+    def stop(self):
+        """Interrompe a observação e descarta alterações pendentes."""
+        with self._trava:
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+            self._pendentes.clear()
+        if self._observador is not None:
+            self._observador.stop()
+            self._observador.join()
+            self._observador = None
@@ -0,0 +1,87 @@
+"""
+Impressão digital de arquivos para chaves de cache
+
+A assinatura (data de modificação e tamanho) é obtida com um único ``stat``
+e decide se o arquivo precisa ser relido. Quando ela muda, o conteúdo é
+confirmado por hash: um arquivo apenas tocado, ou regravado com o mesmo
+conteúdo, mantém a mesma impressão digital e não invalida os caches.
+"""
+import hashlib
+import os
+import threading
+
+# Tamanho dos blocos lidos ao calcular o hash
+TAMANHO_BLOCO = 1024 * 1024
+
+# Último hash calculado por caminho, com a assinatura correspondente
+_hashes = {}
+_trava = threading.Lock()
+
+
+def file_signature(caminho):
+    """
+    Retorna a assinatura barata de um arquivo.
+
+    Args:
+        caminho (str): Caminho do arquivo
+
+    Returns:
+        tuple: (mtime_ns, tamanho) ou None se o arquivo não existir
+    """
+    try:
+        info = os.stat(caminho)
+    except OSError:
+        return None
+    return info.st_mtime_ns, info.st_size
+
+
+def _hash_arquivo(caminho):
+    """Calcula o hash SHA-256 do conteúdo do arquivo."""
+    digest = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(TAMANHO_BLOCO), b""):
+            digest.update(bloco)
+    return digest.hexdigest()[:16]
+
+
+def file_fingerprint(caminho):
+    """
+    Retorna a impressão digital do conteúdo de um arquivo.
+
+    O hash só é recalculado quando a assinatura do arquivo muda.
+
+    Args:
+        caminho (str): Caminho do arquivo
+
+    Returns:
+        str: Hash hexadecimal curto do conteúdo ou None se o arquivo não
+        existir
+    """
+    caminho = os.path.abspath(caminho)
+    assinatura = file_signature(caminho)
+    if assinatura is None:
+        return None
+
+    with _trava:
+        conhecido = _hashes.get(caminho)
+    if conhecido is not None and conhecido[0] == assinatura:
+        return conhecido[1]
+
+    try:
+        digest = _hash_arquivo(caminho)
+    except OSError:
+        return None
+    with _trava:
+        _hashes[caminho] = (assinatura, digest)
+    return digest
+
+
+def forget(caminho):
+    """
+    Descarta a impressão digital memorizada de um arquivo.
+
+    Args:
+        caminho (str): Caminho do arquivo
+    """
+    with _trava:
+        _hashes.pop(os.path.abspath(caminho), None)
@@ -0,0 +1,398 @@
+"""
+Simplificação e quantização da malha municipal usada nos mapas
+
+A simplificação é feita sobre os arcos compartilhados entre municípios, e não
+polígono a polígono, para que as fronteiras vizinhas continuem coincidentes.
+As variantes geradas são gravadas ao lado do GeoJSON de origem e reutilizadas
+enquanto não forem mais antigas que ele. Com ``SHARED_DIR``, as variantes
+publicadas por ``src.data.shared`` (Arrow IPC com a geometria em WKB) são
+mapeadas em memória, compartilhadas entre os processos, e as feições são
+montadas a partir do arquivo mapeado apenas quando usadas.
+
+Uso pela linha de comando (gera todas as variantes configuradas)::
+
+    python -m src.utils.geometry
+"""
+import json
+import math
+import os
+from functools import lru_cache
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import shapely
+from shapely.geometry import mapping, shape
+
+from ..config import CACHE_CONFIG, GEOJSON_PATH, MAP_CONFIG, SHARED_DIR
+from .fingerprint import file_fingerprint
+
+# Extensão das variantes publicadas no diretório compartilhado
+EXTENSAO_COMPARTILHADA = ".arrow"
+
+
+def decimal_places_for(tolerancia):
+    """
+    Retorna o número de casas decimais usado para quantizar as coordenadas.
+
+    A grade de quantização fica uma ordem de grandeza abaixo da tolerância
+    de simplificação, para não introduzir deslocamentos visíveis.
+
+    Args:
+        tolerancia (float): Tolerância de simplificação, em graus
+
+    Returns:
+        int: Número de casas decimais das coordenadas
+    """
+    return max(3, math.ceil(-math.log10(tolerancia)) + 1)
+
+
+def simplified_path_for(caminho_geojson, tolerancia):
+    """
+    Retorna o caminho em disco da variante simplificada de um GeoJSON.
+
+    Args:
+        caminho_geojson (str): Caminho do GeoJSON de origem
+        tolerancia (float): Tolerância de simplificação, em graus
+
+    Returns:
+        str: Caminho da variante, no mesmo diretório do arquivo de origem
+    """
+    base, extensao = os.path.splitext(caminho_geojson)
+    return f"{base}.simpl-{tolerancia:g}{extensao}"
+
+
+def shared_variant_path(caminho_geojson, tolerancia, diretorio=SHARED_DIR):
+    """
+    Retorna o caminho da variante simplificada no diretório compartilhado.
+
+    Args:
+        caminho_geojson (str): Caminho do GeoJSON de origem
+        tolerancia (float): Tolerância de simplificação, em graus
+        diretorio (str): Diretório compartilhado entre processos
+
+    Returns:
+        str: Caminho da variante publicada (Arrow IPC)
+    """
+    base = os.path.splitext(
+        os.path.basename(simplified_path_for(caminho_geojson, tolerancia))
+    )[0]
+    return os.path.join(diretorio, base + EXTENSAO_COMPARTILHADA)
+
+
+def select_tolerance(zoom=None, altura_mapa=None):
+    """
+    Escolhe a tolerância de simplificação adequada ao zoom e à altura do mapa.
+
+    A tolerância escolhida é a maior que não ultrapassa meio pixel no zoom
+    de exibição. Mapas mais altos tendem a ser explorados com mais zoom, por
+    isso contam como um nível de zoom adicional.
+
+    Args:
+        zoom (int, optional): Zoom inicial do mapa
+        altura_mapa (int, optional): Altura do mapa em pixels
+
+    Returns:
+        float: Tolerância de simplificação, em graus
+    """
+    tolerancias = sorted(MAP_CONFIG['simplify_tolerances'])
+    zoom = MAP_CONFIG['zoom_start'] if zoom is None else zoom
+    if altura_mapa is not None and altura_mapa >= 700:
+        zoom += 1
+
+    # Tamanho de um pixel, em graus de longitude, no zoom informado
+    meio_pixel = 360 / (256 * 2 ** zoom) / 2
+    adequadas = [tol for tol in tolerancias if tol <= meio_pixel]
+    return adequadas[-1] if adequadas else tolerancias[0]
+
+
+def _quantizar(geometrias, casas_decimais):
+    """Arredonda as coordenadas das geometrias para a grade informada."""
+    return shapely.transform(
+        geometrias,
+        lambda coordenadas: np.round(coordenadas, casas_decimais)
+    )
+
+
+def simplify_feature_collection(geojson_data, tolerancia):
+    """
+    Simplifica uma coleção de polígonos preservando as fronteiras comuns.
+
+    As bordas de todos os polígonos são unidas e divididas em arcos entre
+    os pontos de junção. Cada arco é simplificado e quantizado uma única vez
+    e os polígonos são reconstruídos a partir dos arcos, de modo que os dois
+    lados de uma fronteira usam exatamente os mesmos vértices. Polígonos que
+    não puderem ser reconstruídos são simplificados individualmente.
+
+    Args:
+        geojson_data (dict): FeatureCollection com polígonos
+        tolerancia (float): Tolerância de simplificação, em graus
+
+    Returns:
+        dict: FeatureCollection simplificada, com as mesmas propriedades
+    """
+    casas_decimais = decimal_places_for(tolerancia)
+    features = geojson_data["features"]
+    poligonos = np.array([shape(feature["geometry"]) for feature in features])
+
+    # Arcos compartilhados entre os municípios
+    bordas = shapely.union_all(shapely.boundary(poligonos))
+    arcos = shapely.get_parts(shapely.line_merge(bordas))
+    arcos = shapely.simplify(arcos, tolerancia, preserve_topology=True)
+    arcos = _quantizar(arcos, casas_decimais)
+
+    # Reconstrução das faces e associação ao município de origem
+    faces = shapely.get_parts(shapely.polygonize(arcos))
+    arvore = shapely.STRtree(poligonos)
+    indices_faces, indices_poligonos = arvore.query(
+        shapely.point_on_surface(faces),
+        predicate="within"
+    )
+    faces_por_poligono = {}
+    for indice_face, indice_poligono in zip(indices_faces, indices_poligonos):
+        faces_por_poligono.setdefault(indice_poligono, []).append(
+            faces[indice_face]
+        )
+
+    features_simplificadas = []
+    for indice, feature in enumerate(features):
+        faces_municipio = faces_por_poligono.get(indice)
+        if faces_municipio:
+            geometria = shapely.union_all(faces_municipio)
+        else:
+            geometria = _quantizar(
+                shapely.simplify(poligonos[indice], tolerancia,
+                                 preserve_topology=True),
+                casas_decimais
+            )
+        features_simplificadas.append({
+            "type": "Feature",
+            "properties": feature["properties"],
+            "geometry": mapping(geometria)
+        })
+
+    return {"type": "FeatureCollection", "features": features_simplificadas}
+
+
+def build_simplified_geojson(caminho_geojson, tolerancia):
+    """
+    Gera (ou reutiliza) a variante simplificada gravada em disco.
+
+    Args:
+        caminho_geojson (str): Caminho do GeoJSON de origem
+        tolerancia (float): Tolerância de simplificação, em graus
+
+    Returns:
+        str: Caminho da variante simplificada
+    """
+    caminho_variante = simplified_path_for(caminho_geojson, tolerancia)
+    if (os.path.exists(caminho_variante) and
+            os.path.getmtime(caminho_variante) >=
+            os.path.getmtime(caminho_geojson)):
+        return caminho_variante
+
+    with open(caminho_geojson, "r", encoding="utf-8") as geojson_file:
+        geojson_data = json.load(geojson_file)
+
+    simplificado = simplify_feature_collection(geojson_data, tolerancia)
+
+    caminho_temporario = f"{caminho_variante}.{os.getpid()}.tmp"
+    with open(caminho_temporario, "w", encoding="utf-8") as destino:
+        json.dump(simplificado, destino, ensure_ascii=False,
+                  separators=(",", ":"))
+    os.replace(caminho_temporario, caminho_variante)
+
+    return caminho_variante
+
+
+def resolve_geojson_path(caminho_geojson=GEOJSON_PATH, zoom=None,
+                         altura_mapa=None):
+    """
+    Retorna o caminho da variante adequada ao zoom e à altura do mapa.
+
+    Com ``SHARED_DIR`` definido, a variante já publicada no diretório
+    compartilhado é usada sem verificação nem simplificação. Se a variante
+    não puder ser gerada (por exemplo, diretório sem permissão de escrita),
+    o GeoJSON original é usado.
+
+    Args:
+        caminho_geojson (str): Caminho do GeoJSON de origem
+        zoom (int, optional): Zoom inicial do mapa
+        altura_mapa (int, optional): Altura do mapa em pixels
+
+    Returns:
+        str: Caminho do GeoJSON a ser carregado
+    """
+    tolerancia = select_tolerance(zoom, altura_mapa)
+    if SHARED_DIR:
+        compartilhada = shared_variant_path(caminho_geojson, tolerancia)
+        if os.path.exists(compartilhada):
+            return compartilhada
+    try:
+        return build_simplified_geojson(caminho_geojson, tolerancia)
+    except OSError:
+        return caminho_geojson
+
+
+def is_shared_geometry(caminho):
+    """
+    Indica se o caminho é uma malha publicada no diretório compartilhado.
+
+    Args:
+        caminho (str): Caminho da malha
+
+    Returns:
+        bool: True para malhas em Arrow IPC
+    """
+    return caminho.endswith(EXTENSAO_COMPARTILHADA)
+
+
+@lru_cache(maxsize=CACHE_CONFIG['geojson_max_entries'])
+def _ler_geojson(caminho_geojson, versao):
+    """Lê o GeoJSON; ``versao`` só participa da chave do cache."""
+    with open(caminho_geojson, "r", encoding="utf-8") as geojson_file:
+        return json.load(geojson_file)
+
+
+@lru_cache(maxsize=CACHE_CONFIG['geojson_max_entries'])
+def _mapear_malha(caminho, versao):
+    """
+    Mapeia a malha publicada; ``versao`` só participa da chave do cache.
+
+    A tabela aponta para as páginas do arquivo, compartilhadas entre os
+    processos; manter a referência não duplica a malha.
+    """
+    from ..data.shared import map_geometry
+    return map_geometry(caminho)
+
+
+def load_geometry_table(caminho):
+    """
+    Retorna a tabela mapeada de uma malha publicada.
+
+    Args:
+        caminho (str): Caminho da malha em Arrow IPC
+
+    Returns:
+        pyarrow.Table: Propriedades e geometria (WKB) de cada município
+    """
+    return _mapear_malha(os.path.abspath(caminho), file_fingerprint(caminho))
+
+
+def geometry_features(tabela, posicoes=None):
+    """
+    Monta as feições GeoJSON de linhas de uma malha publicada.
+
+    Args:
+        tabela (pyarrow.Table): Tabela de ``load_geometry_table``
+        posicoes (array-like, optional): Linhas a montar, na ordem
+            informada; por padrão, todas
+
+    Returns:
+        list: Feições com as propriedades não nulas e a geometria
+    """
+    from ..data.shared import COLUNA_GEOMETRIA
+
+    if posicoes is not None:
+        tabela = tabela.take(np.asarray(posicoes, dtype=np.intp))
+    geometrias = shapely.from_wkb(
+        tabela.column(COLUNA_GEOMETRIA).to_numpy(zero_copy_only=False)
+    )
+    propriedades = tabela.drop_columns([COLUNA_GEOMETRIA]).to_pylist()
+    return [
+        {
+            "type": "Feature",
+            "properties": {chave: valor for chave, valor in props.items()
+                           if valor is not None},
+            "geometry": mapping(geometria)
+        }
+        for props, geometria in zip(propriedades, geometrias)
+    ]
+
+
+def load_geojson(caminho_geojson):
+    """
+    Carrega o GeoJSON, mantido em cache enquanto o conteúdo não mudar.
+
+    Malhas publicadas no diretório compartilhado não são copiadas para o
+    cache: as feições são montadas do arquivo mapeado a cada chamada.
+
+    Args:
+        caminho_geojson (str): Caminho do arquivo GeoJSON ou da malha
+            publicada
+
+    Returns:
+        dict: Coleção de feições do arquivo
+    """
+    if is_shared_geometry(caminho_geojson):
+        return {
+            "type": "FeatureCollection",
+            "features": geometry_features(load_geometry_table(caminho_geojson))
+        }
+    return _ler_geojson(os.path.abspath(caminho_geojson),
+                        file_fingerprint(caminho_geojson))
+
+
+@lru_cache(maxsize=CACHE_CONFIG['geojson_max_entries'])
+def _indice_municipios(caminho_geojson, versao):
+    """
+    Posições das feições por nome do município; ``versao`` só participa da
+    chave do cache.
+    """
+    indice = {}
+    geojson_data = _ler_geojson(caminho_geojson, versao)
+    for posicao, feature in enumerate(geojson_data["features"]):
+        nome = feature["properties"].get("name", "")
+        indice.setdefault(nome, []).append(posicao)
+    return indice
+
+
+def select_municipalities(caminho_geojson, municipios):
+    """
+    Carrega apenas as feições dos municípios informados.
+
+    A seleção usa um índice por nome, mantido em cache junto com o GeoJSON,
+    de modo que o custo acompanha o número de municípios selecionados e não
+    o tamanho da malha.
+
+    Args:
+        caminho_geojson (str): Caminho do arquivo GeoJSON ou da malha
+            publicada
+        municipios (iterable): Nomes dos municípios (propriedade ``name``)
+
+    Returns:
+        dict: Coleção com as feições selecionadas, na ordem da malha
+    """
+    if is_shared_geometry(caminho_geojson):
+        tabela = load_geometry_table(caminho_geojson)
+        selecionados = pc.is_in(
+            tabela.column("name"),
+            value_set=pa.array(sorted(set(municipios)), pa.string())
+        )
+        return {
+            "type": "FeatureCollection",
+            "features": geometry_features(
+                tabela, np.flatnonzero(selecionados.to_numpy(
+                    zero_copy_only=False))
+            )
+        }
+
+    caminho = os.path.abspath(caminho_geojson)
+    versao = file_fingerprint(caminho_geojson)
+    features = _ler_geojson(caminho, versao)["features"]
+    indice = _indice_municipios(caminho, versao)
+    posicoes = sorted(
+        posicao
+        for nome in set(municipios)
+        for posicao in indice.get(nome, ())
+    )
+    return {
+        "type": "FeatureCollection",
+        "features": [features[posicao] for posicao in posicoes]
+    }
+
+
+if __name__ == '__main__':
+    for tol in MAP_CONFIG['simplify_tolerances']:
+        caminho = build_simplified_geojson(GEOJSON_PATH, tol)
+        print(f"{caminho}: {os.path.getsize(caminho)} bytes")
@@ -1,56 +1,112 @@
 """
 Utilitários para criação e manipulação de mapas
 """
+import hashlib
+
+import numpy as np
 import pandas as pd
 
+from ..config import CACHE_CONFIG
+from .cache import BoundedCache
+
+# Colunas de que as coordenadas dependem
+COLUNAS_COORDENADAS = ['Macro', 'MUN', 'LAT_RES', 'LON_RES']
+
+# Coordenadas por macrorregião já calculadas, por versão dos dados e conteúdo
+# do recorte
+COORDENADAS_CACHE = BoundedCache(
+    max_entries=CACHE_CONFIG['coordinates_max_entries'],
+    max_bytes=CACHE_CONFIG['coordinates_max_bytes'],
+    tamanho=lambda coordenadas: sum(
+        len(coord['municipios'].encode('utf-8'))
+        for coord in coordenadas.values()
+    ),
+    nome="coordenadas"
+)
+
+
+def _calcular_coordenadas(df):
+    """Agrupa os municípios distintos por macrorregião, em ordem alfabética."""
+    municipios = (
+        df[COLUNAS_COORDENADAS]
+        .dropna(subset=['Macro', 'MUN'])
+        .astype({'Macro': str, 'MUN': str})
+        .drop_duplicates(['Macro', 'MUN'])
+        .sort_values(['Macro', 'MUN'], kind='stable')
+    )
+    agrupado = municipios.groupby('Macro', sort=True)
+    # Referência: primeiro município em ordem alfabética, independente da
+    # ordem das linhas
+    referencias = agrupado.nth(0).set_index('Macro')
+    nomes = agrupado['MUN'].agg('<br>'.join)
+
+    return {
+        macro: {
+            'lat': referencia.LAT_RES,
+            'lon': referencia.LON_RES,
+            'mun_ref': referencia.MUN,
+            'municipios': nomes[macro]
+        }
+        for macro, referencia in zip(referencias.index,
+                                     referencias.itertuples(index=False))
+    }
+
+
+def _digest_recorte(df):
+    """Hash do conteúdo das colunas de coordenadas, na ordem das linhas."""
+    hashes = pd.util.hash_pandas_object(df[COLUNAS_COORDENADAS], index=False)
+    return hashlib.sha256(hashes.to_numpy().tobytes()).hexdigest()
+
 
-def get_coordinates_data(df):
+def get_coordinates_data(df, versao=None):
     """
     Obtém as coordenadas das macrorregiões.
 
+    A coordenada de cada macrorregião é a do seu primeiro município em ordem
+    alfabética, e a lista de municípios é ordenada e sem repetições.
+
     Args:
         df (pandas.DataFrame): DataFrame com os dados
+        versao (str, optional): Impressão digital do conjunto de dados de
+            que ``df`` foi obtido; quando informada, o resultado é mantido
+            em cache, indexado pela versão e pelo hash do conteúdo de
+            ``df`` (recortes diferentes nunca compartilham a entrada)
 
     Returns:
         dict: Dicionário com coordenadas e informações das macrorregiões
     """
-    # Obter coordenadas das macrorregiões
-    coordenadas_df = df[['Macro', 'LAT_RES', 'LON_RES', 'MUN']]
-
-    # Obter lista única de municípios por macrorregião
-    municipios_por_macro = (df.groupby('Macro')['MUN']
-                            .agg(lambda x: '<br>'.join(sorted(set(x))))
-                            .to_dict())
-
-    # Criar dicionário de coordenadas
-    coordenadas = {}
-    for _, row in coordenadas_df.drop_duplicates('MUN').iterrows():
-        coordenadas[row['Macro']] = {
-            'lat': row['LAT_RES'],
-            'lon': row['LON_RES'],
-            'mun_ref': row['MUN'],
-            'municipios': municipios_por_macro.get(row['Macro'], '')
-        }
-
-    return coordenadas
+    if versao is None:
+        return _calcular_coordenadas(df)
+    chave = (versao, _digest_recorte(df))
+    return COORDENADAS_CACHE.get_or_compute(
+        chave, lambda: _calcular_coordenadas(df)
+    )
 
 
 def calculate_connection_style(valor_origem, valor_destino):
     """
     Calcula o estilo da conexão entre duas macrorregiões.
 
+    Aceita números ou arrays: com arrays, calcula de uma vez o estilo de
+    todas as conexões.
+
     Args:
-        valor_origem (float): Valor do indicador na origem
-        valor_destino (float): Valor do indicador no destino
+        valor_origem (float | array-like): Valor do indicador na origem
+        valor_destino (float | array-like): Valor do indicador no destino
 
     Returns:
-        tuple: (cor, largura) da linha de conexão
+        tuple: (cor, largura) da linha de conexão; com arrays, (lista de
+        cores, array de larguras)
     """
-    valor_medio = (valor_origem + valor_destino) / 2
-    cor = f'rgba(255, {max(0, 255-valor_medio*2)}, 0, 0.5)'
-    largura = max(1, min(5, valor_medio/20))
-
-    return cor, largura
+    valor_medio = (np.asarray(valor_origem, dtype=float) +
+                   np.asarray(valor_destino, dtype=float)) / 2
+    verde = np.maximum(0, 255 - valor_medio * 2)
+    largura = np.clip(valor_medio / 20, 1, 5)
+
+    if valor_medio.ndim == 0:
+        return f'rgba(255, {verde.item()}, 0, 0.5)', largura.item()
+    cores = [f'rgba(255, {g}, 0, 0.5)' for g in verde.tolist()]
+    return cores, largura
 
 
 def get_macro_text(macro, coord, macro_selecionada):
@@ -0,0 +1,301 @@
+"""
+Medições de desempenho das seções do dashboard
+
+Cada seção renderizada registra o tempo de parede, o número de linhas
+processadas e o tamanho da saída (payload do gráfico ou HTML do mapa). As
+medições mais recentes de cada seção ficam em uma janela deslizante, da
+qual são calculados os percentis exibidos no painel de desempenho e
+exportados no formato de texto do Prometheus, junto com os contadores dos
+caches em memória (acertos, faltas e remoções). Opcionalmente, cada medição
+também é gravada em um log estruturado (uma linha JSON).
+
+Cada processo do Streamlit mantém as próprias medições: as métricas do
+Prometheus levam o rótulo ``worker`` (máquina e PID) e cada processo grava o
+seu próprio arquivo, para que o coletor ``textfile`` some os processos em
+vez de ver apenas o último a gravar.
+"""
+import atexit
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from ..config import METRICS_CONFIG
+from .cache import cache_stats
+
+logger = logging.getLogger(__name__)
+
+# Prefixos das métricas no formato do Prometheus
+PREFIXO_PROMETHEUS = "saude_materna_section"
+PREFIXO_CACHE = "saude_materna_cache"
+
+# Métricas dos caches: (sufixo, chave de ``BoundedCache.stats``, tipo,
+# descrição)
+METRICAS_CACHE = (
+    ("hits_total", "hits", "counter", "Consultas atendidas pelo cache"),
+    ("misses_total", "misses", "counter", "Consultas sem entrada no cache"),
+    ("evictions_total", "evictions", "counter",
+     "Entradas removidas por exceder os limites do cache"),
+    ("entries", "entries", "gauge", "Entradas armazenadas no cache"),
+    ("bytes", "bytes", "gauge", "Bytes armazenados no cache")
+)
+
+
+def process_label():
+    """
+    Retorna o identificador deste processo nas métricas exportadas.
+
+    Returns:
+        str: ``<máquina>-<pid>``
+    """
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def process_file_path(caminho, rotulo=None):
+    """
+    Retorna o arquivo do Prometheus deste processo.
+
+    Args:
+        caminho (str): Arquivo configurado (``saude_materna.prom``)
+        rotulo (str, optional): Identificador do processo; por padrão,
+            ``process_label()``
+
+    Returns:
+        str: Caminho com o identificador antes da extensão
+        (``saude_materna.<máquina>-<pid>.prom``)
+    """
+    base, extensao = os.path.splitext(caminho)
+    return f"{base}.{rotulo or process_label()}{extensao or '.prom'}"
+
+
+def output_size(saida):
+    """
+    Retorna o tamanho em bytes da saída de uma seção.
+
+    Args:
+        saida (str | bytes | None): Payload ou HTML produzido pela seção
+
+    Returns:
+        int: Tamanho em bytes, ou None se a seção não produz saída medível
+    """
+    if isinstance(saida, str):
+        return len(saida.encode("utf-8"))
+    if isinstance(saida, (bytes, bytearray, memoryview)):
+        return len(saida)
+    return None
+
+
+class SectionMetrics:
+    """
+    Medições por seção em janelas deslizantes, seguras entre threads.
+
+    Args:
+        janela (int): Número de medições mais recentes mantidas por seção
+    """
+
+    def __init__(self, janela=METRICS_CONFIG['window']):
+        self.janela = janela
+        self._medicoes = {}
+        self._totais = {}
+        self._arquivos = set()
+        self._lock = threading.Lock()
+
+    def record(self, secao, segundos, linhas=None, bytes_saida=None,
+               erro=False, execucao=None):
+        """
+        Registra a medição de uma seção.
+
+        Args:
+            secao (str): Nome da seção
+            segundos (float): Tempo de parede da renderização
+            linhas (int, optional): Linhas processadas
+            bytes_saida (int, optional): Tamanho da saída, em bytes
+            erro (bool): Se a renderização terminou com exceção
+            execucao (str, optional): Identificador da execução do script,
+                gravado no log para agrupar as seções de uma mesma página
+        """
+        with self._lock:
+            if secao not in self._medicoes:
+                self._medicoes[secao] = deque(maxlen=self.janela)
+                self._totais[secao] = {"execucoes": 0,
+                                       "segundos_total": 0.0, "erros": 0}
+            self._medicoes[secao].append((
+                segundos,
+                np.nan if linhas is None else linhas,
+                np.nan if bytes_saida is None else bytes_saida
+            ))
+            totais = self._totais[secao]
+            totais["execucoes"] += 1
+            totais["segundos_total"] += segundos
+            totais["erros"] += int(erro)
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                "momento": round(time.time(), 3),
+                "execucao": execucao,
+                "secao": secao,
+                "segundos": round(segundos, 6),
+                "linhas": linhas,
+                "bytes": bytes_saida,
+                "erro": erro
+            }, ensure_ascii=False))
+
+    def summary(self, percentis=METRICS_CONFIG['percentiles']):
+        """
+        Calcula os percentis da janela de cada seção.
+
+        Args:
+            percentis (tuple): Percentis calculados (0 a 100)
+
+        Returns:
+            dict: Por seção, os totais acumulados (``execucoes``,
+            ``segundos_total``, ``erros``) e os percentis de ``segundos``,
+            ``linhas`` e ``bytes`` (NaN quando não medidos)
+        """
+        with self._lock:
+            janelas = {secao: np.array(medicoes, dtype=float)
+                       for secao, medicoes in self._medicoes.items()}
+            totais = {secao: dict(valores)
+                      for secao, valores in self._totais.items()}
+
+        resumo = {}
+        for secao, valores in janelas.items():
+            resumo[secao] = dict(totais[secao])
+            for coluna, nome in enumerate(("segundos", "linhas", "bytes")):
+                medidos = valores[:, coluna]
+                medidos = medidos[~np.isnan(medidos)]
+                resumo[secao][nome] = {
+                    p: (float(np.percentile(medidos, p)) if len(medidos)
+                        else np.nan)
+                    for p in percentis
+                }
+        return resumo
+
+    def prometheus_text(self, percentis=METRICS_CONFIG['percentiles']):
+        """
+        Exporta as medições no formato de texto do Prometheus.
+
+        Args:
+            percentis (tuple): Percentis exportados como quantis
+
+        Returns:
+            str: Métricas do tipo ``summary`` (tempo, linhas e bytes) e o
+            contador de erros, rotuladas pela seção, e os contadores dos
+            caches, rotulados pelo nome do cache; todas levam o rótulo
+            ``worker`` deste processo
+        """
+        resumo = self.summary(percentis)
+        worker = f'worker="{process_label()}"'
+        descricoes = (
+            ("seconds", "segundos",
+             "Tempo de renderização da seção, em segundos"),
+            ("rows", "linhas", "Linhas processadas pela seção"),
+            ("output_bytes", "bytes", "Tamanho da saída da seção, em bytes")
+        )
+        linhas = []
+        for sufixo, chave, descricao in descricoes:
+            nome = f"{PREFIXO_PROMETHEUS}_{sufixo}"
+            linhas.append(f"# HELP {nome} {descricao}")
+            linhas.append(f"# TYPE {nome} summary")
+            for secao, valores in sorted(resumo.items()):
+                rotulo = secao.replace("\\", "\\\\").replace('"', '\\"')
+                rotulos = f'{worker},secao="{rotulo}"'
+                for p, valor in valores[chave].items():
+                    if np.isnan(valor):
+                        continue
+                    linhas.append(
+                        f'{nome}{{{rotulos},quantile="{p / 100:g}"}} '
+                        f'{valor:.6g}'
+                    )
+                if chave == "segundos":
+                    linhas.append(f'{nome}_sum{{{rotulos}}} '
+                                  f'{valores["segundos_total"]:.6g}')
+                    linhas.append(f'{nome}_count{{{rotulos}}} '
+                                  f'{valores["execucoes"]}')
+
+        nome = f"{PREFIXO_PROMETHEUS}_errors_total"
+        linhas.append(f"# HELP {nome} Renderizações da seção com erro")
+        linhas.append(f"# TYPE {nome} counter")
+        for secao, valores in sorted(resumo.items()):
+            rotulo = secao.replace("\\", "\\\\").replace('"', '\\"')
+            linhas.append(f'{nome}{{{worker},secao="{rotulo}"}} '
+                          f'{valores["erros"]}')
+
+        caches = cache_stats()
+        for sufixo, chave, tipo, descricao in METRICAS_CACHE:
+            nome = f"{PREFIXO_CACHE}_{sufixo}"
+            linhas.append(f"# HELP {nome} {descricao}")
+            linhas.append(f"# TYPE {nome} {tipo}")
+            for cache, contadores in caches.items():
+                linhas.append(f'{nome}{{{worker},cache="{cache}"}} '
+                              f'{contadores[chave]}')
+        return "\n".join(linhas) + "\n"
+
+    def write_prometheus_file(self, caminho):
+        """
+        Grava as métricas no formato do Prometheus, de forma atômica, no
+        arquivo deste processo.
+
+        O arquivo é removido quando o processo termina normalmente, para que
+        o coletor não exporte medições de processos encerrados.
+
+        Args:
+            caminho (str): Arquivo configurado (por exemplo, no diretório do
+                coletor ``textfile`` do node_exporter); o identificador do
+                processo é acrescentado ao nome (``process_file_path``)
+
+        Returns:
+            str: Caminho do arquivo gravado
+        """
+        caminho = process_file_path(caminho)
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        caminho_temporario = f"{caminho}.tmp"
+        with open(caminho_temporario, "w", encoding="utf-8") as arquivo:
+            arquivo.write(self.prometheus_text())
+        os.replace(caminho_temporario, caminho)
+        with self._lock:
+            if caminho not in self._arquivos:
+                self._arquivos.add(caminho)
+                atexit.register(_remover_arquivo, caminho)
+        return caminho
+
+
+def _remover_arquivo(caminho):
+    """Remove o arquivo do Prometheus de um processo que está terminando."""
+    try:
+        os.remove(caminho)
+    except OSError:
+        pass
+
+
+def configure_log(caminho=METRICS_CONFIG['log_file']):
+    """
+    Direciona o log estruturado das medições para um arquivo.
+
+    Chamadas repetidas com o mesmo caminho não duplicam o destino.
+
+    Args:
+        caminho (str, optional): Arquivo do log; None mantém o log desativado
+    """
+    if not caminho:
+        return
+    caminho = os.path.abspath(caminho)
+    for tratador in logger.handlers:
+        if getattr(tratador, "baseFilename", None) == caminho:
+            return
+    tratador = logging.FileHandler(caminho, encoding="utf-8")
+    tratador.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(tratador)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+# Medições do processo, compartilhadas entre sessões
+METRICAS = SectionMetrics()
@@ -0,0 +1,329 @@
+"""
+Publicação dos documentos dos mapas e dos seus arquivos JS/CSS
+
+No transporte ``'iframe'`` (``PLOT_CONFIG['map_transport']``), o HTML de
+cada mapa é gravado uma única vez em ``STATIC_CONFIG['dir']``, com o nome
+igual ao hash do seu conteúdo, junto das versões pré-comprimidas (gzip e,
+se o módulo ``brotli`` estiver instalado, brotli). O servidor de ladrilhos
+entrega esses arquivos com cache imutável, e o app envia ao navegador
+apenas o endereço do documento.
+
+Os arquivos das CDNs referenciados pelo Folium podem ser copiados para
+``STATIC_CONFIG['vendor_dir']`` (``python -m src.tools.vendor_assets``);
+os documentos publicados passam então a referenciar as cópias locais, o
+que permite exibir o mapa sem acesso à internet.
+
+Cada reuso de um arquivo publicado renova a sua data de modificação;
+``prune_published`` remove os arquivos sem uso há mais tempo que o limite.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import urllib.request
+from functools import lru_cache
+
+from ..config import STATIC_CONFIG
+from .fingerprint import file_signature
+
+try:
+    import brotli
+except ImportError:  # compressão brotli opcional
+    brotli = None
+
+# Tipos de conteúdo dos arquivos publicados, pela extensão
+TIPOS_CONTEUDO = {
+    "html": "text/html; charset=utf-8",
+    "js": "application/javascript; charset=utf-8",
+    "css": "text/css; charset=utf-8"
+}
+
+# Versões comprimidas: codificação HTTP -> sufixo do arquivo
+COMPRESSOES = {"br": ".br", "gzip": ".gz"}
+
+# Manifesto das cópias locais: URL original -> nome do arquivo
+ARQUIVO_MANIFESTO = "manifest.json"
+
+# Arquivos JS/CSS externos referenciados por um documento HTML
+_REFERENCIA_EXTERNA = re.compile(
+    r'<(?:script[^>]*\ssrc|link[^>]*\shref)="(https?://[^"]+\.(?:js|css))"'
+)
+
+
+def _gravar_atomicamente(caminho, conteudo):
+    """Grava bytes via arquivo temporário e substitui o destino."""
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    caminho_temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(caminho_temporario, "wb") as arquivo:
+        arquivo.write(conteudo)
+    os.replace(caminho_temporario, caminho)
+
+
+def _marcar_uso(caminho):
+    """Renova a data de modificação de um arquivo publicado em uso."""
+    try:
+        os.utime(caminho)
+    except OSError:
+        return False
+    return True
+
+
+def compress_variants(conteudo):
+    """
+    Comprime um arquivo em todas as codificações disponíveis.
+
+    Args:
+        conteudo (bytes): Conteúdo original
+
+    Returns:
+        dict: Codificação HTTP -> conteúdo comprimido
+    """
+    variantes = {"gzip": gzip.compress(conteudo, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variantes["br"] = brotli.compress(conteudo)
+    return variantes
+
+
+def publish_file(conteudo, extensao, diretorio=STATIC_CONFIG['dir']):
+    """
+    Publica um arquivo com nome dado pelo hash do conteúdo.
+
+    O arquivo e as suas versões comprimidas são gravados apenas na primeira
+    publicação; publicar de novo o mesmo conteúdo apenas marca o arquivo
+    como em uso.
+
+    Args:
+        conteudo (str | bytes): Conteúdo do arquivo
+        extensao (str): Extensão (``"html"``, ``"js"`` ou ``"css"``)
+        diretorio (str): Diretório dos arquivos publicados
+
+    Returns:
+        str: Nome do arquivo publicado
+    """
+    if isinstance(conteudo, str):
+        conteudo = conteudo.encode("utf-8")
+    nome = f"{hashlib.sha256(conteudo).hexdigest()[:24]}.{extensao}"
+    caminho = os.path.join(diretorio, nome)
+    if _marcar_uso(caminho):
+        return nome
+
+    # Versões comprimidas antes do original: quem encontra o original
+    # encontra também as versões comprimidas
+    if len(conteudo) >= STATIC_CONFIG['min_compress_bytes']:
+        for codificacao, comprimido in compress_variants(conteudo).items():
+            _gravar_atomicamente(caminho + COMPRESSOES[codificacao],
+                                 comprimido)
+    _gravar_atomicamente(caminho, conteudo)
+    return nome
+
+
+def published_exists(nome, diretorio=STATIC_CONFIG['dir']):
+    """
+    Indica se um arquivo publicado ainda está em disco, marcando-o como em
+    uso.
+
+    Args:
+        nome (str): Nome retornado por ``publish_file``
+        diretorio (str): Diretório dos arquivos publicados
+
+    Returns:
+        bool: True se o arquivo existe
+    """
+    return _marcar_uso(os.path.join(diretorio, nome))
+
+
+def prune_published(diretorio=STATIC_CONFIG['dir'],
+                    dias=STATIC_CONFIG['max_idle_days']):
+    """
+    Remove os arquivos publicados sem uso recente.
+
+    Um arquivo é removido com as suas versões comprimidas quando não foi
+    publicado nem consultado (``published_exists``) nos últimos ``dias``;
+    versões comprimidas sem o original também são removidas.
+
+    Args:
+        diretorio (str): Diretório dos arquivos publicados
+        dias (float): Dias sem uso antes da remoção
+
+    Returns:
+        dict: Arquivos removidos e bytes liberados
+    """
+    removidos = {"arquivos": 0, "bytes": 0}
+    if not os.path.isdir(diretorio):
+        return removidos
+    limite = time.time() - dias * 24 * 3600
+    sufixos = tuple(COMPRESSOES.values())
+
+    def remover(caminho):
+        try:
+            tamanho = os.path.getsize(caminho)
+            os.remove(caminho)
+        except OSError:
+            return
+        removidos["arquivos"] += 1
+        removidos["bytes"] += tamanho
+
+    nomes = sorted(os.listdir(diretorio))
+    for nome in nomes:
+        caminho = os.path.join(diretorio, nome)
+        if not os.path.isfile(caminho) or nome.endswith(sufixos):
+            continue
+        try:
+            antigo = os.path.getmtime(caminho) < limite
+        except OSError:
+            continue
+        if antigo:
+            # Original antes das versões comprimidas, na ordem inversa da
+            # publicação: quem encontra o original encontra as versões
+            remover(caminho)
+            for sufixo in sufixos:
+                remover(caminho + sufixo)
+
+    for nome in nomes:
+        caminho = os.path.join(diretorio, nome)
+        original = os.path.splitext(caminho)[0]
+        if nome.endswith(sufixos) and not os.path.exists(original):
+            try:
+                orfao_antigo = os.path.getmtime(caminho) < limite
+            except OSError:
+                continue
+            if orfao_antigo:
+                remover(caminho)
+    return removidos
+
+
+def external_asset_urls(html):
+    """
+    Lista os arquivos JS/CSS externos referenciados por um documento.
+
+    Args:
+        html (str): Documento HTML
+
+    Returns:
+        list: URLs, na ordem em que aparecem, sem repetições
+    """
+    return list(dict.fromkeys(_REFERENCIA_EXTERNA.findall(html)))
+
+
+def vendor_assets(urls, vendor_dir=STATIC_CONFIG['vendor_dir'],
+                  origem=None):
+    """
+    Copia arquivos das CDNs para o diretório de cópias locais.
+
+    Args:
+        urls (iterable): URLs dos arquivos
+        vendor_dir (str): Diretório das cópias locais
+        origem (str, optional): Diretório com os arquivos já baixados,
+            nomeados como o último trecho da URL; sem ele, os arquivos são
+            baixados da internet
+
+    Returns:
+        dict: Manifesto atualizado (URL -> nome do arquivo)
+    """
+    manifesto = vendored_manifest(vendor_dir)
+    for url in urls:
+        nome_original = url.rsplit("/", 1)[-1]
+        # O prefixo distingue arquivos homônimos de pacotes diferentes
+        nome = (f"{hashlib.sha256(url.encode('utf-8')).hexdigest()[:8]}-"
+                f"{nome_original}")
+        destino = os.path.join(vendor_dir, nome)
+        os.makedirs(vendor_dir, exist_ok=True)
+        if origem is not None:
+            shutil.copyfile(os.path.join(origem, nome_original), destino)
+        else:
+            with urllib.request.urlopen(url, timeout=60) as resposta:
+                _gravar_atomicamente(destino, resposta.read())
+        manifesto[url] = nome
+
+    _gravar_atomicamente(
+        os.path.join(vendor_dir, ARQUIVO_MANIFESTO),
+        json.dumps(manifesto, indent=2, sort_keys=True).encode("utf-8")
+    )
+    return manifesto
+
+
+def vendored_manifest(vendor_dir=STATIC_CONFIG['vendor_dir']):
+    """
+    Lê o manifesto das cópias locais.
+
+    Args:
+        vendor_dir (str): Diretório das cópias locais
+
+    Returns:
+        dict: URL original -> nome do arquivo (vazio se não houver cópias)
+    """
+    try:
+        with open(os.path.join(vendor_dir, ARQUIVO_MANIFESTO),
+                  encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return {}
+
+
+def vendor_version(vendor_dir=STATIC_CONFIG['vendor_dir']):
+    """
+    Retorna a assinatura do manifesto das cópias locais.
+
+    Args:
+        vendor_dir (str): Diretório das cópias locais
+
+    Returns:
+        tuple: Assinatura do manifesto, ou None se não houver cópias
+    """
+    return file_signature(os.path.join(vendor_dir, ARQUIVO_MANIFESTO))
+
+
+@lru_cache(maxsize=4)
+def _publicar_copias(vendor_dir, diretorio, versao):
+    """
+    Publica as cópias locais e retorna URL original -> nome publicado.
+
+    ``versao`` só participa da chave do cache.
+    """
+    publicados = {}
+    for url, nome in vendored_manifest(vendor_dir).items():
+        caminho = os.path.join(vendor_dir, nome)
+        try:
+            with open(caminho, "rb") as arquivo:
+                conteudo = arquivo.read()
+        except OSError:
+            continue
+        publicados[url] = publish_file(
+            conteudo, nome.rsplit(".", 1)[-1], diretorio
+        )
+    return publicados
+
+
+def publish_map_document(html, diretorio=STATIC_CONFIG['dir'],
+                         vendor_dir=STATIC_CONFIG['vendor_dir']):
+    """
+    Publica o documento de um mapa, apontando para as cópias locais.
+
+    As referências às CDNs que têm cópia local passam a usar o arquivo
+    publicado no mesmo diretório (endereço relativo); as demais são
+    mantidas.
+
+    Args:
+        html (str): Documento HTML do mapa
+        diretorio (str): Diretório dos arquivos publicados
+        vendor_dir (str): Diretório das cópias locais
+
+    Returns:
+        str: Nome do documento publicado
+    """
+    chave = (os.path.abspath(vendor_dir), diretorio,
+             vendor_version(vendor_dir))
+    publicados = _publicar_copias(*chave)
+    # Diretório de publicação apagado: publica as cópias de novo
+    if not all(published_exists(nome, diretorio)
+               for nome in publicados.values()):
+        _publicar_copias.cache_clear()
+        publicados = _publicar_copias(*chave)
+
+    for url in external_asset_urls(html):
+        if url in publicados:
+            html = html.replace(f'"{url}"', f'"{publicados[url]}"')
+    return publish_file(html, "html", diretorio)
@@ -0,0 +1,262 @@
+"""
+Ladrilhos GeoJSON da malha municipal
+
+A malha de cada estado é dividida na grade de ladrilhos usual dos mapas
+web (z/x/y, projeção Web Mercator). Cada ladrilho lista, sem recorte, os
+municípios que o tocam, na variante simplificada adequada ao seu nível de
+zoom; o navegador carrega apenas os ladrilhos da área visível e descarta
+os municípios repetidos entre ladrilhos vizinhos. Como as geometrias não
+são recortadas, não há emendas nas bordas dos ladrilhos.
+
+Os ladrilhos são gravados em::
+
+    TILE_CONFIG['dir']/<UF>/<versão da malha>/<z>/<x>/<y>.json
+
+A versão é a impressão digital do arquivo da malha: ladrilhos de uma versão
+nunca mudam e podem ser mantidos em cache indefinidamente.
+"""
+import json
+import math
+import os
+from functools import lru_cache
+
+import numpy as np
+import shapely
+from shapely.geometry import box, mapping, shape
+
+from ..config import TILE_CONFIG
+from .fingerprint import file_fingerprint
+from .geometry import (is_shared_geometry, load_geojson, load_geometry_table,
+                       resolve_geojson_path)
+
+# Coleção vazia, servida para ladrilhos sem municípios
+LADRILHO_VAZIO = {"type": "FeatureCollection", "features": []}
+
+
+def tile_bounds(z, x, y):
+    """
+    Retorna os limites geográficos de um ladrilho.
+
+    Args:
+        z (int): Nível de zoom
+        x (int): Coluna do ladrilho
+        y (int): Linha do ladrilho
+
+    Returns:
+        tuple: (oeste, sul, leste, norte), em graus
+    """
+    n = 2 ** z
+
+    def latitude(linha):
+        return math.degrees(
+            math.atan(math.sinh(math.pi * (1 - 2 * linha / n)))
+        )
+
+    return (x / n * 360 - 180, latitude(y + 1), (x + 1) / n * 360 - 180,
+            latitude(y))
+
+
+def tiles_for_bounds(oeste, sul, leste, norte, z):
+    """
+    Lista os ladrilhos de um nível de zoom que cobrem uma área.
+
+    Args:
+        oeste (float): Longitude mínima
+        sul (float): Latitude mínima
+        leste (float): Longitude máxima
+        norte (float): Latitude máxima
+        z (int): Nível de zoom
+
+    Returns:
+        list: Tuplas (x, y)
+    """
+    n = 2 ** z
+
+    def coluna(lon):
+        return min(n - 1, max(0, int((lon + 180) / 360 * n)))
+
+    def linha(lat):
+        rad = math.radians(max(-85.0511, min(85.0511, lat)))
+        return min(n - 1, max(0, int(
+            (1 - math.log(math.tan(rad) + 1 / math.cos(rad)) / math.pi) / 2 * n
+        )))
+
+    return [
+        (x, y)
+        for x in range(coluna(oeste), coluna(leste) + 1)
+        for y in range(linha(norte), linha(sul) + 1)
+    ]
+
+
+def geometry_version(caminho_geojson):
+    """
+    Retorna a versão da malha usada nos caminhos e endereços dos ladrilhos.
+
+    Args:
+        caminho_geojson (str): Caminho do GeoJSON de origem
+
+    Returns:
+        str: Prefixo da impressão digital do arquivo
+    """
+    return file_fingerprint(caminho_geojson)[:12]
+
+
+def tile_url_template(sigla, caminho_geojson, url_base=TILE_CONFIG['url']):
+    """
+    Retorna o modelo de endereço dos ladrilhos de um estado para o Leaflet.
+
+    Args:
+        sigla (str): Sigla da UF
+        caminho_geojson (str): Caminho do GeoJSON de origem
+        url_base (str): Endereço do servidor de ladrilhos visto pelo navegador
+
+    Returns:
+        str: Endereço com os marcadores ``{z}``, ``{x}`` e ``{y}``
+    """
+    return (f"{url_base.rstrip('/')}/ladrilhos/{sigla}/"
+            f"{geometry_version(caminho_geojson)}/{{z}}/{{x}}/{{y}}.json")
+
+
+@lru_cache(maxsize=32)
+def _indice_nivel(caminho_geojson, versao, z):
+    """
+    Carrega a variante do nível de zoom e o índice espacial das feições.
+
+    Guarda apenas as propriedades, as geometrias e o índice; as feições
+    GeoJSON de cada ladrilho são montadas sob demanda. Com a malha
+    publicada no diretório compartilhado, as geometrias vêm do WKB do
+    arquivo mapeado, sem passar por JSON. ``versao`` só participa da chave
+    do cache.
+    """
+    caminho = resolve_geojson_path(caminho_geojson, zoom=z)
+    if is_shared_geometry(caminho):
+        from ..data.shared import COLUNA_GEOMETRIA
+
+        tabela = load_geometry_table(caminho)
+        geometrias = shapely.from_wkb(
+            tabela.column(COLUNA_GEOMETRIA).to_numpy(zero_copy_only=False)
+        )
+        colunas = tabela.column_names
+        propriedades = [
+            {"id": registro.get("id"), "name": registro.get("name") or ""}
+            for registro in tabela.select(
+                [c for c in ("id", "name") if c in colunas]
+            ).to_pylist()
+        ]
+    else:
+        features = load_geojson(caminho)["features"]
+        geometrias = np.array([shape(f["geometry"]) for f in features])
+        propriedades = [
+            {
+                "id": feature["properties"].get("id"),
+                "name": feature["properties"].get("name", "")
+            }
+            for feature in features
+        ]
+    return propriedades, geometrias, shapely.STRtree(geometrias)
+
+
+def build_tile(caminho_geojson, z, x, y):
+    """
+    Monta o conteúdo de um ladrilho: os municípios que tocam a sua área.
+
+    Args:
+        caminho_geojson (str): Caminho do GeoJSON de origem
+        z (int): Nível de zoom
+        x (int): Coluna do ladrilho
+        y (int): Linha do ladrilho
+
+    Returns:
+        dict: FeatureCollection com as propriedades ``id`` e ``name``
+    """
+    propriedades, geometrias, arvore = _indice_nivel(
+        os.path.abspath(caminho_geojson), geometry_version(caminho_geojson),
+        int(z)
+    )
+    indices = arvore.query(box(*tile_bounds(z, x, y)), predicate="intersects")
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "properties": propriedades[i],
+                "geometry": mapping(geometrias[i])
+            }
+            for i in sorted(indices)
+        ]
+    }
+
+
+def tile_path(sigla, versao, z, x, y, diretorio=TILE_CONFIG['dir']):
+    """
+    Retorna o caminho em disco de um ladrilho.
+
+    Args:
+        sigla (str): Sigla da UF
+        versao (str): Versão da malha (``geometry_version``)
+        z (int): Nível de zoom
+        x (int): Coluna do ladrilho
+        y (int): Linha do ladrilho
+        diretorio (str): Diretório raiz dos ladrilhos
+
+    Returns:
+        str: Caminho do arquivo JSON do ladrilho
+    """
+    return os.path.join(diretorio, sigla, versao, str(int(z)), str(int(x)),
+                        f"{int(y)}.json")
+
+
+def write_tile(caminho, conteudo):
+    """
+    Grava um ladrilho de forma atômica.
+
+    Args:
+        caminho (str): Caminho do ladrilho
+        conteudo (dict): FeatureCollection do ladrilho
+
+    Returns:
+        bytes: Conteúdo gravado
+    """
+    dados = json.dumps(conteudo, ensure_ascii=False,
+                       separators=(",", ":")).encode("utf-8")
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    caminho_temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(caminho_temporario, "wb") as arquivo:
+        arquivo.write(dados)
+    os.replace(caminho_temporario, caminho)
+    return dados
+
+
+def precompute_tiles(sigla, caminho_geojson, diretorio=TILE_CONFIG['dir'],
+                     zooms=None):
+    """
+    Grava todos os ladrilhos não vazios de um estado.
+
+    Args:
+        sigla (str): Sigla da UF
+        caminho_geojson (str): Caminho do GeoJSON de origem
+        diretorio (str): Diretório raiz dos ladrilhos
+        zooms (iterable, optional): Níveis de zoom; por padrão, de
+            ``TILE_CONFIG['min_zoom']`` a ``TILE_CONFIG['max_zoom']``
+
+    Returns:
+        dict: Número de ladrilhos gravados por nível de zoom
+    """
+    if zooms is None:
+        zooms = range(TILE_CONFIG['min_zoom'], TILE_CONFIG['max_zoom'] + 1)
+    versao = geometry_version(caminho_geojson)
+    oeste, sul, leste, norte = shapely.total_bounds(np.array([
+        shape(feature["geometry"])
+        for feature in load_geojson(caminho_geojson)["features"]
+    ]))
+
+    gravados = {}
+    for z in zooms:
+        gravados[z] = 0
+        for x, y in tiles_for_bounds(oeste, sul, leste, norte, z):
+            conteudo = build_tile(caminho_geojson, z, x, y)
+            if conteudo["features"]:
+                write_tile(tile_path(sigla, versao, z, x, y, diretorio),
+                           conteudo)
+                gravados[z] += 1
+    return gravados
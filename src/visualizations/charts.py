@@ -1,26 +1,81 @@
 """
 Funções para criação de gráficos e visualizações
+
+Cada gráfico é construído por uma função ``build_*_figure`` e convertido em
+um payload serializado (JSON do Plotly ou PNG do Matplotlib). Os payloads
+ficam em um cache compartilhado entre sessões, de modo que visualizações
+repetidas não reconstroem nem rasterizam a figura.
+
+O mapa de calor e o histograma têm dois renderizadores, escolhidos por
+``PLOT_CONFIG['chart_renderer']``: "plotly" calcula a tabela, as classes e
+a KDE com NumPy e envia traços para o navegador; "matplotlib" mantém as
+figuras Seaborn rasterizadas no servidor. Matplotlib e Seaborn só são
+importados quando o renderizador antigo é usado.
 """
-import matplotlib.pyplot as plt
+import io
+import json
+import threading
+
+import numpy as np
 import plotly.graph_objects as go
-import seaborn as sns
 import streamlit as st
 
-from ..config import INDICADORES, PLOT_CONFIG
+from ..config import ARTIFACTS_DIR, CACHE_CONFIG, INDICADORES, PLOT_CONFIG
+from ..data.aggregation import IndicatorCube
+from ..utils.artifacts import ArtifactStore
+from ..utils.cache import BoundedCache
+
+# Payloads dos gráficos já construídos, compartilhados entre sessões
+FIGURAS_CACHE = BoundedCache(
+    max_entries=CACHE_CONFIG['figure_max_entries'],
+    max_bytes=CACHE_CONFIG['figure_max_bytes'],
+    nome="figuras"
+)
+
+# Payloads pré-calculados em disco, consultados antes de construir a figura
+ARTEFATOS = ArtifactStore(ARTIFACTS_DIR)
 
+# O pyplot mantém a figura corrente em estado global: figuras Matplotlib
+# preparadas em threads diferentes são construídas uma de cada vez
+_TRAVA_MATPLOTLIB = threading.Lock()
 
-def plot_stats(df_filtrado, indicador_selecionado):
+
+def _resolve_cube(df_filtrado, indicador_selecionado, cubo):
+    """Retorna o cubo informado ou agrega o DataFrame filtrado."""
+    if cubo is not None:
+        return cubo
+    return IndicatorCube.from_frame(df_filtrado, [indicador_selecionado])
+
+
+def stats_values(df_filtrado, indicador_selecionado, cubo=None):
     """
-    Exibe estatísticas descritivas do indicador selecionado.
+    Calcula as estatísticas descritivas do indicador selecionado.
 
     Args:
         df_filtrado (pandas.DataFrame): DataFrame filtrado
         indicador_selecionado (str): Nome do indicador
+        cubo (IndicatorCube, optional): Cubo de agregados já filtrado;
+            quando omitido, é calculado a partir de ``df_filtrado``
+
+    Returns:
+        tuple: (média, mediana, desvio padrão)
     """
-    media = df_filtrado[indicador_selecionado].mean()
-    mediana = df_filtrado[indicador_selecionado].median()
-    desvio = df_filtrado[indicador_selecionado].std()
+    cubo = _resolve_cube(df_filtrado, indicador_selecionado, cubo)
+    return (
+        cubo.mean(indicador_selecionado),
+        cubo.median(indicador_selecionado),
+        cubo.std(indicador_selecionado)
+    )
+
 
+def render_stats(estatisticas):
+    """
+    Exibe as estatísticas calculadas por ``stats_values``.
+
+    Args:
+        estatisticas (tuple): (média, mediana, desvio padrão)
+    """
+    media, mediana, desvio = estatisticas
     col1, col2, col3 = st.columns(3)
     with col1:
         st.metric("Média", f"{media:.2f}%")
@@ -30,16 +85,36 @@ def plot_stats(df_filtrado, indicador_selecionado):
         st.metric("Desvio Padrão", f"{desvio:.2f}")
 
 
-def plot_macro_distribution(df_filtrado, indicador_selecionado):
+def plot_stats(df_filtrado, indicador_selecionado, cubo=None):
+    """
+    Exibe estatísticas descritivas do indicador selecionado.
+
+    Args:
+        df_filtrado (pandas.DataFrame): DataFrame filtrado
+        indicador_selecionado (str): Nome do indicador
+        cubo (IndicatorCube, optional): Cubo de agregados já filtrado;
+            quando omitido, é calculado a partir de ``df_filtrado``
+    """
+    render_stats(stats_values(df_filtrado, indicador_selecionado, cubo))
+
+
+def build_macro_distribution_figure(df_filtrado, indicador_selecionado,
+                                    cubo=None):
     """
     Cria gráfico de barras da distribuição por macro-região.
 
     Args:
         df_filtrado (pandas.DataFrame): DataFrame filtrado
         indicador_selecionado (str): Nome do indicador
+        cubo (IndicatorCube, optional): Cubo de agregados já filtrado;
+            quando omitido, é calculado a partir de ``df_filtrado``
+
+    Returns:
+        plotly.graph_objects.Figure: Figura do gráfico
     """
-    dados_macro = df_filtrado.groupby(
-        'Macro')[indicador_selecionado].mean().reset_index()
+    cubo = _resolve_cube(df_filtrado, indicador_selecionado, cubo)
+    dados_macro = cubo.mean_by(
+        indicador_selecionado, ['Macro']).reset_index()
 
     fig = go.Figure(data=[
         go.Bar(
@@ -58,23 +133,89 @@ def plot_macro_distribution(df_filtrado, indicador_selecionado):
         xaxis_tickangle=-45
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+def _usar_matplotlib():
+    """Indica se o renderizador antigo (Matplotlib/Seaborn) está ativo."""
+    return PLOT_CONFIG.get('chart_renderer', 'plotly') == 'matplotlib'
 
 
-def plot_heatmap(df_filtrado, indicador_selecionado):
+def _gaussian_kde(valores, grade, max_classes=1024):
+    """
+    Estima a densidade (KDE gaussiana, banda de Scott) nos pontos da grade.
+
+    Os valores são antes agrupados em até ``max_classes`` classes finas, o
+    que limita o custo a O(grade x classes) independentemente do número de
+    linhas.
+
+    Args:
+        valores (numpy.ndarray): Valores observados, sem NaN
+        grade (numpy.ndarray): Pontos onde a densidade é avaliada
+        max_classes (int): Número de classes da pré-agregação
+
+    Returns:
+        numpy.ndarray: Densidade em cada ponto da grade
+    """
+    banda = valores.std(ddof=1) * len(valores) ** (-1 / 5)
+    pesos, bordas = np.histogram(valores, bins=max_classes)
+    centros = (bordas[:-1] + bordas[1:]) / 2
+    distancias = (grade[:, None] - centros[None, :]) / banda
+    nucleo = np.exp(-0.5 * distancias ** 2) / np.sqrt(2 * np.pi)
+    return nucleo @ pesos / (len(valores) * banda)
+
+
+def _build_heatmap_plotly(dados_regional, titulo):
+    """Mapa de calor como traço Plotly, com os valores anotados."""
+    fig = go.Figure(data=[
+        go.Heatmap(
+            z=dados_regional.to_numpy(),
+            x=[str(ano) for ano in dados_regional.columns],
+            y=list(dados_regional.index),
+            colorscale=PLOT_CONFIG['color_scheme'],
+            texttemplate="%{z:.1f}",
+            hoverongaps=False
+        )
+    ])
+    fig.update_layout(
+        title=titulo,
+        xaxis_title="ANO",
+        yaxis_title="Regional",
+        yaxis=dict(autorange="reversed"),
+        height=PLOT_CONFIG['default_height']
+    )
+    return fig
+
+
+def build_heatmap_figure(df_filtrado, indicador_selecionado, cubo=None):
     """
     Cria mapa de calor por regional.
 
     Args:
         df_filtrado (pandas.DataFrame): DataFrame filtrado
         indicador_selecionado (str): Nome do indicador
+        cubo (IndicatorCube, optional): Cubo de agregados já filtrado;
+            quando omitido, é calculado a partir de ``df_filtrado``
+
+    Returns:
+        plotly.graph_objects.Figure | matplotlib.figure.Figure: Figura do
+        gráfico, conforme ``PLOT_CONFIG['chart_renderer']``
     """
-    dados_regional = df_filtrado.pivot_table(
-        values=indicador_selecionado,
+    cubo = _resolve_cube(df_filtrado, indicador_selecionado, cubo)
+    dados_regional = cubo.pivot_mean(
+        indicador_selecionado,
         index='Regional',
-        columns='ANO',
-        aggfunc='mean'
+        columns='ANO'
     )
+    titulo = (
+        f"Distribuição por Regional - {INDICADORES[indicador_selecionado]}"
+    )
+
+    if not _usar_matplotlib():
+        return _build_heatmap_plotly(dados_regional, titulo)
+
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
     fig = plt.figure(figsize=(12, 8))
     sns.heatmap(
@@ -83,23 +224,25 @@ def plot_heatmap(df_filtrado, indicador_selecionado):
         annot=True,
         fmt='.1f'
     )
-    plt.title(
-        f"Distribuição por Regional - {INDICADORES[indicador_selecionado]}"
-    )
-    st.pyplot(fig)
-    plt.close()
+    plt.title(titulo)
+    return fig
 
 
-def plot_timeline(df_filtrado, indicador_selecionado):
+def build_timeline_figure(df_filtrado, indicador_selecionado, cubo=None):
     """
     Cria gráfico de linha do tempo.
 
     Args:
         df_filtrado (pandas.DataFrame): DataFrame filtrado
         indicador_selecionado (str): Nome do indicador
+        cubo (IndicatorCube, optional): Cubo de agregados já filtrado;
+            quando omitido, é calculado a partir de ``df_filtrado``
+
+    Returns:
+        plotly.graph_objects.Figure: Figura do gráfico
     """
-    dados_tempo = df_filtrado.groupby(
-        "ANO")[indicador_selecionado].mean().reset_index()
+    cubo = _resolve_cube(df_filtrado, indicador_selecionado, cubo)
+    dados_tempo = cubo.mean_by(indicador_selecionado, ["ANO"]).reset_index()
 
     fig = go.Figure()
     fig.add_trace(
@@ -120,20 +263,25 @@ def plot_timeline(df_filtrado, indicador_selecionado):
         yaxis=dict(showgrid=True)
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def plot_pie_chart(df_filtrado, indicador_selecionado):
+def build_pie_chart_figure(df_filtrado, indicador_selecionado, cubo=None):
     """
     Cria gráfico de pizza com média do indicador por regional.
 
     Args:
         df_filtrado (pandas.DataFrame): DataFrame filtrado
         indicador_selecionado (str): Nome do indicador
+        cubo (IndicatorCube, optional): Cubo de agregados já filtrado;
+            quando omitido, é calculado a partir de ``df_filtrado``
+
+    Returns:
+        plotly.graph_objects.Figure: Figura do gráfico
     """
+    cubo = _resolve_cube(df_filtrado, indicador_selecionado, cubo)
     dados_pizza = (
-        df_filtrado.groupby("Regional")[indicador_selecionado]
-        .mean()
+        cubo.mean_by(indicador_selecionado, ["Regional"])
         .sort_values(ascending=False)
         .reset_index()
     )
@@ -150,17 +298,75 @@ def plot_pie_chart(df_filtrado, indicador_selecionado):
     )
 
     fig.update_layout(title="Média do Indicador por Regional")
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+def _build_histogram_plotly(valores, titulo, classes=20):
+    """Histograma e curva KDE calculados com NumPy, como traços Plotly."""
+    contagens, bordas = np.histogram(valores, bins=classes)
+    largura = bordas[1] - bordas[0]
+
+    fig = go.Figure()
+    fig.add_trace(
+        go.Bar(
+            x=(bordas[:-1] + bordas[1:]) / 2,
+            y=contagens,
+            width=largura,
+            marker=dict(color=PLOT_CONFIG['hist_color'], opacity=0.6),
+            name="Frequência"
+        )
+    )
+
+    if len(valores) > 1 and valores.std() > 0:
+        # Curva na escala das contagens, como em sns.histplot(kde=True)
+        grade = np.linspace(valores.min(), valores.max(), 200)
+        densidade = _gaussian_kde(valores, grade)
+        fig.add_trace(
+            go.Scatter(
+                x=grade,
+                y=densidade * len(valores) * largura,
+                mode="lines",
+                line=dict(color=PLOT_CONFIG['hist_color'], width=2),
+                name="KDE"
+            )
+        )
+
+    fig.update_layout(
+        title=titulo,
+        xaxis_title="Valor (%)",
+        yaxis_title="Frequência",
+        bargap=0,
+        showlegend=False
+    )
+    return fig
 
 
-def plot_histogram(df_filtrado, indicador_selecionado):
+def build_histogram_figure(df_filtrado, indicador_selecionado, cubo=None):
     """
     Cria histograma da distribuição dos indicadores.
 
     Args:
         df_filtrado (pandas.DataFrame): DataFrame filtrado
         indicador_selecionado (str): Nome do indicador
+        cubo (IndicatorCube, optional): Não utilizado; o histograma precisa
+            dos valores individuais de ``df_filtrado``
+
+    Returns:
+        plotly.graph_objects.Figure | matplotlib.figure.Figure: Figura do
+        gráfico, conforme ``PLOT_CONFIG['chart_renderer']``
     """
+    titulo = (
+        f"Distribuição do Indicador - {INDICADORES[indicador_selecionado]}"
+    )
+
+    if not _usar_matplotlib():
+        valores = df_filtrado[indicador_selecionado].dropna().to_numpy(
+            dtype=float)
+        return _build_histogram_plotly(valores, titulo)
+
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     # Reduzindo o tamanho da figura para 4x4
     fig = plt.figure(figsize=(4, 4))
     sns.histplot(
@@ -170,11 +376,203 @@ def plot_histogram(df_filtrado, indicador_selecionado):
         color=PLOT_CONFIG['hist_color']
     )
 
-    plt.title(
-        f"Distribuição do Indicador - {INDICADORES[indicador_selecionado]}"
-    )
+    plt.title(titulo)
     plt.xlabel("Valor (%)")
     plt.ylabel("Frequência")
 
-    st.pyplot(fig)
-    plt.close()
+    return fig
+
+
+# Construtor de cada tipo de gráfico
+CONSTRUTORES = {
+    "macro_distribution": build_macro_distribution_figure,
+    "heatmap": build_heatmap_figure,
+    "timeline": build_timeline_figure,
+    "pie_chart": build_pie_chart_figure,
+    "histogram": build_histogram_figure
+}
+
+
+def _serializar_figura(fig):
+    """Converte a figura em JSON (Plotly) ou PNG (Matplotlib)."""
+    if isinstance(fig, go.Figure):
+        return fig.to_json()
+
+    import matplotlib.pyplot as plt
+
+    # Mesmos parâmetros usados por st.pyplot
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight", dpi=200)
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def payload_key(tipo, indicador_selecionado, cache_key):
+    """
+    Retorna a chave de cache do payload de um gráfico.
+
+    Args:
+        tipo (str): Tipo do gráfico (chave de ``CONSTRUTORES``)
+        indicador_selecionado (str): Nome do indicador
+        cache_key (tuple): Versão do conjunto de dados e filtros aplicados
+
+    Returns:
+        tuple: Chave usada no cache em memória e nos artefatos em disco
+    """
+    return (
+        *cache_key,
+        indicador_selecionado,
+        tipo,
+        PLOT_CONFIG.get('chart_renderer', 'plotly')
+    )
+
+
+def chart_payload(tipo, df_filtrado, indicador_selecionado, cubo=None,
+                  cache_key=None):
+    """
+    Retorna o payload serializado de um gráfico, usando o cache compartilhado.
+
+    Com ``cache_key``, o payload vem do cache em memória, dos artefatos
+    pré-calculados (``python -m src.tools.precompute``) ou, na falta de
+    ambos, é construído.
+
+    Args:
+        tipo (str): Tipo do gráfico (chave de ``CONSTRUTORES``)
+        df_filtrado (pandas.DataFrame): DataFrame filtrado
+        indicador_selecionado (str): Nome do indicador
+        cubo (IndicatorCube, optional): Cubo de agregados já filtrado
+        cache_key (tuple, optional): Versão do conjunto de dados e filtros
+            aplicados; sem ela o gráfico é sempre reconstruído
+
+    Returns:
+        str | bytes: JSON da figura Plotly ou PNG da figura Matplotlib
+    """
+    def construir():
+        if _usar_matplotlib():
+            with _TRAVA_MATPLOTLIB:
+                fig = CONSTRUTORES[tipo](df_filtrado, indicador_selecionado,
+                                         cubo)
+                return _serializar_figura(fig)
+        fig = CONSTRUTORES[tipo](df_filtrado, indicador_selecionado, cubo)
+        return _serializar_figura(fig)
+
+    if cache_key is None:
+        return construir()
+    chave = payload_key(tipo, indicador_selecionado, cache_key)
+
+    def obter():
+        precalculado = ARTEFATOS.get(chave)
+        return construir() if precalculado is None else precalculado
+
+    return FIGURAS_CACHE.get_or_compute(chave, obter)
+
+
+def render_chart_payload(payload):
+    """
+    Exibe no Streamlit um payload produzido por ``chart_payload``.
+
+    Args:
+        payload (str | bytes): JSON da figura Plotly ou PNG
+
+    Returns:
+        str | bytes: O próprio payload, para medição do tamanho
+    """
+    if isinstance(payload, bytes):
+        st.image(payload, use_container_width=True)
+    else:
+        st.plotly_chart(json.loads(payload), use_container_width=True)
+    return payload
+
+
+def plot_macro_distribution(df_filtrado, indicador_selecionado, cubo=None,
+                            cache_key=None):
+    """
+    Exibe gráfico de barras da distribuição por macro-região.
+
+    Args:
+        df_filtrado (pandas.DataFrame): DataFrame filtrado
+        indicador_selecionado (str): Nome do indicador
+        cubo (IndicatorCube, optional): Cubo de agregados já filtrado
+        cache_key (tuple, optional): Versão dos dados e filtros aplicados
+
+    Returns:
+        str | bytes: Payload exibido
+    """
+    return render_chart_payload(chart_payload(
+        "macro_distribution", df_filtrado, indicador_selecionado,
+        cubo, cache_key
+    ))
+
+
+def plot_heatmap(df_filtrado, indicador_selecionado, cubo=None,
+                 cache_key=None):
+    """
+    Exibe mapa de calor por regional.
+
+    Args:
+        df_filtrado (pandas.DataFrame): DataFrame filtrado
+        indicador_selecionado (str): Nome do indicador
+        cubo (IndicatorCube, optional): Cubo de agregados já filtrado
+        cache_key (tuple, optional): Versão dos dados e filtros aplicados
+
+    Returns:
+        str | bytes: Payload exibido
+    """
+    return render_chart_payload(chart_payload(
+        "heatmap", df_filtrado, indicador_selecionado, cubo, cache_key
+    ))
+
+
+def plot_timeline(df_filtrado, indicador_selecionado, cubo=None,
+                  cache_key=None):
+    """
+    Exibe gráfico de linha do tempo.
+
+    Args:
+        df_filtrado (pandas.DataFrame): DataFrame filtrado
+        indicador_selecionado (str): Nome do indicador
+        cubo (IndicatorCube, optional): Cubo de agregados já filtrado
+        cache_key (tuple, optional): Versão dos dados e filtros aplicados
+
+    Returns:
+        str | bytes: Payload exibido
+    """
+    return render_chart_payload(chart_payload(
+        "timeline", df_filtrado, indicador_selecionado, cubo, cache_key
+    ))
+
+
+def plot_pie_chart(df_filtrado, indicador_selecionado, cubo=None,
+                   cache_key=None):
+    """
+    Exibe gráfico de pizza com média do indicador por regional.
+
+    Args:
+        df_filtrado (pandas.DataFrame): DataFrame filtrado
+        indicador_selecionado (str): Nome do indicador
+        cubo (IndicatorCube, optional): Cubo de agregados já filtrado
+        cache_key (tuple, optional): Versão dos dados e filtros aplicados
+
+    Returns:
+        str | bytes: Payload exibido
+    """
+    return render_chart_payload(chart_payload(
+        "pie_chart", df_filtrado, indicador_selecionado, cubo, cache_key
+    ))
+
+
+def plot_histogram(df_filtrado, indicador_selecionado, cache_key=None):
+    """
+    Exibe histograma da distribuição dos indicadores.
+
+    Args:
+        df_filtrado (pandas.DataFrame): DataFrame filtrado
+        indicador_selecionado (str): Nome do indicador
+        cache_key (tuple, optional): Versão dos dados e filtros aplicados
+
+    Returns:
+        str | bytes: Payload exibido
+    """
+    return render_chart_payload(chart_payload(
+        "histogram", df_filtrado, indicador_selecionado, None, cache_key
+    ))
@@ -3,13 +3,27 @@ Funções para criação e visualização de mapas interativos
 """
 
 import json
-from functools import lru_cache
 
 import branca
 import folium
-import pandas as pd
-
-from ..config import DATA_PATH, GEOJSON_PATH, INDICADORES, PLOT_CONFIG
+from branca.element import MacroElement
+from folium.utilities import get_bounds
+from jinja2 import Template
+
+from ..config import (ARTIFACTS_DIR, CACHE_CONFIG, DATA_PATH, ESTADO_PADRAO,
+                      INDICADORES, PLOT_CONFIG, TILE_CONFIG)
+from ..data.loader import filter_data
+from ..data.registry import get_state
+from ..data.store import read_dataset
+from ..utils.artifacts import ArtifactStore
+from ..utils.cache import BoundedCache
+from ..utils.fingerprint import file_fingerprint
+from ..utils.geometry import (load_geojson, resolve_geojson_path,
+                              select_municipalities, select_tolerance)
+from ..utils.static_assets import (external_asset_urls,
+                                   publish_map_document, published_exists,
+                                   vendor_version)
+from ..utils.tiles import tile_url_template
 
 
 MAP_COLOR_SCALES = {
@@ -17,12 +31,22 @@ MAP_COLOR_SCALES = {
     "YlGnBu": branca.colormap.linear.YlGnBu_09
 }
 
+# HTML dos mapas já renderizados, compartilhado entre todas as sessões
+MAPA_HTML_CACHE = BoundedCache(
+    max_entries=CACHE_CONFIG['map_html_max_entries'],
+    max_bytes=CACHE_CONFIG['map_html_max_bytes'],
+    nome="mapa_html"
+)
+
+# Nome do documento publicado de cada mapa (transporte "iframe")
+MAPA_DOCUMENTO_CACHE = BoundedCache(
+    max_entries=CACHE_CONFIG['map_document_max_entries'],
+    max_bytes=CACHE_CONFIG['map_document_max_bytes'],
+    nome="mapa_documento"
+)
 
-@lru_cache(maxsize=2)
-def _load_geojson(caminho_geojson):
-    """Carrega e mantém o GeoJSON em cache para reduzir I/O."""
-    with open(caminho_geojson, "r", encoding="utf-8") as geojson_file:
-        return json.load(geojson_file)
+# HTML pré-calculado em disco, consultado antes de renderizar o mapa
+ARTEFATOS = ArtifactStore(ARTIFACTS_DIR)
 
 
 def _build_colormap(valor_min, valor_max):
@@ -39,88 +63,409 @@ def _build_colormap(valor_min, valor_max):
     return colormap_scale.scale(valor_min, valor_max).to_step(10)
 
 
-def criar_mapa_cobertura_consultas(caminho_excel=DATA_PATH,
-                                   caminho_geojson=GEOJSON_PATH,
-                                   ano_inicio=None,
-                                   ano_fim=None,
-                                   macro_selecionada="Todas",
-                                   regional_selecionada="Todas",
-                                   indicador_selecionado="IN2 (HIV/SÍFILIS)",
-                                   df_filtrado=None):
+# Estilos comuns às camadas de municípios (a cor de preenchimento vem do
+# colormap, ou cinza para municípios sem dados)
+ESTILO_MUNICIPIO = {
+    "color": "black",
+    "fillOpacity": 0.6,
+    "weight": 1
+}
+ESTILO_DESTAQUE = {
+    "fillColor": "darkblue",
+    "color": "black",
+    "fillOpacity": 0.9,
+    "weight": 2
+}
+
+
+# Versão do HTML gerado pelo modo "tabela", parte da chave de cache; muda
+# quando a renderização muda, para não servir artefatos antigos
+VERSAO_HTML_TABELA = 4
+
+
+class ControleAnoTabela(MacroElement):
     """
-    Cria um mapa interativo de cobertura de consultas usando Folium.
+    Controle de ano que estiliza, no navegador, a camada única de
+    municípios a partir da tabela ano -> município -> valor.
 
-    Args:
-        caminho_excel (str): Caminho para o arquivo Excel com os dados
-        caminho_geojson (str): Caminho para o arquivo GeoJSON
-            com os dados geográficos
-        ano_inicio (int, optional): Ano inicial para filtrar os dados
-        ano_fim (int, optional): Ano final para filtrar os dados
-        macro_selecionada (str, optional): Macro-região selecionada
-            para filtrar os dados
-        regional_selecionada (str, optional): Regional selecionada
-            para filtrar os dados
-        indicador_selecionado (str, optional): Indicador selecionado
-            para exibir no mapa
-        df_filtrado (pandas.DataFrame, optional): DataFrame já filtrado para
-            renderizar o mapa sem reler o arquivo Excel
+    As cores são calculadas no navegador pelos limites das classes do
+    colormap, com a mesma regra do ``StepColormap`` do branca; o destaque
+    ao passar o mouse e a dica também são aplicados pelo script, sem
+    funções de estilo avaliadas em Python para cada município. Feições
+    adicionadas à camada depois da carga da página (modo "ladrilhos")
+    recebem o mesmo tratamento.
 
-    Returns:
-        tuple: (folium.Map, str) Retorna o objeto do mapa e o HTML do mapa
+    Args:
+        camada (folium.GeoJson): Camada única com a geometria dos municípios
+        tabela (dict): Tabela compacta com municípios, anos, valores,
+            limites das classes, paleta, estilo de destaque e rótulos da dica
     """
 
-    # Usa DataFrame pré-filtrado quando disponível
-    # para evitar releitura do Excel
-    if df_filtrado is not None:
-        df = df_filtrado.copy()
-    else:
-        df = pd.read_excel(caminho_excel, sheet_name=0)
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function() {
+            var camada = {{ this.camada.get_name() }};
+            var tabela = {{ this.tabela|tojson }};
+            var posicao = {};
+            tabela.municipios.forEach(function(nome, i) {
+                posicao[nome] = i;
+            });
+            var limites = tabela.limites;
+            var anoAtual = 0;
+
+            function corDoValor(valor) {
+                if (valor === null) {
+                    return null;
+                }
+                if (valor <= limites[0]) {
+                    return tabela.paleta[0];
+                }
+                if (valor >= limites[limites.length - 1]) {
+                    return tabela.paleta[tabela.paleta.length - 1];
+                }
+                var classe = 0;
+                while (limites[classe + 1] <= valor) {
+                    classe++;
+                }
+                return tabela.paleta[classe];
+            }
 
-        if ano_inicio is not None and ano_fim is not None:
-            df = df[(df["ANO"] >= ano_inicio) & (df["ANO"] <= ano_fim)]
-        if macro_selecionada != "Todas":
-            df = df[df["Macro"] == macro_selecionada]
-        if regional_selecionada != "Todas":
-            df = df[df["Regional"] == regional_selecionada]
+            function estiloAtual(feature) {
+                var i = posicao[feature.properties.name];
+                var cor = i === undefined ?
+                    null : corDoValor(tabela.valores[anoAtual][i]);
+                return {
+                    fillColor: cor === null ? "gray" : cor,
+                    color: "black",
+                    fillOpacity: 0.6,
+                    weight: 1
+                };
+            }
 
-    # Verificar se a coluna "MUN" existe
-    if "MUN" not in df.columns:
-        raise ValueError("A coluna 'MUN' não foi encontrada no DataFrame.")
+            function dica(layer) {
+                var i = posicao[layer.feature.properties.name];
+                var valor = i === undefined ?
+                    null : tabela.valores[anoAtual][i];
+                return "<table><tr><th>" + tabela.rotulos[0] +
+                    "</th><td>" + layer.feature.properties.name +
+                    "</td></tr><tr><th>" + tabela.rotulos[1] +
+                    "</th><td>" + (valor === null ? "Sem dados" : valor) +
+                    "</td></tr></table>";
+            }
 
-    if df.empty:
-        raise ValueError("Não há dados disponíveis para gerar o mapa.")
+            function prepararCamada(layer) {
+                layer.on({
+                    mouseover: function() {
+                        layer.setStyle(tabela.destaque);
+                    },
+                    mouseout: function() {
+                        camada.resetStyle(layer);
+                    }
+                });
+            }
 
-    # Os anos devem refletir o estado já filtrado dos dados
-    anos_disponiveis = sorted(df["ANO"].unique())
+            function aplicarAno(indiceAno) {
+                anoAtual = indiceAno;
+                camada.setStyle(estiloAtual);
+            }
 
-    # Carregar o GeoJSON
-    geojson_data = _load_geojson(caminho_geojson)
+            // resetStyle (usado ao remover o destaque) e as feições
+            // adicionadas depois (modo "ladrilhos") seguem o ano atual
+            camada.options.style = estiloAtual;
+            var onEachFeatureOriginal = camada.options.onEachFeature;
+            camada.options.onEachFeature = function(feature, layer) {
+                if (onEachFeatureOriginal) {
+                    onEachFeatureOriginal(feature, layer);
+                }
+                prepararCamada(layer);
+            };
+            camada.eachLayer(prepararCamada);
+            camada.bindTooltip(dica, {
+                sticky: true,
+                className: "foliumtooltip"
+            });
+
+            var controle = L.control({position: "topright"});
+            controle.onAdd = function() {
+                var div = L.DomUtil.create(
+                    "div", "leaflet-control-layers leaflet-control");
+                var lista = L.DomUtil.create(
+                    "div", "leaflet-control-layers-base", div);
+                tabela.anos.forEach(function(ano, indiceAno) {
+                    var rotulo = L.DomUtil.create("label", "", lista);
+                    var opcao = L.DomUtil.create("input", "", rotulo);
+                    opcao.type = "radio";
+                    opcao.name = "{{ this.get_name() }}";
+                    opcao.checked = indiceAno === 0;
+                    opcao.onchange = function() { aplicarAno(indiceAno); };
+                    rotulo.appendChild(document.createTextNode(" Ano " + ano));
+                });
+                L.DomEvent.disableClickPropagation(div);
+                return div;
+            };
+            controle.addTo({{ this._parent.get_name() }});
+            aplicarAno(0);
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, camada, tabela):
+        super().__init__()
+        self._name = "ControleAnoTabela"
+        self.camada = camada
+        self.tabela = tabela
+
+
+class CamadaLadrilhos(MacroElement):
+    """
+    Carrega na camada de municípios, sob demanda, os ladrilhos GeoJSON da
+    área visível do mapa (ver ``src.utils.tiles``).
 
-    # Criar o mapa base
-    mapa = folium.Map(location=[-7.7183, -42.7289], zoom_start=7, tiles=None)
+    Os ladrilhos trazem os municípios inteiros; os repetidos entre
+    ladrilhos vizinhos são descartados pelo identificador. Ao mudar o nível
+    de zoom, a camada é esvaziada e recarregada com a variante da malha
+    daquele nível.
 
-    # Criar colormap para diferenciação de valores
-    valores_indicador = df[indicador_selecionado].dropna()
-    if valores_indicador.empty:
-        raise ValueError("Não há valores numéricos para gerar o mapa.")
+    Args:
+        camada (folium.GeoJson): Camada de municípios, inicialmente vazia
+        url (str): Modelo de endereço com ``{z}``, ``{x}`` e ``{y}``
+        limites (list): Limites da malha, ``[[sul, oeste], [norte, leste]]``
+        zoom_min (int): Menor nível de zoom com ladrilhos
+        zoom_max (int): Maior nível de zoom com ladrilhos
+        municipios (list, optional): Nomes dos únicos municípios desenhados;
+            None desenha todos
+    """
 
-    colormap = _build_colormap(
-        float(valores_indicador.min()),
-        float(valores_indicador.max())
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function() {
+            var mapa = {{ this._parent.get_name() }};
+            var camada = {{ this.camada.get_name() }};
+            var url = {{ this.url|tojson }};
+            var limites = L.latLngBounds({{ this.limites|tojson }});
+            var zoomMin = {{ this.zoom_min }};
+            var zoomMax = {{ this.zoom_max }};
+            var permitidos = null;
+            {%- if this.municipios is not none %}
+            permitidos = {};
+            {{ this.municipios|tojson }}.forEach(function(nome) {
+                permitidos[nome] = true;
+            });
+            {%- endif %}
+            var nivelAtual = null;
+            var pedidos = {};
+            var presentes = {};
+
+            function coluna(lon, n) {
+                return Math.min(n - 1, Math.max(0,
+                    Math.floor((lon + 180) / 360 * n)));
+            }
+
+            function linha(lat, n) {
+                var rad = Math.max(-85.0511, Math.min(85.0511, lat)) *
+                    Math.PI / 180;
+                return Math.min(n - 1, Math.max(0, Math.floor(
+                    (1 - Math.log(Math.tan(rad) + 1 / Math.cos(rad)) /
+                        Math.PI) / 2 * n)));
+            }
+
+            function carregar(z, x, y) {
+                var chave = z + "/" + x + "/" + y;
+                if (pedidos[chave]) {
+                    return;
+                }
+                pedidos[chave] = true;
+                fetch(url.replace("{z}", z).replace("{x}", x)
+                         .replace("{y}", y))
+                    .then(function(resposta) {
+                        if (!resposta.ok) {
+                            throw new Error(resposta.status);
+                        }
+                        return resposta.json();
+                    })
+                    .then(function(ladrilho) {
+                        if (z !== nivelAtual) {
+                            return;
+                        }
+                        var novas = ladrilho.features.filter(function(f) {
+                            if (permitidos !== null &&
+                                    !permitidos[f.properties.name]) {
+                                return false;
+                            }
+                            var id = f.properties.id !== null &&
+                                f.properties.id !== undefined ?
+                                f.properties.id : f.properties.name;
+                            if (presentes[id]) {
+                                return false;
+                            }
+                            presentes[id] = true;
+                            return true;
+                        });
+                        if (novas.length) {
+                            camada.addData({
+                                type: "FeatureCollection",
+                                features: novas
+                            });
+                        }
+                    })
+                    .catch(function() {
+                        // Tenta de novo no próximo movimento do mapa
+                        if (z === nivelAtual) {
+                            delete pedidos[chave];
+                        }
+                    });
+            }
+
+            function atualizar() {
+                var z = Math.max(zoomMin, Math.min(zoomMax,
+                    Math.round(mapa.getZoom())));
+                if (z !== nivelAtual) {
+                    camada.clearLayers();
+                    pedidos = {};
+                    presentes = {};
+                    nivelAtual = z;
+                }
+                var area = mapa.getBounds();
+                if (!area.intersects(limites)) {
+                    return;
+                }
+                var n = Math.pow(2, z);
+                var oeste = Math.max(area.getWest(), limites.getWest());
+                var leste = Math.min(area.getEast(), limites.getEast());
+                var sul = Math.max(area.getSouth(), limites.getSouth());
+                var norte = Math.min(area.getNorth(), limites.getNorth());
+                for (var x = coluna(oeste, n); x <= coluna(leste, n); x++) {
+                    for (var y = linha(norte, n); y <= linha(sul, n); y++) {
+                        carregar(z, x, y);
+                    }
+                }
+            }
+
+            mapa.on("moveend", atualizar);
+            atualizar();
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, camada, url, limites, zoom_min, zoom_max,
+                 municipios=None):
+        super().__init__()
+        self._name = "CamadaLadrilhos"
+        self.camada = camada
+        self.url = url
+        self.limites = limites
+        self.zoom_min = int(zoom_min)
+        self.zoom_max = int(zoom_max)
+        self.municipios = municipios
+
+
+def _tabela_valores_por_ano(df, anos_disponiveis, municipios,
+                            indicador_selecionado, indicador_titulo,
+                            colormap):
+    """
+    Monta a tabela ano -> município -> valor alinhada à ordem de
+    ``municipios``, com os limites e as cores das classes do colormap e os
+    rótulos da dica.
+    """
+    df_valores = df[["ANO", "MUN", indicador_selecionado]].fillna(
+        {indicador_selecionado: 0})
+    # Mantém o último registro de cada município no ano, como no modo camadas
+    df_valores = df_valores.drop_duplicates(["ANO", "MUN"], keep="last")
+
+    valores = []
+    for ano in anos_disponiveis:
+        dados_municipios = (
+            df_valores[df_valores["ANO"] == ano]
+            .set_index("MUN")[indicador_selecionado]
+            .to_dict()
+        )
+        valores_ano = [dados_municipios.get(municipio)
+                       for municipio in municipios]
+        valores.append([
+            None if valor is None else float(valor) for valor in valores_ano
+        ])
+
+    # Cor de cada classe, tomada no ponto médio entre os seus limites
+    limites = [float(limite) for limite in colormap.index]
+    paleta = [colormap((inicio + fim) / 2)
+              for inicio, fim in zip(limites[:-1], limites[1:])]
+
+    return {
+        "municipios": municipios,
+        "anos": [int(ano) for ano in anos_disponiveis],
+        "valores": valores,
+        "limites": limites,
+        "paleta": paleta,
+        "destaque": ESTILO_DESTAQUE,
+        "rotulos": ["Município", f"{indicador_titulo} (%)"]
+    }
+
+
+def _adicionar_camada_unica(mapa, df, anos_disponiveis, geojson_data,
+                            indicador_selecionado, indicador_titulo,
+                            colormap):
+    """
+    Embute a geometria uma única vez e envia os valores de cada ano como
+    tabela; a troca de ano apenas reestiliza a camada no navegador
+    (modo "tabela").
+    """
+    municipios = [
+        feature["properties"].get("name", "")
+        for feature in geojson_data["features"]
+    ]
+    tabela = _tabela_valores_por_ano(
+        df, anos_disponiveis, municipios, indicador_selecionado,
+        indicador_titulo, colormap
     )
-    indicador_titulo = INDICADORES.get(
-        indicador_selecionado,
-        indicador_selecionado
+
+    # Sem style_function/highlight_function/GeoJsonTooltip: estilo,
+    # destaque e dica são aplicados pelo ControleAnoTabela
+    camada = folium.GeoJson(geojson_data, name="Municípios")
+    camada.add_to(mapa)
+    mapa.add_child(ControleAnoTabela(camada, tabela))
+
+
+def _adicionar_camada_ladrilhos(mapa, df, anos_disponiveis, caminho_geojson,
+                                limites, estado, indicador_selecionado,
+                                indicador_titulo, colormap, recorte=False):
+    """
+    Cria a camada única sem geometria embutida: os municípios da área
+    visível são carregados do servidor de ladrilhos e estilizados pela
+    mesma tabela do modo "tabela" (modo "ladrilhos"). Com ``recorte``,
+    apenas os municípios da tabela são desenhados.
+    """
+    municipios = sorted(df["MUN"].dropna().unique().tolist())
+    tabela = _tabela_valores_por_ano(
+        df, anos_disponiveis, municipios, indicador_selecionado,
+        indicador_titulo, colormap
     )
-    colormap.caption = f"{indicador_titulo} (%)"
-    colormap.add_to(mapa)
 
-    # Criar camadas exclusivas para cada ano
+    camada = folium.GeoJson(
+        {"type": "FeatureCollection", "features": []},
+        name="Municípios"
+    )
+    camada.add_to(mapa)
+    mapa.add_child(ControleAnoTabela(camada, tabela))
+    mapa.add_child(CamadaLadrilhos(
+        camada,
+        tile_url_template(estado, caminho_geojson),
+        limites,
+        TILE_CONFIG['min_zoom'],
+        TILE_CONFIG['max_zoom'],
+        municipios if recorte else None
+    ))
+
+
+def _adicionar_camadas_por_ano(mapa, df, anos_disponiveis, geojson_data,
+                               indicador_selecionado, indicador_titulo,
+                               colormap):
+    """Cria uma camada GeoJson completa para cada ano (modo "camadas")."""
     primeiro_ano = True
 
     for ano in anos_disponiveis:
         df_ano = df[df["ANO"] == ano]
-        df_ano = df_ano[["MUN", indicador_selecionado]].fillna(0)
+        df_ano = df_ano[["MUN", indicador_selecionado]].fillna(
+            {indicador_selecionado: 0})
 
         # Criar um dicionário {Município: Valor}
         dados_municipios = df_ano.set_index(
@@ -141,12 +486,7 @@ def criar_mapa_cobertura_consultas(caminho_excel=DATA_PATH,
             valor = dados_municipios.get(municipio, None)
             cor = colormap(valor) if isinstance(
                 valor, (int, float)) else "gray"
-            return {
-                "fillColor": cor,
-                "color": "black",
-                "fillOpacity": 0.6,
-                "weight": 1
-            }
+            return {"fillColor": cor, **ESTILO_MUNICIPIO}
 
         # Criar camada para o ano
         layer = folium.FeatureGroup(
@@ -155,12 +495,7 @@ def criar_mapa_cobertura_consultas(caminho_excel=DATA_PATH,
         folium.GeoJson(
             geojson_copy,
             style_function=estilo,
-            highlight_function=lambda x: {
-                "fillColor": "darkblue",
-                "color": "black",
-                "fillOpacity": 0.9,
-                "weight": 2
-            },
+            highlight_function=lambda x: ESTILO_DESTAQUE,
             tooltip=folium.GeoJsonTooltip(
                 fields=["name", "consulta"],
                 aliases=[
@@ -180,5 +515,286 @@ def criar_mapa_cobertura_consultas(caminho_excel=DATA_PATH,
     # Adicionar o LayerControl
     folium.LayerControl(collapsed=False).add_to(mapa)
 
+
+def criar_mapa_cobertura_consultas(caminho_excel=DATA_PATH,
+                                   caminho_geojson=None,
+                                   ano_inicio=None,
+                                   ano_fim=None,
+                                   macro_selecionada="Todas",
+                                   regional_selecionada="Todas",
+                                   indicador_selecionado="IN2 (HIV/SÍFILIS)",
+                                   df_filtrado=None,
+                                   modo=None,
+                                   altura_mapa=None,
+                                   estado=ESTADO_PADRAO):
+    """
+    Cria um mapa interativo de cobertura de consultas usando Folium.
+
+    Args:
+        caminho_excel (str): Caminho para o arquivo Excel com os dados
+        caminho_geojson (str, optional): Caminho para o arquivo GeoJSON
+            com os dados geográficos; por padrão, a malha do estado
+        ano_inicio (int, optional): Ano inicial para filtrar os dados
+        ano_fim (int, optional): Ano final para filtrar os dados
+        macro_selecionada (str, optional): Macro-região selecionada
+            para filtrar os dados; com ela, o mapa desenha apenas os
+            municípios presentes nos dados e se ajusta aos seus limites
+        regional_selecionada (str, optional): Regional selecionada
+            para filtrar os dados, com o mesmo recorte do mapa
+        indicador_selecionado (str, optional): Indicador selecionado
+            para exibir no mapa
+        df_filtrado (pandas.DataFrame, optional): DataFrame já filtrado para
+            renderizar o mapa sem reler o arquivo Excel
+        modo (str, optional): "tabela" embute a geometria uma única vez e
+            troca o ano no navegador; "camadas" cria uma camada completa por
+            ano; "ladrilhos" é como "tabela", mas carrega a geometria do
+            servidor de ladrilhos. Usa ``PLOT_CONFIG['map_render_mode']``
+            quando omitido
+        altura_mapa (int, optional): Altura do mapa em pixels, usada para
+            escolher a variante simplificada da malha municipal
+        estado (str, optional): Sigla da UF exibida, usada para localizar a
+            malha municipal e posicionar o mapa
+
+    Returns:
+        tuple: (folium.Map, str) Retorna o objeto do mapa e o HTML do mapa
+    """
+
+    # Usa DataFrame pré-filtrado quando disponível
+    # para evitar releitura do Excel
+    if df_filtrado is not None:
+        df = df_filtrado.copy()
+    else:
+        df = read_dataset(caminho_excel)
+        if ano_inicio is None or ano_fim is None:
+            ano_inicio, ano_fim = df["ANO"].min(), df["ANO"].max()
+        df = filter_data(df, ano_inicio, ano_fim, macro_selecionada,
+                         regional_selecionada)
+
+    # Verificar se a coluna "MUN" existe
+    if "MUN" not in df.columns:
+        raise ValueError("A coluna 'MUN' não foi encontrada no DataFrame.")
+
+    if df.empty:
+        raise ValueError("Não há dados disponíveis para gerar o mapa.")
+
+    if modo is None:
+        modo = PLOT_CONFIG.get("map_render_mode", "tabela")
+
+    # Os anos devem refletir o estado já filtrado dos dados
+    anos_disponiveis = sorted(df["ANO"].unique())
+
+    # Carregar o GeoJSON na variante simplificada adequada ao mapa
+    dados_estado = get_state(estado)
+    caminho_geojson = caminho_geojson or dados_estado['geojson']
+    caminho_variante = resolve_geojson_path(
+        caminho_geojson,
+        zoom=dados_estado['zoom'],
+        altura_mapa=altura_mapa
+    )
+
+    # Com Macro ou Regional selecionada, apenas os municípios do recorte são
+    # desenhados; sem recorte, também os municípios sem dados
+    recorte = macro_selecionada != "Todas" or regional_selecionada != "Todas"
+    if recorte:
+        geojson_data = select_municipalities(
+            caminho_variante, df["MUN"].dropna().unique()
+        )
+        if not geojson_data["features"]:
+            raise ValueError(
+                "Nenhum município do recorte foi encontrado na malha.")
+    else:
+        geojson_data = load_geojson(caminho_variante)
+
+    # Criar o mapa base; com recorte ou sem centro registrado, ajusta-se aos
+    # limites dos municípios desenhados
+    mapa = folium.Map(
+        location=dados_estado['centro'],
+        zoom_start=dados_estado['zoom'],
+        tiles=None
+    )
+    limites = get_bounds(geojson_data, lonlat=True)
+    if recorte or dados_estado['centro'] is None:
+        mapa.fit_bounds(limites)
+
+    # Criar colormap para diferenciação de valores
+    valores_indicador = df[indicador_selecionado].dropna()
+    if valores_indicador.empty:
+        raise ValueError("Não há valores numéricos para gerar o mapa.")
+
+    colormap = _build_colormap(
+        float(valores_indicador.min()),
+        float(valores_indicador.max())
+    )
+    indicador_titulo = INDICADORES.get(
+        indicador_selecionado,
+        indicador_selecionado
+    )
+    colormap.caption = f"{indicador_titulo} (%)"
+    colormap.add_to(mapa)
+
+    if modo == "ladrilhos":
+        _adicionar_camada_ladrilhos(
+            mapa, df, anos_disponiveis, caminho_geojson, limites, estado,
+            indicador_selecionado, indicador_titulo, colormap, recorte
+        )
+    elif modo == "tabela":
+        _adicionar_camada_unica(
+            mapa, df, anos_disponiveis, geojson_data,
+            indicador_selecionado, indicador_titulo, colormap
+        )
+    else:
+        _adicionar_camadas_por_ano(
+            mapa, df, anos_disponiveis, geojson_data,
+            indicador_selecionado, indicador_titulo, colormap
+        )
+
     # Retornar mapa e HTML
     return mapa, mapa.get_root().render()
+
+
+def map_asset_urls():
+    """
+    Lista os arquivos JS/CSS das CDNs referenciados pelos mapas do app.
+
+    Returns:
+        list: URLs referenciadas por um mapa com a mesma composição dos
+        mapas do dashboard (mapa sem camada base, colormap e GeoJson)
+    """
+    mapa = folium.Map(tiles=None)
+    _build_colormap(0, 1).add_to(mapa)
+    folium.GeoJson({"type": "FeatureCollection", "features": []}).add_to(mapa)
+    return external_asset_urls(mapa.get_root().render())
+
+
+def map_cache_key(versao_dados, ano_inicio, ano_fim, macro_selecionada,
+                  regional_selecionada, indicador_selecionado,
+                  altura_mapa=None, estado=ESTADO_PADRAO):
+    """
+    Retorna a chave de cache do HTML de um mapa.
+
+    A chave combina a versão do conjunto de dados, o conteúdo e a variante
+    da malha municipal, os filtros, o indicador, o esquema de cores, o
+    modo de renderização e, no modo "ladrilhos", o endereço do servidor de
+    ladrilhos.
+
+    Args:
+        versao_dados (str): Impressão digital do conjunto de dados
+        ano_inicio (int): Ano inicial do filtro
+        ano_fim (int): Ano final do filtro
+        macro_selecionada (str): Macro-região selecionada
+        regional_selecionada (str): Regional selecionada
+        indicador_selecionado (str): Indicador exibido no mapa
+        altura_mapa (int, optional): Altura do mapa em pixels
+        estado (str, optional): Sigla da UF exibida
+
+    Returns:
+        tuple: Chave usada no cache em memória e nos artefatos em disco
+    """
+    modo = PLOT_CONFIG.get("map_render_mode", "tabela")
+    return (
+        estado,
+        versao_dados,
+        file_fingerprint(get_state(estado)['geojson']),
+        int(ano_inicio),
+        int(ano_fim),
+        macro_selecionada,
+        regional_selecionada,
+        indicador_selecionado,
+        PLOT_CONFIG.get("map_color_scheme", "YlOrRd"),
+        modo,
+        VERSAO_HTML_TABELA,
+        TILE_CONFIG['url'] if modo == "ladrilhos" else None,
+        select_tolerance(get_state(estado)['zoom'], altura_mapa)
+    )
+
+
+def renderizar_mapa_html(df_filtrado, indicador_selecionado, versao_dados,
+                         ano_inicio, ano_fim, macro_selecionada="Todas",
+                         regional_selecionada="Todas", altura_mapa=None,
+                         estado=ESTADO_PADRAO):
+    """
+    Retorna o HTML do mapa, reutilizando renderizações anteriores.
+
+    Requisições com a mesma chave (ver ``map_cache_key``) compartilham a
+    mesma renderização, vinda do cache em memória, dos artefatos
+    pré-calculados (``python -m src.tools.precompute``) ou, na falta de
+    ambos, de uma nova renderização.
+
+    Args:
+        df_filtrado (pandas.DataFrame): DataFrame já filtrado
+        indicador_selecionado (str): Indicador exibido no mapa
+        versao_dados (str): Impressão digital do conjunto de dados
+        ano_inicio (int): Ano inicial do filtro
+        ano_fim (int): Ano final do filtro
+        macro_selecionada (str): Macro-região selecionada
+        regional_selecionada (str): Regional selecionada
+        altura_mapa (int, optional): Altura do mapa em pixels
+        estado (str, optional): Sigla da UF exibida
+
+    Returns:
+        str: HTML do mapa
+    """
+    chave = map_cache_key(
+        versao_dados, ano_inicio, ano_fim, macro_selecionada,
+        regional_selecionada, indicador_selecionado, altura_mapa, estado
+    )
+
+    def renderizar():
+        precalculado = ARTEFATOS.get(chave)
+        if precalculado is not None:
+            return precalculado
+        _, html_mapa = criar_mapa_cobertura_consultas(
+            df_filtrado=df_filtrado,
+            macro_selecionada=macro_selecionada,
+            regional_selecionada=regional_selecionada,
+            indicador_selecionado=indicador_selecionado,
+            altura_mapa=altura_mapa,
+            estado=estado
+        )
+        return html_mapa
+
+    return MAPA_HTML_CACHE.get_or_compute(chave, renderizar)
+
+
+def renderizar_mapa_url(df_filtrado, indicador_selecionado, versao_dados,
+                        ano_inicio, ano_fim, macro_selecionada="Todas",
+                        regional_selecionada="Todas", altura_mapa=None,
+                        estado=ESTADO_PADRAO, url_base=TILE_CONFIG['url']):
+    """
+    Retorna o endereço do documento publicado do mapa (transporte "iframe").
+
+    O HTML vem de ``renderizar_mapa_html`` e é publicado uma única vez por
+    chave de cache (ver ``src.utils.static_assets``); as execuções seguintes
+    apenas consultam o nome do documento.
+
+    Args:
+        df_filtrado (pandas.DataFrame): DataFrame já filtrado
+        indicador_selecionado (str): Indicador exibido no mapa
+        versao_dados (str): Impressão digital do conjunto de dados
+        ano_inicio (int): Ano inicial do filtro
+        ano_fim (int): Ano final do filtro
+        macro_selecionada (str): Macro-região selecionada
+        regional_selecionada (str): Regional selecionada
+        altura_mapa (int, optional): Altura do mapa em pixels
+        estado (str, optional): Sigla da UF exibida
+        url_base (str, optional): Endereço do servidor visto pelo navegador
+
+    Returns:
+        str: Endereço do documento do mapa
+    """
+    chave = (
+        map_cache_key(
+            versao_dados, ano_inicio, ano_fim, macro_selecionada,
+            regional_selecionada, indicador_selecionado, altura_mapa, estado
+        ),
+        vendor_version()
+    )
+    nome = MAPA_DOCUMENTO_CACHE.get(chave)
+    if nome is None or not published_exists(nome):
+        nome = publish_map_document(renderizar_mapa_html(
+            df_filtrado, indicador_selecionado, versao_dados, ano_inicio,
+            ano_fim, macro_selecionada, regional_selecionada, altura_mapa,
+            estado
+        ))
+        MAPA_DOCUMENTO_CACHE.put(chave, nome)
+    return f"{url_base.rstrip('/')}/estaticos/{nome}"
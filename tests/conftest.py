@@ -0,0 +1,17 @@
+"""
+Configuração comum dos testes
+
+Os caminhos dos dados em ``src.config`` são relativos à raiz do
+repositório; os testes são executados a partir dela.
+"""
+import os
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def raiz_repositorio(monkeypatch):
+    """Executa cada teste a partir da raiz do repositório."""
+    monkeypatch.chdir(RAIZ)
@@ -0,0 +1,96 @@
+"""
+Testes do cubo de agregados (``src.data.aggregation``)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config import INDICADORES
+from src.data.aggregation import MAX_CENTROIDES, IndicatorCube
+from src.data.filter_index import FilterIndex
+from src.data.loader import filter_data
+from src.data.registry import load_state_dataset
+
+INDICADOR = 'IN1(6 CONSULTAS)'
+
+
+def _filtros(indice):
+    """Filtros da barra lateral: todos os dados, um ano, macro e regional."""
+    anos = indice.years()
+    macro = indice.macros()[0]
+    regional = indice.regionals(macro_selecionada=macro)[0]
+    return [
+        (anos[0], anos[-1], "Todas", "Todas"),
+        (anos[-1], anos[-1], "Todas", "Todas"),
+        (anos[0], anos[-1], macro, "Todas"),
+        (anos[0], anos[-1], macro, regional),
+    ]
+
+
+def _assert_cubo_igual_ao_pandas(cubo, df_filtrado):
+    for indicador in INDICADORES:
+        valores = df_filtrado[indicador]
+        assert cubo.mean(indicador) == pytest.approx(valores.mean())
+        assert cubo.std(indicador) == pytest.approx(valores.std())
+        assert cubo.median(indicador) == pytest.approx(valores.median())
+        for niveis in (["ANO"], ["Macro"], ["Regional"]):
+            esperado = df_filtrado.groupby(niveis, observed=True)[
+                indicador].mean()
+            pd.testing.assert_series_equal(
+                cubo.mean_by(indicador, niveis), esperado,
+                check_index_type=False, check_categorical=False
+            )
+        esperada = df_filtrado.pivot_table(
+            values=indicador, index="Regional", columns="ANO",
+            aggfunc="mean", observed=True
+        )
+        pd.testing.assert_frame_equal(
+            cubo.pivot_mean(indicador), esperada, check_names=False,
+            check_index_type=False, check_column_type=False,
+            check_categorical=False
+        )
+
+
+def test_agregados_do_cubo_iguais_aos_do_pandas():
+    df = load_state_dataset("PI")
+    indice = FilterIndex(df)
+    cubo = IndicatorCube.from_frame(df)
+    for filtros in _filtros(indice):
+        df_filtrado = filter_data(df, *filtros, index=indice)
+        _assert_cubo_igual_ao_pandas(cubo.filter(*filtros), df_filtrado)
+
+
+def test_substituir_anos_equivale_a_reconstruir():
+    df = load_state_dataset("PI")
+    ano = df["ANO"].max()
+    cubo = IndicatorCube.from_frame(df)
+
+    atualizado = df.copy()
+    do_ano = atualizado["ANO"] == ano
+    atualizado.loc[do_ano, INDICADOR] = atualizado.loc[do_ano, INDICADOR] / 2
+
+    substituido = cubo.replace_years(atualizado[do_ano], [ano])
+    reconstruido = IndicatorCube.from_frame(atualizado)
+    pd.testing.assert_frame_equal(substituido.chaves, reconstruido.chaves)
+    for nome, valores in reconstruido.estatisticas[INDICADOR].items():
+        np.testing.assert_allclose(
+            substituido.estatisticas[INDICADOR][nome], valores)
+    assert substituido.mean(INDICADOR) != cubo.mean(INDICADOR)
+
+    # Um ano sem linhas é removido do cubo
+    sem_ano = cubo.replace_years(df.iloc[:0], [ano])
+    assert ano not in set(sem_ano.chaves["ANO"])
+    assert len(sem_ano.chaves) < len(cubo.chaves)
+
+
+def test_mediana_aproximada_em_grupos_grandes():
+    gerador = np.random.default_rng(0)
+    valores = gerador.gamma(2.0, 10.0, size=MAX_CENTROIDES * 40)
+    df = pd.DataFrame({
+        "ANO": 2024, "Macro": "M", "Regional": "R",
+        INDICADOR: valores.astype(np.float32)
+    })
+    cubo = IndicatorCube.from_frame(df, indicadores=[INDICADOR])
+    assert len(cubo.esbocos[INDICADOR][0][0]) == MAX_CENTROIDES
+    assert cubo.median(INDICADOR) == pytest.approx(
+        np.median(valores), rel=0.02)
@@ -0,0 +1,49 @@
+"""
+Testes do armazenamento de artefatos (``src.utils.artifacts``)
+"""
+from src.utils.artifacts import ArtifactStore
+
+
+def test_artefatos_identicos_compartilham_o_objeto(tmp_path):
+    armazenamento = ArtifactStore(str(tmp_path))
+    armazenamento.put(("v1", 2020, "Todas"), "<html>", "PI", "v1")
+    armazenamento.put(("v1", 2021, "Todas"), "<html>", "PI", "v1")
+    armazenamento.put(("v1", 2022, "Todas"), b"\x89PNG", "PI", "v1")
+
+    assert armazenamento.get(("v1", 2021, "Todas")) == "<html>"
+    assert armazenamento.get(("v1", 2022, "Todas")) == b"\x89PNG"
+    assert armazenamento.get(("v2", 2021, "Todas")) is None
+    estatisticas = armazenamento.stats()
+    assert estatisticas["chaves"] == 3
+    assert estatisticas["objetos"] == 2
+
+
+def test_limpeza_mantem_apenas_a_versao_atual_do_estado(tmp_path):
+    armazenamento = ArtifactStore(str(tmp_path))
+    armazenamento.put(("antiga",), "mapa antigo", "PI", "antiga")
+    armazenamento.put(("atual",), "mapa atual", "PI", "atual")
+    armazenamento.put(("atual", "compartilhado"), "mapa antigo", "PI",
+                      "atual")
+    armazenamento.put(("outro",), "mapa do CE", "CE", "outro")
+    armazenamento.put(("sem versao",), "mapa sem versao")
+
+    removidos = armazenamento.prune("PI", ["atual"], idade_minima=0)
+
+    assert removidos["chaves"] == 2
+    # O conteúdo antigo continua referenciado por uma chave atual
+    assert removidos["objetos"] == 1
+    assert armazenamento.get(("antiga",)) is None
+    assert armazenamento.get(("sem versao",)) is None
+    assert armazenamento.get(("atual", "compartilhado")) == "mapa antigo"
+    assert armazenamento.get(("outro",)) == "mapa do CE"
+    assert armazenamento.stats()["objetos"] == 3
+
+
+def test_limpeza_preserva_objetos_recentes(tmp_path):
+    armazenamento = ArtifactStore(str(tmp_path))
+    armazenamento.put(("antiga",), "mapa", "PI", "antiga")
+
+    removidos = armazenamento.prune("PI", ["atual"])
+
+    assert removidos["chaves"] == 1
+    assert removidos["objetos"] == 0
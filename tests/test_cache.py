@@ -0,0 +1,55 @@
+"""
+Testes do cache em memória (``src.utils.cache``)
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.utils.cache import BoundedCache
+
+
+def test_chave_ausente_e_calculada_uma_unica_vez():
+    cache = BoundedCache(max_entries=4, max_bytes=1024)
+    liberar = threading.Event()
+    chamadas = []
+
+    def calcular():
+        chamadas.append(1)
+        liberar.wait(5)
+        return "valor"
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futuros = [pool.submit(cache.get_or_compute, "k", calcular)
+                   for _ in range(8)]
+        liberar.set()
+        resultados = [futuro.result() for futuro in futuros]
+
+    assert resultados == ["valor"] * 8
+    assert len(chamadas) == 1
+    estatisticas = cache.stats()
+    assert estatisticas["misses"] == 1
+    assert estatisticas["hits"] == 7
+
+
+def test_falha_no_calculo_nao_fica_em_cache():
+    cache = BoundedCache(max_entries=4, max_bytes=1024)
+
+    def falhar():
+        raise RuntimeError("falha")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("k", falhar)
+    assert cache.get_or_compute("k", lambda: "novo") == "novo"
+
+
+def test_limites_de_entradas_e_bytes():
+    cache = BoundedCache(max_entries=2, max_bytes=10)
+    cache.put("a", "12345")
+    cache.put("b", "12345")
+    cache.put("c", "1")
+    assert cache.get("a") is None
+    assert cache.get("c") == "1"
+    cache.put("grande", "x" * 11)
+    assert cache.get("grande") is None
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,59 @@
+"""
+Testes do índice de filtros (``src.data.filter_index``)
+"""
+import pandas as pd
+
+from src.data.filter_index import FilterIndex
+from src.data.loader import filter_data
+from src.data.registry import load_state_dataset
+
+
+def _combinacoes(indice):
+    """Combinações de filtros da barra lateral, com e sem recortes."""
+    anos = indice.years()
+    for ano_inicio, ano_fim in [(anos[0], anos[-1]), (anos[0], anos[0]),
+                                (anos[-1], anos[-1])]:
+        yield ano_inicio, ano_fim, "Todas", "Todas"
+        for macro in indice.macros(ano_inicio, ano_fim)[:2]:
+            yield ano_inicio, ano_fim, macro, "Todas"
+            for regional in indice.regionals(ano_inicio, ano_fim,
+                                             macro)[:2]:
+                yield ano_inicio, ano_fim, macro, regional
+
+
+def test_filtro_pelo_indice_igual_ao_filtro_por_mascara():
+    df = load_state_dataset("PI")
+    indice = FilterIndex(df)
+    for filtros in _combinacoes(indice):
+        pelo_indice = filter_data(df, *filtros, index=indice)
+        por_mascara = filter_data(df, *filtros)
+        assert not pelo_indice.empty
+        pd.testing.assert_frame_equal(pelo_indice.reset_index(drop=True),
+                                      por_mascara.reset_index(drop=True))
+
+
+def test_opcoes_da_barra_lateral_seguem_os_dados():
+    df = load_state_dataset("PI")
+    indice = FilterIndex(df)
+    anos = indice.years()
+    assert anos == sorted(df["ANO"].unique())
+
+    ano = anos[-1]
+    do_ano = df[df["ANO"] == ano]
+    assert indice.macros(ano, ano) == sorted(do_ano["Macro"].dropna()
+                                             .unique())
+    for macro in indice.macros(ano, ano):
+        esperadas = do_ano.loc[do_ano["Macro"] == macro, "Regional"]
+        assert indice.regionals(ano, ano, macro) == sorted(
+            esperadas.dropna().unique())
+
+
+def test_filtro_sem_linhas_retorna_tabela_vazia():
+    df = load_state_dataset("PI")
+    indice = FilterIndex(df)
+    macro, outra = indice.macros()[:2]
+    regional_de_outra = indice.regionals(macro_selecionada=outra)[0]
+    vazio = indice.filter(indice.years()[0], indice.years()[-1], macro,
+                          regional_de_outra)
+    assert vazio.empty
+    assert list(vazio.columns) == list(df.columns)
@@ -0,0 +1,98 @@
+"""
+Testes das variantes simplificadas da malha (``src.utils.geometry``)
+"""
+import json
+import os
+import shutil
+
+import pytest
+import shapely
+from shapely.geometry import shape
+
+from src.config import GEOJSON_PATH, MAP_CONFIG
+from src.data import shared
+from src.utils.geometry import (build_simplified_geojson, load_geojson,
+                                select_municipalities, select_tolerance,
+                                simplified_path_for)
+
+TOLERANCIAS = sorted(MAP_CONFIG['simplify_tolerances'])
+
+
+@pytest.fixture
+def malha(tmp_path):
+    """Cópia da malha municipal em um diretório temporário."""
+    caminho = tmp_path / os.path.basename(GEOJSON_PATH)
+    shutil.copyfile(GEOJSON_PATH, caminho)
+    return str(caminho)
+
+
+def _ler(caminho):
+    with open(caminho, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+@pytest.mark.parametrize("tolerancia", TOLERANCIAS)
+def test_variante_preserva_municipios_e_reduz_a_malha(malha, tolerancia):
+    caminho = build_simplified_geojson(malha, tolerancia)
+    assert caminho == simplified_path_for(malha, tolerancia)
+
+    original = _ler(malha)["features"]
+    simplificada = _ler(caminho)["features"]
+    assert ([f["properties"] for f in simplificada] ==
+            [f["properties"] for f in original])
+    geometrias = [shape(f["geometry"]) for f in simplificada]
+    assert all(geometria.is_valid and not geometria.is_empty
+               for geometria in geometrias)
+    assert os.path.getsize(caminho) < os.path.getsize(malha)
+    assert (shapely.get_num_coordinates(geometrias).sum() <
+            sum(shapely.get_num_coordinates(
+                [shape(f["geometry"]) for f in original])))
+
+
+def test_fronteiras_vizinhas_continuam_coincidentes(malha):
+    caminho = build_simplified_geojson(malha, TOLERANCIAS[-1])
+    geometrias = [shape(f["geometry"]) for f in _ler(caminho)["features"]]
+    uniao = shapely.union_all(geometrias)
+    soma = sum(geometria.area for geometria in geometrias)
+    # Sem lacunas nem sobreposições entre municípios vizinhos
+    assert soma == pytest.approx(uniao.area, rel=1e-9)
+
+
+def test_variante_atualizada_e_reutilizada(malha):
+    caminho = build_simplified_geojson(malha, TOLERANCIAS[0])
+    gravada = os.stat(caminho).st_mtime_ns
+    assert build_simplified_geojson(malha, TOLERANCIAS[0]) == caminho
+    assert os.stat(caminho).st_mtime_ns == gravada
+
+    # Uma malha de origem mais nova que a variante força a regeração
+    instante = os.path.getmtime(caminho) - 60
+    os.utime(caminho, (instante, instante))
+    build_simplified_geojson(malha, TOLERANCIAS[0])
+    assert os.path.getmtime(caminho) >= os.path.getmtime(malha)
+
+
+def test_tolerancia_diminui_com_o_zoom():
+    escolhidas = [select_tolerance(zoom) for zoom in range(4, 14)]
+    assert escolhidas == sorted(escolhidas, reverse=True)
+    assert set(escolhidas) <= set(TOLERANCIAS)
+    assert select_tolerance(7, altura_mapa=800) <= select_tolerance(7)
+
+
+def test_selecao_de_municipios_no_geojson_e_na_malha_publicada(
+        malha, monkeypatch, tmp_path):
+    monkeypatch.setattr(shared, "get_state", lambda sigla: {"geojson": malha})
+    publicada = shared.publish_geometry("PI", str(tmp_path / "compartilhado"))
+    caminho_geojson = build_simplified_geojson(malha, TOLERANCIAS[0])
+    caminho_publicado = publicada[
+        MAP_CONFIG['simplify_tolerances'].index(TOLERANCIAS[0])]
+
+    nomes = [f["properties"]["name"]
+             for f in load_geojson(caminho_geojson)["features"]]
+    escolhidos = {nomes[-1], nomes[0], nomes[10], "Inexistente"}
+    for caminho in (caminho_geojson, caminho_publicado):
+        selecao = select_municipalities(caminho, escolhidos)["features"]
+        assert ([f["properties"]["name"] for f in selecao] ==
+                [nome for nome in nomes if nome in escolhidos])
+
+    assert (json.loads(json.dumps(load_geojson(caminho_publicado))) ==
+            load_geojson(caminho_geojson))
@@ -0,0 +1,52 @@
+"""
+Testes da ingestão em blocos (``src.data.ingest``)
+"""
+import numpy as np
+import pandas as pd
+
+from src.data import registry
+from src.data.ingest import GRAO, ingest
+from src.data.registry import load_state_dataset
+from src.data.store import read_dataset
+
+INDICADOR = 'IN1(6 CONSULTAS)'
+
+
+def _fonte(tmp_path):
+    """Extrato CSV com cada linha da planilha repetida com desvios opostos."""
+    df = read_dataset().astype({coluna: str for coluna in
+                                ('Macro', 'Regional', 'MUN', 'MUN_RES1',
+                                 'Quadrimestre')})
+    df['ANO'] = df['ANO'].astype(int)
+    acima, abaixo = df.copy(), df.copy()
+    acima[INDICADOR] = df[INDICADOR].astype(float) + 1
+    abaixo[INDICADOR] = df[INDICADOR].astype(float) - 1
+    # Cada grupo aparece em dois blocos distantes do extrato
+    extrato = pd.concat([acima, abaixo], ignore_index=True)
+    caminho = tmp_path / 'extrato.csv'
+    extrato.to_csv(caminho, index=False)
+    return df, caminho
+
+
+def test_ingestao_em_blocos_combina_as_medias_de_cada_grupo(
+        monkeypatch, tmp_path):
+    monkeypatch.setattr(registry, 'PARTITIONS_DIR', str(tmp_path / 'part'))
+    df, caminho = _fonte(tmp_path)
+
+    resumo = ingest(str(caminho), 'PI', linhas_por_bloco=97,
+                    diretorio_temporario=str(tmp_path))
+
+    assert resumo['linhas_lidas'] == 2 * len(df)
+    assert resumo['blocos'] == -(-2 * len(df) // 97)
+    assert resumo['anos'] == sorted(df['ANO'].unique())
+
+    gravado = load_state_dataset('PI')
+    chaves = GRAO + ['Quadrimestre']
+    esperado = (df.groupby(chaves)[INDICADOR].mean().astype(np.float32)
+                .sort_index())
+    obtido = (gravado.astype({c: str for c in chaves if c != 'ANO'})
+              .astype({'ANO': int})
+              .set_index(chaves)[INDICADOR].sort_index())
+    assert len(gravado) == resumo['linhas_gravadas'] == len(esperado)
+    np.testing.assert_allclose(obtido.to_numpy(), esperado.to_numpy(),
+                               rtol=1e-6)
@@ -0,0 +1,76 @@
+"""
+Testes dos utilitários de mapas (``src.utils.map_utils``)
+"""
+import numpy as np
+
+from src.data.registry import load_state_dataset
+from src.utils.map_utils import (calculate_connection_style,
+                                 get_coordinates_data)
+
+
+def _coordenadas_iterrows(df):
+    """Implementação anterior, linha a linha, usada como referência."""
+    coordenadas_df = df[['Macro', 'LAT_RES', 'LON_RES', 'MUN']]
+    municipios_por_macro = (df.groupby('Macro')['MUN']
+                            .agg(lambda x: '<br>'.join(sorted(set(x))))
+                            .to_dict())
+    coordenadas = {}
+    for _, row in coordenadas_df.drop_duplicates('MUN').iterrows():
+        coordenadas[row['Macro']] = {
+            'lat': row['LAT_RES'],
+            'lon': row['LON_RES'],
+            'mun_ref': row['MUN'],
+            'municipios': municipios_por_macro.get(row['Macro'], '')
+        }
+    return coordenadas
+
+
+def _dados_pi():
+    """Dados do PI com as colunas de texto como object, como na planilha."""
+    df = load_state_dataset('PI')
+    return df.astype({'Macro': str, 'MUN': str})
+
+
+def test_coordenadas_iguais_as_da_implementacao_iterrows():
+    df = _dados_pi()
+    # A implementação anterior fica com o último município de cada macro;
+    # em ordem alfabética decrescente, esse é o primeiro em ordem crescente,
+    # a referência da versão vetorizada
+    referencia = _coordenadas_iterrows(
+        df.sort_values('MUN', ascending=False, kind='stable')
+    )
+    assert get_coordinates_data(df) == referencia
+    # A ordem das linhas não muda o resultado
+    assert get_coordinates_data(df.sample(frac=1, random_state=0)) == \
+        referencia
+
+
+def test_cache_separa_recortes_da_mesma_versao():
+    df = _dados_pi()
+    recorte = df[df['Macro'] == df['Macro'].iloc[0]]
+    completo = get_coordinates_data(df, versao='teste')
+    assert get_coordinates_data(recorte, versao='teste') == \
+        get_coordinates_data(recorte)
+    assert get_coordinates_data(df, versao='teste') is completo
+
+
+def test_cache_separa_recortes_do_mesmo_tamanho():
+    df = _dados_pi()
+    macros = df['Macro'].unique()
+    primeiro = df[df['Macro'] == macros[0]].head(20)
+    segundo = df[df['Macro'] == macros[1]].head(20)
+    assert len(primeiro) == len(segundo)
+    assert get_coordinates_data(primeiro, versao='tamanho') == \
+        get_coordinates_data(primeiro)
+    assert get_coordinates_data(segundo, versao='tamanho') == \
+        get_coordinates_data(segundo)
+
+
+def test_estilo_das_conexoes_em_lote_igual_ao_escalar():
+    origem = np.array([0.0, 40.0, 90.0, 150.0])
+    destino = np.array([10.0, 60.0, 100.0, 50.0])
+    cores, larguras = calculate_connection_style(origem, destino)
+    for i, (o, d) in enumerate(zip(origem, destino)):
+        cor, largura = calculate_connection_style(o, d)
+        assert cores[i] == cor
+        assert larguras[i] == largura
@@ -0,0 +1,25 @@
+"""
+Testes das medições de desempenho (``src.utils.metrics``)
+"""
+import os
+
+from src.utils.metrics import SectionMetrics, process_file_path, process_label
+
+
+def test_cada_processo_grava_o_proprio_arquivo_rotulado(tmp_path):
+    metricas = SectionMetrics(janela=4)
+    metricas.record("mapa", 0.5, linhas=10, bytes_saida=100)
+
+    configurado = str(tmp_path / "saude_materna.prom")
+    gravado = metricas.write_prometheus_file(configurado)
+
+    assert gravado == process_file_path(configurado)
+    assert os.path.basename(gravado) == (
+        f"saude_materna.{process_label()}.prom"
+    )
+    assert not os.path.exists(configurado)
+    with open(gravado, encoding="utf-8") as arquivo:
+        series = [linha for linha in arquivo.read().splitlines()
+                  if not linha.startswith("#")]
+    assert series
+    assert all(f'worker="{process_label()}"' in linha for linha in series)
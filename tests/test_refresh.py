@@ -0,0 +1,34 @@
+"""
+Testes da atualização incremental dos dados (``src.data.refresh``)
+"""
+from src.data import registry
+from src.data.filter_index import FilterIndex
+from src.data.refresh import LiveDataset
+from src.data.registry import load_state_dataset, write_state_partitions
+from src.data.store import read_dataset
+
+
+def test_apply_mantem_impressao_digital_da_carga_completa(
+        monkeypatch, tmp_path):
+    monkeypatch.setattr(registry, "PARTITIONS_DIR", str(tmp_path))
+    write_state_partitions(read_dataset(), "PI")
+    dados = LiveDataset("PI", diretorio_compartilhado=None)
+
+    # Delta no primeiro ano: antes da correção, as linhas trocadas iam
+    # para o fim da tabela e a impressão digital mudava
+    primeiro_ano = dados.current.indice.years()[0]
+    delta = load_state_dataset("PI", [primeiro_ano]).head(5).copy()
+    delta["ANO"] = delta["ANO"].astype(int)
+    for coluna in ("Macro", "Regional", "MUN", "MUN_RES1", "Quadrimestre"):
+        if coluna in delta.columns:
+            delta[coluna] = delta[coluna].astype(str)
+    delta["IN1(6 CONSULTAS)"] = 12.5
+    dados.apply(delta)
+
+    atual = dados.current.indice
+    carga_completa = FilterIndex(load_state_dataset("PI"))
+    assert atual.fingerprint == carga_completa.fingerprint
+    assert atual.df.equals(carga_completa.df)
+    assert atual.filter(primeiro_ano, primeiro_ano).equals(
+        carga_completa.filter(primeiro_ano, primeiro_ano)
+    )
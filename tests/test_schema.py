@@ -0,0 +1,36 @@
+"""
+Testes do esquema em memória (``src.data.schema``)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.schema import apply_column_types, widen_indicators
+
+
+def test_linhas_sem_ano_sao_descartadas_com_aviso():
+    df = pd.DataFrame({
+        'ANO': [2021.0, np.nan, 2022.0],
+        'MUN': ['A', 'B', 'C'],
+        'IN2 (HIV/SÍFILIS)': [84.6, 50.0, 12.5]
+    })
+    with pytest.warns(UserWarning, match="1 linha"):
+        tipado = apply_column_types(df)
+    assert tipado['ANO'].dtype == 'int16'
+    assert tipado['ANO'].tolist() == [2021, 2022]
+    assert tipado['MUN'].tolist() == ['A', 'C']
+
+
+def test_indicadores_em_float64_sem_digitos_do_float32():
+    df = apply_column_types(pd.DataFrame({
+        'ANO': [2021, 2021],
+        'IN2 (HIV/SÍFILIS)': [84.6, np.nan]
+    }))
+    assert df['IN2 (HIV/SÍFILIS)'].dtype == np.float32
+
+    largo = widen_indicators(df)
+    assert largo['IN2 (HIV/SÍFILIS)'].dtype == np.float64
+    assert largo['IN2 (HIV/SÍFILIS)'].iloc[0] == 84.6
+    assert np.isnan(largo['IN2 (HIV/SÍFILIS)'].iloc[1])
+    # Os dados de origem continuam em float32
+    assert df['IN2 (HIV/SÍFILIS)'].dtype == np.float32
@@ -0,0 +1,121 @@
+"""
+Testes da publicação dos documentos dos mapas (``src.utils.static_assets``)
+e do servidor dos arquivos publicados (``src.tools.tile_server``)
+"""
+import asyncio
+import gzip
+import hashlib
+import os
+import time
+
+from tornado.httpclient import AsyncHTTPClient
+from tornado.httpserver import HTTPServer
+from tornado.testing import bind_unused_port
+
+from src.config import STATIC_CONFIG
+from src.tools.tile_server import make_app
+from src.utils.static_assets import (TIPOS_CONTEUDO, prune_published,
+                                     publish_file, published_exists)
+
+
+def _envelhecer(caminho, dias):
+    """Recua a data de modificação do arquivo."""
+    momento = time.time() - dias * 24 * 3600
+    os.utime(caminho, (momento, momento))
+
+
+def test_limpeza_remove_publicados_sem_uso(tmp_path):
+    diretorio = str(tmp_path)
+    antigo = publish_file("x" * 4096, "html", diretorio)
+    em_uso = publish_file("y" * 4096, "html", diretorio)
+    for nome in os.listdir(diretorio):
+        _envelhecer(os.path.join(diretorio, nome), 10)
+    # Consultar o documento renova o seu uso
+    assert published_exists(em_uso, diretorio)
+
+    removidos = prune_published(diretorio, dias=7)
+
+    assert not published_exists(antigo, diretorio)
+    assert not any(nome.startswith(antigo) for nome in os.listdir(diretorio))
+    assert published_exists(em_uso, diretorio)
+    assert removidos["arquivos"] >= 2
+
+
+def test_publicacao_nomeada_pelo_conteudo_e_idempotente(tmp_path):
+    diretorio = str(tmp_path)
+    conteudo = "<html>" + "x" * STATIC_CONFIG['min_compress_bytes']
+    nome = publish_file(conteudo, "html", diretorio)
+    caminho = os.path.join(diretorio, nome)
+
+    assert nome == (hashlib.sha256(conteudo.encode("utf-8"))
+                    .hexdigest()[:24] + ".html")
+    with open(caminho + ".gz", "rb") as arquivo:
+        assert gzip.decompress(arquivo.read()) == conteudo.encode("utf-8")
+
+    _envelhecer(caminho, 1)
+    gravado = os.stat(caminho + ".gz").st_mtime_ns
+    assert publish_file(conteudo.encode("utf-8"), "html", diretorio) == nome
+    # Publicar de novo apenas renova o uso, sem regravar
+    assert os.stat(caminho + ".gz").st_mtime_ns == gravado
+    assert time.time() - os.path.getmtime(caminho) < 3600
+
+    pequeno = publish_file("curto", "css", diretorio)
+    assert not os.path.exists(os.path.join(diretorio, pequeno + ".gz"))
+
+
+def _pedir(caminho, cabecalhos=None):
+    """Faz um pedido ao servidor de ladrilhos em uma porta livre."""
+    async def pedir():
+        soquete, porta = bind_unused_port()
+        servidor = HTTPServer(make_app())
+        servidor.add_sockets([soquete])
+        try:
+            return await AsyncHTTPClient().fetch(
+                f"http://127.0.0.1:{porta}{caminho}", headers=cabecalhos,
+                decompress_response=False, raise_error=False
+            )
+        finally:
+            servidor.stop()
+
+    return asyncio.run(pedir())
+
+
+def test_servidor_negocia_a_compressao_e_revalida(monkeypatch, tmp_path):
+    monkeypatch.setitem(STATIC_CONFIG, 'dir', str(tmp_path))
+    conteudo = ("<html>" + "x" * STATIC_CONFIG['min_compress_bytes']).encode()
+    nome = publish_file(conteudo, "html", str(tmp_path))
+    digest = nome.split(".")[0]
+    caminho = os.path.join(str(tmp_path), nome)
+    # Versão brotli gravada à parte: o servidor só verifica se ela existe
+    with open(caminho + ".br", "wb") as arquivo:
+        arquivo.write(b"brotli")
+    endereco = f"/estaticos/{nome}"
+
+    resposta = _pedir(endereco, {"Accept-Encoding": "gzip"})
+    assert resposta.code == 200
+    assert resposta.headers["Content-Encoding"] == "gzip"
+    assert resposta.headers["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(resposta.body) == conteudo
+    etag = resposta.headers["Etag"]
+    assert etag == f'"{digest}-gzip"'
+
+    resposta = _pedir(endereco, {"Accept-Encoding": "gzip, br"})
+    assert resposta.headers["Content-Encoding"] == "br"
+    assert resposta.body == b"brotli"
+
+    resposta = _pedir(endereco, {"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in resposta.headers
+    assert resposta.headers["Vary"] == "Accept-Encoding"
+    assert resposta.body == conteudo
+    assert resposta.headers["Content-Type"] == TIPOS_CONTEUDO["html"]
+
+    resposta = _pedir(endereco, {"Accept-Encoding": "gzip",
+                                 "If-None-Match": etag})
+    assert resposta.code == 304
+    assert resposta.body == b""
+    # A ETag de outra codificação não revalida
+    resposta = _pedir(endereco, {"Accept-Encoding": "identity",
+                                 "If-None-Match": etag})
+    assert resposta.code == 200
+
+    assert _pedir(f"/estaticos/{'0' * 24}.html").code == 404
@@ -0,0 +1,76 @@
+"""
+Testes da exportação do site estático (``src.tools.static_export``)
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.config import INDICADORES
+from src.data.registry import load_state_dataset
+from src.tools.static_export import (ARQUIVOS_LEAFLET, CASAS_DECIMAIS,
+                                     build_data_payload, export_static_site)
+
+
+def _decodificar(conteudo):
+    """Reconstrói as linhas a partir dos dicionários e códigos do payload."""
+    linhas = conteudo["linhas"]
+    df = pd.DataFrame({
+        "ANO": [conteudo["anos"][c] for c in linhas["ano"]],
+        "Macro": [conteudo["macros"][c] for c in linhas["macro"]],
+        "Regional": [conteudo["regionais"][c] for c in linhas["regional"]],
+        "MUN": [conteudo["municipios"][c] for c in linhas["mun"]],
+    })
+    for coluna, valores in conteudo["valores"].items():
+        df[coluna] = [np.nan if valor is None else valor
+                      for valor in valores]
+    return df
+
+
+def test_payload_reproduz_as_linhas_do_conjunto_de_dados():
+    df = load_state_dataset("PI")
+    df.loc[df.index[:3], "IN1(6 CONSULTAS)"] = np.nan
+    # Serializável em JSON estrito, sem NaN
+    conteudo = json.loads(json.dumps(build_data_payload(df, "PI", "v1"),
+                                     allow_nan=False))
+
+    assert conteudo["versao"] == "v1"
+    assert list(conteudo["indicadores"]) == [
+        coluna for coluna in INDICADORES if coluna in df.columns]
+    assert conteudo["anos"] == sorted(df["ANO"].unique().tolist())
+
+    decodificado = _decodificar(conteudo)
+    assert len(decodificado) == len(df)
+    for coluna in ("ANO", "Macro", "Regional", "MUN"):
+        assert decodificado[coluna].tolist() == (
+            df[coluna].astype(object).tolist())
+    for coluna in conteudo["indicadores"]:
+        esperado = df[coluna].astype(float).round(CASAS_DECIMAIS)
+        np.testing.assert_allclose(decodificado[coluna], esperado,
+                                   atol=10 ** -CASAS_DECIMAIS)
+        assert (decodificado[coluna].isna() == esperado.isna()).all()
+    assert conteudo["valores"]["IN1(6 CONSULTAS)"][:3] == [None] * 3
+    assert all(
+        valor is None or round(valor, CASAS_DECIMAIS) == valor
+        for valores in conteudo["valores"].values() for valor in valores
+    )
+
+
+def test_site_exportado_contem_os_arquivos_da_pagina(tmp_path):
+    tamanhos = export_static_site(str(tmp_path), "PI")
+    assert {"index.html", "dados.json", "geometria.json",
+            "plotly.min.js"} <= set(tamanhos)
+    assert all(tamanho > 0 for tamanho in tamanhos.values())
+
+    with open(tmp_path / "dados.json", encoding="utf-8") as arquivo:
+        assert json.load(arquivo)["estado"] == "Piauí"
+    with open(tmp_path / "geometria.json", encoding="utf-8") as arquivo:
+        geometria = json.load(arquivo)
+    assert geometria["features"]
+    assert all(f["properties"].keys() == {"name"}
+               for f in geometria["features"])
+
+    # Leaflet local quando copiado para o site; da CDN, caso contrário
+    pagina = (tmp_path / "index.html").read_text(encoding="utf-8")
+    for nome, url in ARQUIVOS_LEAFLET.items():
+        assert (f'"{nome}"' if nome in tamanhos else url) in pagina
@@ -0,0 +1,90 @@
+"""
+Testes do armazenamento colunar (``src.data.store``) e das impressões
+digitais de arquivos (``src.utils.fingerprint``)
+"""
+import os
+
+import pandas as pd
+
+from src.data.store import (build_columnar_store, columnar_path_for,
+                            columnar_store_is_fresh, dataset_fingerprint,
+                            read_dataset)
+from src.utils.fingerprint import file_fingerprint, forget
+
+
+def _planilha(tmp_path, linhas=20):
+    """Grava uma planilha pequena com as primeiras linhas dos dados."""
+    df = read_dataset().head(linhas)
+    caminho = str(tmp_path / 'dados.xlsx')
+    df.to_excel(caminho, index=False)
+    return caminho
+
+
+def _envelhecer(caminho, segundos=60):
+    """Recua a data de modificação de um arquivo."""
+    instante = os.path.getmtime(caminho) - segundos
+    os.utime(caminho, (instante, instante))
+
+
+def test_arquivo_colunar_e_reutilizado_enquanto_atualizado(tmp_path):
+    caminho_excel = _planilha(tmp_path)
+    caminho_parquet = columnar_path_for(caminho_excel)
+    assert caminho_parquet == str(tmp_path / 'dados.parquet')
+    assert not columnar_store_is_fresh(caminho_excel)
+
+    df = build_columnar_store(caminho_excel)
+    assert columnar_store_is_fresh(caminho_excel)
+    assert not [nome for nome in os.listdir(tmp_path)
+                if nome.endswith('.tmp')]
+    pd.testing.assert_frame_equal(read_dataset(caminho_excel), df)
+
+    # Uma planilha mais nova que o arquivo colunar força a reconstrução
+    _envelhecer(caminho_parquet)
+    assert not columnar_store_is_fresh(caminho_excel)
+    pd.testing.assert_frame_equal(read_dataset(caminho_excel), df)
+    assert columnar_store_is_fresh(caminho_excel)
+
+
+def test_arquivo_colunar_corrompido_e_reconstruido(tmp_path):
+    caminho_excel = _planilha(tmp_path)
+    df = build_columnar_store(caminho_excel)
+    caminho_parquet = columnar_path_for(caminho_excel)
+    with open(caminho_parquet, 'wb') as arquivo:
+        arquivo.write(b'corrompido')
+
+    pd.testing.assert_frame_equal(read_dataset(caminho_excel), df)
+    assert len(pd.read_parquet(caminho_parquet)) == len(df)
+
+
+def test_impressao_digital_do_conjunto_acompanha_o_conteudo():
+    df = read_dataset().head(50)
+    assert dataset_fingerprint(df) == dataset_fingerprint(df.copy())
+
+    alterado = df.copy()
+    coluna = alterado.select_dtypes('number').columns[-1]
+    alterado.loc[alterado.index[0], coluna] += 1
+    assert dataset_fingerprint(alterado) != dataset_fingerprint(df)
+    assert (dataset_fingerprint(df.iloc[1:]) !=
+            dataset_fingerprint(df))
+    assert (dataset_fingerprint(df.rename(columns={coluna: 'outra'})) !=
+            dataset_fingerprint(df))
+
+
+def test_impressao_digital_do_arquivo_ignora_toque(tmp_path):
+    caminho = tmp_path / 'dados.bin'
+    caminho.write_bytes(b'conteudo original')
+    original = file_fingerprint(str(caminho))
+
+    # Arquivo apenas tocado ou regravado com o mesmo conteúdo
+    _envelhecer(str(caminho))
+    assert file_fingerprint(str(caminho)) == original
+    caminho.write_bytes(b'conteudo original')
+    assert file_fingerprint(str(caminho)) == original
+
+    caminho.write_bytes(b'conteudo alterado')
+    alterado = file_fingerprint(str(caminho))
+    assert alterado != original
+
+    forget(str(caminho))
+    assert file_fingerprint(str(caminho)) == alterado
+    assert file_fingerprint(str(tmp_path / 'ausente.bin')) is None
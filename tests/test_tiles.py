@@ -0,0 +1,102 @@
+"""
+Testes dos ladrilhos da malha municipal (``src.utils.tiles``)
+"""
+import json
+import os
+import shutil
+
+import pytest
+import shapely
+from shapely.geometry import box, shape
+
+from src.config import GEOJSON_PATH
+from src.utils.geometry import load_geojson
+from src.utils.tiles import (build_tile, geometry_version, precompute_tiles,
+                             tile_bounds, tile_path, tiles_for_bounds,
+                             write_tile)
+
+ZOOMS = (5, 7)
+
+
+@pytest.fixture
+def malha(tmp_path):
+    """Cópia da malha municipal; as variantes são geradas ao lado dela."""
+    caminho = tmp_path / os.path.basename(GEOJSON_PATH)
+    shutil.copyfile(GEOJSON_PATH, caminho)
+    return str(caminho)
+
+
+def _limites(caminho):
+    return shapely.total_bounds([
+        shape(f["geometry"]) for f in load_geojson(caminho)["features"]
+    ])
+
+
+def test_ladrilhos_cobrem_a_area_informada(malha):
+    oeste, sul, leste, norte = _limites(malha)
+    area = box(oeste, sul, leste, norte)
+    for z in ZOOMS:
+        ladrilhos = tiles_for_bounds(oeste, sul, leste, norte, z)
+        assert len(set(ladrilhos)) == len(ladrilhos)
+        uniao = shapely.union_all([box(*tile_bounds(z, x, y))
+                                   for x, y in ladrilhos])
+        assert uniao.contains(area)
+
+    oeste, sul, leste, norte = tile_bounds(7, 45, 66)
+    assert oeste < leste and sul < norte
+    assert tiles_for_bounds(oeste + 1e-6, sul + 1e-6, leste - 1e-6,
+                            norte - 1e-6, 7) == [(45, 66)]
+
+
+def test_ladrilho_lista_cada_municipio_que_o_toca_uma_vez(malha):
+    oeste, sul, leste, norte = _limites(malha)
+    for z in ZOOMS:
+        vistos = {}
+        for x, y in tiles_for_bounds(oeste, sul, leste, norte, z):
+            area = box(*tile_bounds(z, x, y))
+            features = build_tile(malha, z, x, y)["features"]
+            ids = [f["properties"]["id"] for f in features]
+            assert len(set(ids)) == len(ids)
+            for feature in features:
+                assert shape(feature["geometry"]).intersects(area)
+                # Um município repetido em ladrilhos vizinhos tem sempre a
+                # mesma geometria, e pode ser descartado pelo id
+                anterior = vistos.setdefault(feature["properties"]["id"],
+                                             feature)
+                assert anterior == feature
+        assert set(vistos) == {f["properties"]["id"]
+                               for f in load_geojson(malha)["features"]}
+
+
+def test_ladrilho_fora_da_malha_e_vazio(malha):
+    assert build_tile(malha, 7, 0, 0)["features"] == []
+
+
+def test_ladrilhos_pre_calculados_iguais_aos_montados(malha, tmp_path):
+    diretorio = str(tmp_path / "ladrilhos")
+    gravados = precompute_tiles("PI", malha, diretorio, zooms=ZOOMS)
+    versao = geometry_version(malha)
+
+    oeste, sul, leste, norte = _limites(malha)
+    for z in ZOOMS:
+        esperados = [
+            (x, y) for x, y in tiles_for_bounds(oeste, sul, leste, norte, z)
+            if build_tile(malha, z, x, y)["features"]
+        ]
+        assert gravados[z] == len(esperados)
+        for x, y in esperados:
+            caminho = tile_path("PI", versao, z, x, y, diretorio)
+            with open(caminho, encoding="utf-8") as arquivo:
+                assert json.load(arquivo) == json.loads(
+                    json.dumps(build_tile(malha, z, x, y)))
+    assert not [nome for _, _, nomes in os.walk(diretorio)
+                for nome in nomes if nome.endswith(".tmp")]
+
+
+def test_gravacao_do_ladrilho_retorna_o_conteudo(tmp_path):
+    caminho = str(tmp_path / "PI" / "v" / "7" / "1" / "2.json")
+    dados = write_tile(caminho, {"type": "FeatureCollection",
+                                 "features": []})
+    with open(caminho, "rb") as arquivo:
+        assert arquivo.read() == dados
+    assert json.loads(dados)["features"] == []